@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+NetworkMessage codec benchmark
+
+Compares wire size and encode/decode throughput of the JSON and binary
+codecs over a representative mix of messages. Run from the repo root:
+
+    python -m benchmarks.codec_roundtrip
+"""
+
+import argparse
+import time
+from src.network import MessageType, NetworkMessage
+from src.codec import CODECS, MessageDecoder
+
+
+def sample_messages():
+    """A tick's worth of typical traffic for a 10-player lobby"""
+    messages = []
+    for player_id in range(1, 11):
+        messages.append(NetworkMessage(MessageType.PLAYER_MOVE, player_id,
+                                       {'player_id': player_id, 'x': 640.5 + player_id, 'y': 360.25}))
+    messages.append(NetworkMessage(MessageType.CHAT, 3, {'player_name': 'Player 3', 'text': 'red is sus'}))
+    messages.append(NetworkMessage(MessageType.VOTE_CAST, 4, {'voter_id': 4, 'voted_id': 1}))
+    messages.append(NetworkMessage(MessageType.VOTE_CAST, 5, {'voter_id': 5, 'voted_id': None}))
+    messages.append(NetworkMessage(MessageType.PLAYER_KILL, 1, {'impostor_id': 1, 'victim_id': 2}))
+    messages.append(NetworkMessage(MessageType.GAME_START, 0, {'num_impostors': 2}))
+    return messages
+
+
+def bench_codec(name, messages, rounds):
+    codec = CODECS[name]
+    encoded = [codec.encode(message) for message in messages]
+    move_size = len(encoded[0])
+    total_size = sum(len(data) for data in encoded)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            codec.encode(message)
+    encode_seconds = time.perf_counter() - start
+
+    stream = b''.join(encoded)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        decoded = MessageDecoder().feed(stream)
+    decode_seconds = time.perf_counter() - start
+
+    # Round trip must preserve type, sender and data
+    assert len(decoded) == len(messages)
+    for original, result in zip(messages, decoded):
+        assert original.type == result.type and original.sender_id == result.sender_id
+        assert original.data == result.data
+
+    count = rounds * len(messages)
+    return {
+        'codec': name,
+        'move_bytes': move_size,
+        'tick_bytes': total_size,
+        'encode_per_s': count / encode_seconds,
+        'decode_per_s': count / decode_seconds,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, default=5000, help='Times to encode/decode the sample tick')
+    args = parser.parse_args(argv)
+
+    messages = sample_messages()
+    results = [bench_codec(name, messages, args.rounds) for name in ('json', 'binary')]
+
+    print(f"{'codec':<8}{'move B':>8}{'tick B':>8}{'encode/s':>12}{'decode/s':>12}")
+    for r in results:
+        print(f"{r['codec']:<8}{r['move_bytes']:>8}{r['tick_bytes']:>8}"
+              f"{r['encode_per_s']:>12.0f}{r['decode_per_s']:>12.0f}")
+    json_result, binary_result = results
+    print(f"binary/json size: {binary_result['tick_bytes'] / json_result['tick_bytes']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
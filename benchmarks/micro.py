@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for core hot paths
+
+Times each hot path at several player, task and message counts and
+compares against stored baselines, failing when a case gets slower than
+its baseline by more than the threshold. Run from the repo root:
+
+    python -m benchmarks.micro                 # compare with baselines
+    python -m benchmarks.micro --save          # record new baselines
+    python -m benchmarks.micro -k vote -k chat # only matching cases
+
+Baselines are per machine: re-record them with --save after changing
+hardware, then commit the updated benchmarks/baselines.json.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from src.player import Player, PlayerColor, PlayerRole
+from src.map import GameMap
+from src.voting import VoteManager
+from src.impostor_abilities import KillManager
+from src.systems import ChatManager, StatisticsTracker
+from src.simulation import Simulation, WanderBot
+from src.replay import Replay
+from src.timing import SimulationClock
+from src.network import MessageType, NetworkMessage
+from src.codec import CODECS, MessageDecoder
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+DEFAULT_THRESHOLD = 0.25  # Allowed slowdown over baseline (25%)
+CALIBRATION_KEY = '_calibration_ns'
+
+BENCHMARKS = []  # (name, sizes, setup(size) -> (run, ops per run))
+
+
+def benchmark(name, sizes):
+    """Register a benchmark; setup(size) returns (run, operations per run)"""
+    def register(setup):
+        BENCHMARKS.append((name, sizes, setup))
+        return setup
+    return register
+
+
+def _players(count, seed=0):
+    rng = random.Random(seed)
+    colors = list(PlayerColor)
+    players = {}
+    for player_id in range(1, count + 1):
+        player = Player(player_id, f"Player {player_id}", colors[player_id % len(colors)])
+        player.x = rng.uniform(50, 1230)
+        player.y = rng.uniform(50, 670)
+        player.velocity_x = rng.choice((-5, 0, 5))
+        player.velocity_y = rng.choice((-5, 0, 5))
+        players[player_id] = player
+    return players
+
+
+@benchmark('player_update', sizes=(10, 100, 1000))
+def bench_player_update(count):
+    players = list(_players(count).values())
+
+    def run():
+        for player in players:
+            player.update()
+    return run, count
+
+
+@benchmark('check_game_end', sizes=(10, 100, 1000))
+def bench_check_game_end(count):
+    # Mid-game state where nobody has won yet, so every call does the full check
+    sim = Simulation(seed=1)
+    for index in range(count):
+        sim.add_player(f"Player {index}", PlayerColor.RED)
+    sim.start_game(max(1, count // 10))
+
+    def run():
+        sim.check_game_end()
+    return run, 1
+
+
+@benchmark('vote_and_end_voting', sizes=(10, 100, 1000))
+def bench_voting(count):
+    manager = VoteManager()
+    players = dict.fromkeys(range(1, count + 1))
+    rng = random.Random(2)
+    votes = [(voter, rng.randint(1, count)) for voter in players]
+
+    def run():
+        manager.start_voting(players)
+        for voter, voted in votes:
+            manager.vote(voter, voted)
+        manager.end_voting()
+    return run, count
+
+
+@benchmark('vote_submit_apply', sizes=(10, 100, 1000))
+def bench_vote_batch(count):
+    # Votes queued as network handlers would, then applied as one tick's batch
+    manager = VoteManager()
+    players = dict.fromkeys(range(1, count + 1))
+    rng = random.Random(2)
+    votes = [(voter, rng.choice((None, rng.randint(1, count)))) for voter in players]
+
+    def run():
+        manager.start_voting(players)
+        for voter, voted in votes:
+            manager.submit(voter, voted)
+        manager.apply_pending()
+        manager.end_voting()
+    return run, count
+
+
+@benchmark('get_room_at', sizes=(100, 1000, 10000))
+def bench_room_lookup(count):
+    game_map = GameMap()
+    rng = random.Random(3)
+    points = [(rng.uniform(0, 1280), rng.uniform(0, 720)) for _ in range(count)]
+
+    def run():
+        for x, y in points:
+            game_map.get_room_at(x, y)
+    return run, count
+
+
+@benchmark('get_vent_near', sizes=(100, 1000, 10000))
+def bench_vent_lookup(count):
+    game_map = GameMap()
+    rng = random.Random(4)
+    points = [(rng.uniform(0, 1280), rng.uniform(0, 720)) for _ in range(count)]
+
+    def run():
+        for x, y in points:
+            game_map.get_vent_near(x, y)
+    return run, count
+
+
+@benchmark('execute_kill', sizes=(10, 100, 1000))
+def bench_execute_kill(count):
+    manager = KillManager(clock=SimulationClock())
+    impostor = Player(0, "Impostor", PlayerColor.RED)
+    impostor.set_role(PlayerRole.IMPOSTOR)
+    impostor.x = impostor.y = 300
+    victims = list(_players(count, seed=5).values())
+    for index, victim in enumerate(victims):
+        # Half in range, half too far away
+        victim.x = 300 + (20 if index % 2 else 400)
+        victim.y = 300
+
+    def run():
+        for victim in victims:
+            manager.last_kill_time.clear()
+            victim.is_alive = True
+            manager.execute_kill(impostor, victim)
+    return run, count
+
+
+def _messages(count):
+    rng = random.Random(6)
+    messages = []
+    for index in range(count):
+        if index % 10 == 9:
+            messages.append(NetworkMessage(MessageType.CHAT, index, {'player_name': 'Player', 'text': 'where?'}))
+        else:
+            messages.append(NetworkMessage(MessageType.PLAYER_MOVE, index % 10,
+                                           {'player_id': index % 10, 'x': rng.uniform(0, 1280), 'y': rng.uniform(0, 720)}))
+    return messages
+
+
+for _codec in ('json', 'binary'):
+    @benchmark(f'encode_{_codec}', sizes=(10, 100, 1000))
+    def bench_encode(count, codec=_codec):
+        messages = _messages(count)
+        encode = CODECS[codec].encode
+
+        def run():
+            for message in messages:
+                encode(message)
+        return run, count
+
+    @benchmark(f'decode_{_codec}', sizes=(10, 100, 1000))
+    def bench_decode(count, codec=_codec):
+        stream = b''.join(CODECS[codec].encode(message) for message in _messages(count))
+
+        def run():
+            MessageDecoder().feed(stream)
+        return run, count
+
+
+@benchmark('chat_add_message', sizes=(10, 100, 1000))
+def bench_chat(count):
+    # What a message costs when it arrives; the history write is chat_flush
+    texts = [f"message {index}" for index in range(count)]
+    chat = ChatManager()
+
+    def run():
+        for index, text in enumerate(texts):
+            chat.add_message('Player', index % 10, text)
+        chat._pending.clear()
+    return run, count
+
+
+@benchmark('chat_flush', sizes=(10, 100, 1000))
+def bench_chat_flush(count):
+    # Steady state: one long-lived chat whose history is already on disk,
+    # writing one tick's batch of count messages
+    texts = [f"message {index}" for index in range(count)]
+    chat = ChatManager()
+
+    def run():
+        for index, text in enumerate(texts):
+            chat.add_message('Player', index % 10, text)
+        chat.flush()
+    return run, count
+
+
+@benchmark('replay_seek', sizes=(10, 100))
+def bench_replay_seek(count):
+    # Jump to ticks scattered over a recorded 3000-tick bot match
+    tempdir = tempfile.TemporaryDirectory(prefix='bench-')
+    path = os.path.join(tempdir.name, 'match.evlog')
+    sim = Simulation(seed=8)
+    sim.record_events(path)
+    for index in range(count):
+        player = sim.add_player(f"Bot {index}", PlayerColor.RED)
+        sim.set_controller(player.id, WanderBot(task_interval=10**9))
+    sim.start_game(1)
+    sim.kill_manager.kill_cooldown = 10**9  # Keep the match going for the whole recording
+    sim.run_ticks(3000)
+    sim.close()
+    replay = Replay(path)
+    rng = random.Random(9)
+    ticks = [rng.randrange(3000) for _ in range(10)]
+
+    def run(tempdir=tempdir):
+        for tick in ticks:
+            replay.seek(tick)
+    return run, len(ticks)
+
+
+@benchmark('leaderboard', sizes=(100, 10000, 100000))
+def bench_leaderboard(count):
+    # Record a result, then read a page and a rank, against count ranked players
+    tracker = StatisticsTracker()
+    rng = random.Random(7)
+    for player_id in range(1, count + 1):
+        tracker.create_player_stat(player_id, f"Player {player_id}")
+        for _ in range(rng.randint(0, 5)):
+            if rng.random() < 0.5:
+                tracker.add_game_win(player_id, 'CREWMATE')
+            else:
+                tracker.add_game_loss(player_id, 'IMPOSTOR')
+    tracker.get_leaderboard(0, 10)
+    players = [rng.randint(1, count) for _ in range(100)]
+
+    def run():
+        for player_id in players:
+            tracker.add_game_win(player_id, 'CREWMATE')
+            tracker.get_leaderboard(count // 2, 20)
+            tracker.get_rank(player_id)
+    return run, len(players)
+
+
+def measure(run, ops, min_time=0.1, repeats=7):
+    """Best time per operation in nanoseconds"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+    best = elapsed
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        best = min(best, time.perf_counter() - start)
+    return best / (loops * ops) * 1e9
+
+
+def _calibration_run():
+    # Plain interpreter work (calls, attribute access, dict and float math)
+    # that tracks how fast this machine runs Python right now
+    values = {}
+    for index in range(200):
+        values[index & 31] = values.get(index & 31, 0.0) + index * 0.5
+
+
+def calibrate():
+    """Reference cost in ns, so baselines survive a faster or busier machine"""
+    return measure(_calibration_run, 200)
+
+
+def run_benchmarks(filters=()):
+    results = {}
+    for name, sizes, setup in BENCHMARKS:
+        for size in sizes:
+            case = f"{name}[{size}]"
+            if filters and not any(f in case for f in filters):
+                continue
+            run, ops = setup(size)
+            results[case] = measure(run, ops)
+    return results
+
+
+def load_baselines(path=BASELINE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-k', dest='filters', action='append', default=[], help='Only cases containing this text')
+    parser.add_argument('--save', action='store_true', help='Record results as the new baselines')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed slowdown before a case counts as a regression (0.25 = 25%%)')
+    parser.add_argument('--baselines', default=BASELINE_PATH)
+    args = parser.parse_args(argv)
+
+    calibration = calibrate()
+    results = run_benchmarks(args.filters)
+    calibration = min(calibration, calibrate())
+    baselines = load_baselines(args.baselines)
+    # Scale stored baselines by how fast this machine is compared to when
+    # they were recorded
+    scale = calibration / baselines[CALIBRATION_KEY] if baselines.get(CALIBRATION_KEY) else 1.0
+
+    regressions = []
+    print(f"{'case':<28}{'ns/op':>12}{'baseline':>12}{'change':>9}")
+    for case, ns in results.items():
+        base = baselines.get(case)
+        if base:
+            base *= scale
+            change = ns / base - 1.0
+            flag = '  REGRESSION' if change > args.threshold else ''
+            if flag:
+                regressions.append(case)
+            print(f"{case:<28}{ns:>12.1f}{base:>12.1f}{change:>+8.0%}{flag}")
+        else:
+            print(f"{case:<28}{ns:>12.1f}{'-':>12}{'':>9}")
+
+    if args.save:
+        if baselines.get(CALIBRATION_KEY):
+            # Keep the file on one scale when only some cases are re-recorded
+            results = {case: ns / scale for case, ns in results.items()}
+        else:
+            baselines[CALIBRATION_KEY] = calibration
+        baselines.update(results)
+        with open(args.baselines, 'w') as f:
+            json.dump({case: round(ns, 2) for case, ns in sorted(baselines.items())}, f, indent=2)
+            f.write('\n')
+        print(f"Saved {len(results)} baselines to {args.baselines}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,10 +11,10 @@ from src.game import Game
 from src.player import PlayerColor
 
 
-def run_single_player(enable_sound=True, record=False, duration=None):
+def run_single_player(enable_sound=True, record=False, duration=None, dirty_rects=False):
     """Run a single-player game with AI players"""
     print("Starting single-player game...")
-    game = Game(enable_sound=enable_sound, record_frames=record, record_duration=duration)
+    game = Game(enable_sound=enable_sound, record_frames=record, record_duration=duration, dirty_rects=dirty_rects)
 
     # Add players
     colors = [PlayerColor.RED, PlayerColor.BLUE, PlayerColor.GREEN, PlayerColor.PINK]
@@ -25,16 +25,22 @@ def run_single_player(enable_sound=True, record=False, duration=None):
     game.run()
 
 
-def run_with_server(enable_sound=True):
+def run_with_server(enable_sound=True, async_server=False, udp=False, port=5000):
     """Run the game with a network server"""
     print("Starting game with network server...")
     from src.network import NetworkServer
+    from src.async_network import AsyncNetworkServer
+    from src.udp import UdpServerChannel
 
     game = Game(multiplayer=True, enable_sound=enable_sound)
 
     # Start server
-    game.network_server = NetworkServer('localhost', 5000)
+    server_class = AsyncNetworkServer if async_server else NetworkServer
+    game.network_server = server_class('localhost', port, batch=True)
     game.network_server.start()
+    if udp:
+        game.udp_server = UdpServerChannel('localhost', port + 1)
+        game.udp_server.start()
 
     # Add local players
     colors = [PlayerColor.RED, PlayerColor.BLUE, PlayerColor.GREEN, PlayerColor.PINK]
@@ -45,18 +51,22 @@ def run_with_server(enable_sound=True):
     game.run()
 
 
-def run_as_client(enable_sound=True):
+def run_as_client(enable_sound=True, udp=False, port=5000):
     """Run the game as a client connecting to a server"""
     print("Starting game as network client...")
-    from src.network import NetworkClient
+    from src.network import NetworkClient, MessageType
 
     game = Game(multiplayer=True, enable_sound=enable_sound)
+    game.use_udp = udp
+    game.replica = True  # The server decides who wins
 
     # Connect to server
-    game.network_client = NetworkClient('localhost', 5000)
+    game.network_client = NetworkClient('localhost', port, batch=True)
     if game.network_client.connect():
-        # Add local player
-        game.add_player("Local Player", PlayerColor.RED)
+        # Add local player and ask the server for a player of our own; its
+        # reply sets the id we view the game as
+        player = game.add_player("Local Player", PlayerColor.RED)
+        game.network_client.send_message(MessageType.PLAYER_JOIN, {'player_id': player.id, 'name': player.name})
 
         # Run the game
         game.run()
@@ -65,23 +75,128 @@ def run_as_client(enable_sound=True):
         sys.exit(1)
 
 
+def run_match_host(port=5000, async_server=False, max_matches=64, seed=None, workers=1, chat_dir=None,
+                   stats_db=None, event_dir=None):
+    """Host many independent matches behind one server, with no display"""
+    from src.network import NetworkServer
+    from src.async_network import AsyncNetworkServer
+    from src.match_host import MatchHost
+    from src.sharding import ShardedHost
+
+    server_class = AsyncNetworkServer if async_server else NetworkServer
+    server = server_class('localhost', port, batch=True)
+    server.start()
+    if workers == 1:
+        host = MatchHost(server, max_matches=max_matches, seed=seed, chat_dir=chat_dir, stats_db=stats_db,
+                         event_dir=event_dir)
+        print(f"Hosting up to {max_matches} matches on port {port}")
+    else:
+        # 0 means one worker per core
+        host = ShardedHost(server, workers=workers or None, host_options={
+            'max_matches': max_matches, 'seed': seed, 'chat_dir': chat_dir, 'stats_db': stats_db,
+            'event_dir': event_dir})
+        host.start()
+        print(f"Hosting matches on port {port} across {host.num_workers} worker processes")
+    try:
+        host.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        host.stop()
+        server.stop()
+
+
+def run_headless(num_players=8, num_impostors=1, ticks=36000, seed=None, use_player_store=False, event_log=None):
+    """Run a bot-driven match with no display, as fast as possible"""
+    import time
+    from src.simulation import Simulation, WanderBot
+
+    sim = Simulation(seed=seed, use_player_store=use_player_store)
+    if event_log:
+        sim.record_events(event_log)
+    print(f"Starting headless simulation (seed {sim.seed})...")
+    colors = list(PlayerColor)
+    for i in range(num_players):
+        player = sim.add_player(f"Bot {i + 1}", colors[i % len(colors)])
+        sim.set_controller(player.id, WanderBot())
+
+    if not sim.start_game(num_impostors):
+        sys.exit(1)
+
+    start = time.perf_counter()
+    ticks_run = sim.run_ticks(ticks)
+    elapsed = time.perf_counter() - start
+
+    print(f"Ran {ticks_run} ticks in {elapsed:.2f}s ({ticks_run / max(elapsed, 1e-9):.0f} ticks/s)")
+    print(f"Winner: {sim.winning_team or 'none (tick limit reached)'}")
+    print(f"State digest: {sim.state_digest()}")
+    sim.close()
+
+
+def run_replay(event_log, to_tick=None):
+    """Replay a recorded match headless, as fast as possible"""
+    from src.replay import Replay
+
+    if not event_log:
+        print("Replay needs --event-log FILE")
+        sys.exit(1)
+    replay = Replay(event_log)
+    try:
+        ticks, elapsed = replay.run(to_tick)
+        sim = replay.sim
+        speedup = ticks / sim.sim_clock.tick_rate / max(elapsed, 1e-9)
+        print(f"Replayed {ticks} ticks in {elapsed:.2f}s ({speedup:.0f}x real time)")
+        print(f"Tick {sim.tick_count}: {sim.current_state.name}, winner {sim.winning_team or 'none'}")
+        print(f"State digest: {sim.state_digest()}")
+        for tick, description in replay.divergences:
+            print(f"Diverged at tick {tick}: {description}")
+    finally:
+        replay.close()
+    if replay.divergences:
+        sys.exit(1)
+
+
 def main(argv=None):
     parser = argparse.ArgumentParser()
-    parser.add_argument('mode', nargs='?', default='single', choices=['single', 'server', 'client'])
+    parser.add_argument('mode', nargs='?', default='single', choices=['single', 'server', 'client', 'headless', 'host', 'replay'])
     parser.add_argument('--no-audio', action='store_true', help='Disable audio')
     parser.add_argument('--record', action='store_true', help='Record screenshots to snapshots/')
     parser.add_argument('--duration', type=float, default=None, help='Recording duration in seconds')
+    parser.add_argument('--async-server', action='store_true', help='Serve clients from one asyncio event loop (server mode)')
+    parser.add_argument('--port', type=int, default=5000, help='TCP port (server, client and host modes)')
+    parser.add_argument('--max-matches', type=int, default=64, help='Concurrent matches (host mode)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes, 0 for one per core (host mode)')
+    parser.add_argument('--chat-dir', default=None, help='Keep per-match chat history here (host mode)')
+    parser.add_argument('--stats-db', default=None, help='SQLite file for lifetime player stats (host mode)')
+    parser.add_argument('--event-dir', default=None, help='Record each match to an event log here (host mode)')
+    parser.add_argument('--event-log', default=None, help='Event log to record to (headless mode) or replay (replay mode)')
+    parser.add_argument('--to-tick', type=int, default=None, help='Stop the replay at this tick (replay mode)')
+    parser.add_argument('--udp', action='store_true', help='Send movement and snapshots over UDP (server/client modes)')
+    parser.add_argument('--dirty-rects', action='store_true', help='Only redraw changed screen areas (low-end machines)')
+    parser.add_argument('--players', type=int, default=8, help='Bot players (headless mode)')
+    parser.add_argument('--impostors', type=int, default=1, help='Impostors (headless mode)')
+    parser.add_argument('--ticks', type=int, default=36000, help='Tick limit (headless mode)')
+    parser.add_argument('--seed', type=int, default=None, help='Match RNG seed (headless mode)')
+    parser.add_argument('--player-store', action='store_true', help='Use array-backed player state (headless mode)')
 
     args = parser.parse_args(argv)
 
     enable_sound = not args.no_audio
 
     if args.mode == 'server':
-        run_with_server(enable_sound=enable_sound)
+        run_with_server(enable_sound=enable_sound, async_server=args.async_server, udp=args.udp, port=args.port)
     elif args.mode == 'client':
-        run_as_client(enable_sound=enable_sound)
+        run_as_client(enable_sound=enable_sound, udp=args.udp, port=args.port)
+    elif args.mode == 'host':
+        run_match_host(args.port, args.async_server, args.max_matches, args.seed, args.workers, args.chat_dir,
+                       args.stats_db, args.event_dir)
+    elif args.mode == 'headless':
+        run_headless(args.players, args.impostors, args.ticks, args.seed, args.player_store, args.event_log)
+    elif args.mode == 'replay':
+        run_replay(args.event_log, args.to_tick)
     else:
-        run_single_player(enable_sound=enable_sound, record=args.record, duration=args.duration)
+        run_single_player(enable_sound=enable_sound, record=args.record, duration=args.duration,
+                          dirty_rects=args.dirty_rects)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,241 @@
+import asyncio
+import queue
+import socket
+import threading
+from collections import OrderedDict
+from src.codec import MessageDecoder, BINARY_MAGIC
+from src.outbound import stale_key
+
+class AsyncNetworkServer:
+    """Single event-loop TCP server with the same API as NetworkServer.
+
+    All connections are served by one asyncio loop (epoll on Linux) running
+    in a background thread, instead of one blocking thread per client, so a
+    single process can hold thousands of connections. start, stop,
+    broadcast_message, send_to_client(s) and get_message are safe to call from
+    the game thread.
+
+    Writes never wait on a slow client. Once its transport buffer passes
+    high_water bytes, unreliable messages (moves, state updates) to it are
+    dropped; past max_buffer bytes the client counts as stalled and is
+    disconnected.
+    """
+    def __init__(self, host='localhost', port=5000, codec='json', backlog=1024, shutdown_timeout=2.0, batch=False,
+                 high_water=64 * 1024, max_buffer=1024 * 1024):
+        self.host = host
+        self.port = port
+        self.codec = codec  # Used until a client shows which codec it speaks
+        self.batch = batch  # Hold sends until flush(), then one write per client
+        self.pending = {}  # {client_id: OrderedDict(key: (bytes, reliable))} awaiting flush (loop thread only)
+        self.high_water = high_water  # Buffered bytes past which unreliable sends to a client are dropped
+        self.max_buffer = max_buffer  # Buffered bytes past which a client is disconnected
+        self.dropped = 0  # Unreliable messages dropped for slow clients
+        self.backlog = backlog
+        self.shutdown_timeout = shutdown_timeout  # Seconds to flush clients on stop
+        self.clients = {}  # {client_id: (StreamWriter, address)}
+        self.client_codecs = {}  # {client_id: codec name seen from that client}
+        self.message_queue = queue.Queue()
+        self.running = False
+        self.next_client_id = 1
+
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._handlers = set()
+        self._ready = threading.Event()
+        self._start_error = None
+
+    def start(self):
+        """Start the network server"""
+        self._ready.clear()
+        self._start_error = None
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._start_error is not None:
+            raise self._start_error
+        print(f"Server started on {self.host}:{self.port}")
+
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        try:
+            self._server = loop.run_until_complete(asyncio.start_server(
+                self._handle_client, self.host, self.port,
+                backlog=self.backlog, reuse_address=True))
+        except OSError as exc:
+            self._start_error = exc
+            self._ready.set()
+            loop.close()
+            return
+
+        self.running = True
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(self._shutdown())
+            loop.close()
+
+    async def _handle_client(self, reader, writer):
+        """Handle individual client"""
+        client_id = self.next_client_id
+        self.next_client_id += 1
+        address = writer.get_extra_info('peername')
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.clients[client_id] = (writer, address)
+        self._handlers.add(asyncio.current_task())
+        print(f"Client {client_id} connected from {address}")
+
+        decoder = MessageDecoder()
+        try:
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    break
+
+                # Reply in whatever encoding the client speaks
+                if client_id not in self.client_codecs:
+                    self.client_codecs[client_id] = 'binary' if data[0] == BINARY_MAGIC else 'json'
+
+                for message in decoder.feed(data):
+                    self.message_queue.put((client_id, message))
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            pass
+        finally:
+            # Client disconnected
+            self.clients.pop(client_id, None)
+            self.client_codecs.pop(client_id, None)
+            self.pending.pop(client_id, None)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+            print(f"Client {client_id} disconnected")
+
+    def _write(self, client_id, data, key=None):
+        """Queue bytes on a client's transport (runs on the loop thread)"""
+        entry = self.clients.get(client_id)
+        if entry is None:
+            return
+        if self.batch:
+            # A newer move or state update replaces the pending one
+            pending = self.pending.setdefault(client_id, OrderedDict())
+            reliable = key is None
+            if reliable:
+                key = object()
+            else:
+                pending.pop(key, None)
+            pending[key] = (data, reliable)
+            return
+        self._send(client_id, entry[0], data, key is None)
+
+    def _send(self, client_id, writer, data, reliable=True):
+        if writer.is_closing():
+            return
+        buffered = writer.transport.get_write_buffer_size()
+        if buffered >= self.max_buffer:
+            print(f"Client {client_id} stalled; disconnecting")
+            writer.transport.abort()  # Its handler sees the connection drop and cleans up
+            return
+        if buffered >= self.high_water and not reliable:
+            self.dropped += 1
+            return
+        try:
+            writer.write(data)
+        except (ConnectionError, OSError, RuntimeError):
+            pass
+
+    def _flush_all(self):
+        """Write each client's pending bytes in one go (runs on the loop thread)"""
+        pending, self.pending = self.pending, {}
+        for client_id, messages in pending.items():
+            entry = self.clients.get(client_id)
+            if entry is None:
+                continue
+            writer = entry[0]
+            if not writer.is_closing() and writer.transport.get_write_buffer_size() >= self.high_water:
+                # Behind already: keep only what must arrive
+                kept = [data for data, reliable in messages.values() if reliable]
+                self.dropped += len(messages) - len(kept)
+                if not kept:
+                    continue
+                self._send(client_id, writer, b''.join(kept))
+            else:
+                self._send(client_id, writer, b''.join(data for data, _ in messages.values()))
+
+    def _write_all(self, message, client_ids=None):
+        """Write a message to many clients, encoded once per codec (runs on the loop thread)"""
+        encoded = {}
+        key = stale_key(message)
+        for client_id in (list(self.clients) if client_ids is None else client_ids):
+            if client_id not in self.clients:
+                continue
+            codec = self.client_codecs.get(client_id, self.codec)
+            if codec not in encoded:
+                encoded[codec] = message.to_bytes(codec)
+            self._write(client_id, encoded[codec], key)
+
+    def broadcast_message(self, message):
+        """Broadcast message to all clients"""
+        if self.running:
+            self._loop.call_soon_threadsafe(self._write_all, message)
+
+    def send_to_clients(self, client_ids, message):
+        """Send one message to several clients"""
+        if self.running:
+            self._loop.call_soon_threadsafe(self._write_all, message, list(client_ids))
+
+    def send_to_client(self, client_id, message):
+        """Send message to specific client"""
+        if not self.running or client_id not in self.clients:
+            return
+        data = message.to_bytes(self.client_codecs.get(client_id, self.codec))
+        self._loop.call_soon_threadsafe(self._write, client_id, data, stale_key(message))
+
+    def flush(self):
+        """Send everything queued this tick, one write per client"""
+        if self.running:
+            self._loop.call_soon_threadsafe(self._flush_all)
+
+    def get_message(self):
+        """Get next message from queue"""
+        try:
+            return self.message_queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    async def _shutdown(self):
+        """Stop accepting, flush what clients can take, then close them"""
+        if self._server is not None:
+            self._server.close()
+
+        self._flush_all()  # Batched sends not yet flushed
+        writers = [writer for writer, _ in self.clients.values()]
+        if writers:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(writer.drain() for writer in writers), return_exceptions=True),
+                    self.shutdown_timeout)
+            except asyncio.TimeoutError:
+                pass
+        for writer in writers:
+            writer.close()
+
+        handlers = list(self._handlers)
+        for task in handlers:
+            task.cancel()
+        if handlers:
+            await asyncio.gather(*handlers, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    def stop(self):
+        """Stop the server"""
+        if not self.running:
+            return
+        self.running = False
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not threading.current_thread():
+            self._thread.join(self.shutdown_timeout + 1.0)
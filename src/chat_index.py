@@ -0,0 +1,179 @@
+import json
+import os
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text):
+    """Lowercase word tokens of a chat message, each once"""
+    return set(TOKEN_RE.findall(str(text).lower()))
+
+class ChatIndex:
+    """Inverted index over a ChatLog for moderation searches.
+
+    Maps each token and each player id to the ascending ids of the messages
+    containing it, and keeps every message's timestamp so a time range
+    becomes an id range by binary search. A query intersects a few sorted
+    lists instead of reading the log.
+
+    The index is split along the log's segments. Only the open segment's
+    part is built in memory; each full segment's part is saved next to it
+    as <segment>.idx.json and read back when a query reaches it, with the
+    parts of a few recently searched segments cached. Beyond that only each
+    segment's first timestamp stays in memory, to pick the segments a time
+    range touches, so the index stays small however long the history grows.
+    On open, a full segment missing its file is re-indexed from the log.
+    """
+    def __init__(self, log, cached_segments=4):
+        self.log = log
+        self.cached_segments = cached_segments
+        self.first_times = array('d')  # Timestamp of each segment's first message
+        self._last_time = None  # Newest timestamp indexed
+        self._parts = OrderedDict()  # {segment: saved part}, LRU
+        self._segment = self._new_segment()  # The open segment's part, saved when it fills
+        if log.directory is not None:
+            self._load()
+
+    @staticmethod
+    def _new_segment():
+        return {'times': [], 'tokens': {}, 'players': {}}
+
+    def index_path(self, segment):
+        return os.path.join(self.log.directory, f"{segment:06d}.idx.json")
+
+    def _load(self):
+        size = self.log.segment_messages
+        full_segments = len(self.log) // size
+        for segment in range(full_segments):
+            part = self._read(segment)
+            if part is None:
+                for message in self.log.read(segment * size, size):
+                    self.add(message)  # Saves the part again once the segment is indexed
+                continue
+            self.first_times.append(part['times'][0])
+            self._last_time = part['times'][-1]
+        for message in self.log.read(full_segments * size):
+            self.add(message)
+
+    def _read(self, segment):
+        """A saved segment part, or None if its file is missing or incomplete"""
+        try:
+            with open(self.index_path(segment)) as f:
+                part = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if len(part['times']) != self.log.segment_messages:
+            return None
+        part['players'] = dict(part['players'])
+        return part
+
+    def add(self, message):
+        """Index a message that was just appended to the log (in id order)"""
+        message_id = message['id']
+        timestamp = message.get('timestamp') or 0.0
+        if self._last_time is not None and timestamp < self._last_time:
+            timestamp = self._last_time  # Keep times sorted if the clock steps back
+        self._last_time = timestamp
+        if not self._segment['times']:
+            self.first_times.append(timestamp)
+        self._index(self._segment, message, timestamp)
+
+        if (message_id + 1) % self.log.segment_messages == 0:
+            self._save(message_id // self.log.segment_messages)
+
+    @staticmethod
+    def _index(part, message, timestamp):
+        message_id = message['id']
+        part['times'].append(timestamp)
+        for token in tokenize(message.get('text', '')):
+            part['tokens'].setdefault(token, []).append(message_id)
+        part['players'].setdefault(message.get('player_id'), []).append(message_id)
+
+    def _reindex(self, segment):
+        """Rebuild a full segment's part from the log if its file has gone"""
+        part = self._new_segment()
+        timestamp = self.first_times[segment]
+        for message in self.log.read(segment * self.log.segment_messages, self.log.segment_messages):
+            timestamp = max(timestamp, message.get('timestamp') or 0.0)
+            self._index(part, message, timestamp)
+        return part
+
+    def _save(self, segment):
+        part = self._segment
+        self._segment = self._new_segment()
+        path = self.index_path(segment)
+        data = json.dumps({'times': part['times'], 'tokens': part['tokens'],
+                           'players': list(part['players'].items())}, separators=(',', ':'))
+        with open(path + '.tmp', 'w') as f:
+            f.write(data)  # One-shot dumps uses the C encoder; json.dump would not
+        os.replace(path + '.tmp', path)
+
+    def _part(self, segment):
+        """The index part for a segment: the open one, a cached one or one read from disk"""
+        if segment == len(self.first_times) - 1 and self._segment['times']:
+            return self._segment
+        part = self._parts.get(segment)
+        if part is None:
+            part = self._read(segment) or self._reindex(segment)
+            self._parts[segment] = part
+            while len(self._parts) > self.cached_segments:
+                self._parts.popitem(last=False)
+        else:
+            self._parts.move_to_end(segment)
+        return part
+
+    def search(self, player_id=None, start=None, end=None, keyword=None, limit=100):
+        """Ids of matching messages, newest first.
+
+        player_id, a [start, end) time range and keyword (every word must
+        appear) are all optional and combine with AND.
+        """
+        words = None
+        if keyword is not None:
+            words = tokenize(keyword)
+            if not words:
+                return []
+
+        # Segments that can hold times in [start, end), newest first
+        first = 0 if start is None else max(0, bisect_left(self.first_times, start) - 1)
+        last = len(self.first_times) if end is None else bisect_left(self.first_times, end)
+        size = self.log.segment_messages
+        results = []
+        for segment in range(last - 1, first - 1, -1):
+            if len(results) >= limit:
+                break
+            part = self._part(segment)
+            times = part['times']
+            base = segment * size
+            lo = base + (0 if start is None else bisect_left(times, start))
+            hi = base + (len(times) if end is None else bisect_left(times, end))
+            if lo >= hi:
+                continue
+
+            lists = []
+            if player_id is not None:
+                lists.append(part['players'].get(player_id, ()))
+            if words is not None:
+                lists.extend(part['tokens'].get(word, ()) for word in words)
+            if not lists:
+                results.extend(range(hi - 1, max(lo, hi - (limit - len(results))) - 1, -1))
+                continue
+
+            # Walk the shortest list newest first, probing the others by bisection
+            lists.sort(key=len)
+            shortest, others = lists[0], lists[1:]
+            index = bisect_left(shortest, hi) - 1
+            stop = bisect_left(shortest, lo)
+            while index >= stop and len(results) < limit:
+                message_id = shortest[index]
+                if all(_contains(ids, message_id) for ids in others):
+                    results.append(message_id)
+                index -= 1
+        return results
+
+def _contains(ids, value):
+    index = bisect_right(ids, value) - 1
+    return index >= 0 and ids[index] == value
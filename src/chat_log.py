@@ -0,0 +1,139 @@
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from itertools import accumulate
+
+_encode = json.JSONEncoder(separators=(',', ':')).encode  # Reused: json.dumps with options builds one per call
+
+class ChatLog:
+    """Append-only chat history on disk, split into fixed-size segments.
+
+    Each segment is a JSON-lines file holding segment_messages messages, so
+    message id n lives in segment n // segment_messages. Only the open
+    segment's file handle and the line offsets of a few recently read
+    segments are kept in memory, however long the history grows. Opening an
+    existing directory resumes the log, dropping a torn last line left by a
+    crash.
+
+    With no directory the log lives in a temporary directory, created on the
+    first message and removed with the log.
+    """
+    def __init__(self, directory=None, segment_messages=4096, cached_segments=4):
+        self._tempdir = None
+        self.directory = directory
+        self.segment_messages = segment_messages
+        self.cached_segments = cached_segments
+        self._offsets = OrderedDict()  # {segment: [byte offset of each line, end]}, LRU
+        self._file = None  # Open segment, appended to
+        self._dirty = False  # Writes not flushed yet
+        self.count = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._recover()
+
+    def segment_path(self, segment):
+        return os.path.join(self.directory, f"{segment:06d}.jsonl")
+
+    def _recover(self):
+        segments = sorted(int(name[:-6]) for name in os.listdir(self.directory)
+                          if name.endswith('.jsonl') and name[:-6].isdigit())
+        if not segments:
+            return
+        last = segments[-1]
+        offsets = self._scan(last)
+        with open(self.segment_path(last), 'rb+') as f:
+            f.truncate(offsets.pop())  # Cut any torn last line
+        self.count = last * self.segment_messages + len(offsets)
+
+    def _scan(self, segment):
+        """Byte offsets of each complete line in a segment, plus the end offset"""
+        with open(self.segment_path(segment), 'rb') as f:
+            lines = f.read().split(b'\n')
+        # The last piece is empty, or a torn line without its newline
+        offsets = [0]
+        offsets.extend(accumulate(map((1).__add__, map(len, lines[:-1]))))
+        return offsets
+
+    def append(self, message):
+        """Write a message (a JSON-serializable dict); returns its id"""
+        message_id = self.count
+        segment, index = divmod(message_id, self.segment_messages)
+        if self._file is None or index == 0:
+            if self._file is not None:
+                self._file.close()
+            if self.directory is None:
+                self._tempdir = tempfile.TemporaryDirectory(prefix='chat-')
+                self.directory = self._tempdir.name
+            self._file = open(self.segment_path(segment), 'ab')
+        line = (_encode(message) + '\n').encode('utf-8')
+        self._file.write(line)
+        self._dirty = True
+        self.count += 1
+        offsets = self._offsets.get(segment)
+        if offsets is not None:
+            offsets.append(offsets[-1] + len(line))
+        return message_id
+
+    def flush(self):
+        if self._dirty and self._file is not None:
+            self._file.flush()
+            self._dirty = False
+
+    def _segment_offsets(self, segment):
+        offsets = self._offsets.get(segment)
+        if offsets is None:
+            offsets = self._scan(segment)
+            self._offsets[segment] = offsets
+            while len(self._offsets) > self.cached_segments:
+                self._offsets.popitem(last=False)
+        else:
+            self._offsets.move_to_end(segment)
+        return offsets
+
+    def read(self, offset=0, limit=None):
+        """Get up to limit messages starting at id offset (to the end if limit is None)"""
+        end = self.count if limit is None else min(self.count, offset + limit)
+        offset = max(0, offset)
+        if offset >= end:
+            return []
+        self.flush()
+        messages = []
+        while offset < end:
+            segment, index = divmod(offset, self.segment_messages)
+            count = min(end - offset, self.segment_messages - index)
+            offsets = self._segment_offsets(segment)
+            with open(self.segment_path(segment), 'rb') as f:
+                f.seek(offsets[index])
+                data = f.read(offsets[index + count] - offsets[index])
+            messages.extend(json.loads(line) for line in data.splitlines())
+            offset += count
+        return messages
+
+    def get(self, message_ids):
+        """Get messages by id, in the order given; one file open per segment touched"""
+        self.flush()
+        by_segment = {}
+        for position, message_id in enumerate(message_ids):
+            if 0 <= message_id < self.count:
+                by_segment.setdefault(message_id // self.segment_messages, []).append((position, message_id))
+        found = {}
+        for segment, wanted in by_segment.items():
+            offsets = self._segment_offsets(segment)
+            with open(self.segment_path(segment), 'rb') as f:
+                for position, message_id in wanted:
+                    index = message_id % self.segment_messages
+                    f.seek(offsets[index])
+                    found[position] = json.loads(f.read(offsets[index + 1] - offsets[index]))
+        return [found[position] for position in sorted(found)]
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+            self._tempdir = None
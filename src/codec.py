@@ -0,0 +1,366 @@
+import json
+import struct
+from src.network import MessageType, NetworkMessage
+
+# Binary frames start with a byte that can never begin a UTF-8 JSON
+# document, so one stream decoder can tell the two encodings apart.
+BINARY_MAGIC = 0xB1
+
+# Small integer tags for message types on the wire (append only)
+TYPE_TAGS = {msg_type: tag for tag, msg_type in enumerate(MessageType)}
+TAG_TYPES = {tag: msg_type for msg_type, tag in TYPE_TAGS.items()}
+
+# Per-type field layouts. A message whose data matches its schema exactly is
+# packed field by field; anything else falls back to a JSON body.
+#   uvarint  unsigned LEB128 integer
+#   ovarint  optional unsigned integer (None allowed, e.g. a skip vote)
+#   svarint  zigzag-encoded signed integer
+#   f32      little-endian float32, or float64 for the whole message
+#            (FLAG_WIDE) when a value would not survive float32
+#   str      uvarint length + UTF-8 bytes
+#   bool     single byte
+SCHEMAS = {
+    MessageType.PLAYER_JOIN: (('player_id', 'uvarint'), ('name', 'str')),
+    MessageType.PLAYER_LEAVE: (('player_id', 'uvarint'),),
+    MessageType.PLAYER_MOVE: (('player_id', 'uvarint'), ('x', 'f32'), ('y', 'f32')),
+    MessageType.PLAYER_KILL: (('impostor_id', 'uvarint'), ('victim_id', 'uvarint')),
+    MessageType.PLAYER_VENT: (('player_id', 'uvarint'), ('vent_id', 'uvarint')),
+    MessageType.VOTE_CAST: (('voter_id', 'uvarint'), ('voted_id', 'ovarint')),
+    MessageType.CHAT: (('player_name', 'str'), ('text', 'str')),
+    MessageType.STATE_ACK: (('tick', 'uvarint'),),
+    MessageType.PLAYER_INPUT: (('player_id', 'uvarint'), ('seq', 'uvarint'), ('vx', 'f32'), ('vy', 'f32')),
+    MessageType.UDP_HELLO: (('client_id', 'uvarint'), ('token', 'str')),
+    MessageType.MATCH_JOIN: (('match_id', 'uvarint'), ('name', 'str')),
+}
+
+FLAG_PACKED = 0x01  # Data is schema-packed rather than JSON
+FLAG_SENDER = 0x02  # A sender id follows the flags byte
+FLAG_WIDE = 0x04  # Float fields are float64
+
+_F32 = struct.Struct('<f')
+_F64 = struct.Struct('<d')
+
+class CodecError(ValueError):
+    """Raised when a binary frame cannot be decoded"""
+
+def write_uvarint(out, value):
+    """Append an unsigned LEB128 varint to a bytearray"""
+    if value < 0:
+        raise CodecError("uvarint cannot be negative")
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_uvarint(buf, pos):
+    """Read an unsigned varint, returning (value, new_pos)"""
+    result = 0
+    shift = 0
+    while True:
+        if pos >= len(buf):
+            raise CodecError("truncated varint")
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+        if shift > 63:
+            raise CodecError("varint too long")
+
+def _zigzag(value):
+    return (value << 1) if value >= 0 else ((-value << 1) - 1)
+
+def _unzigzag(value):
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+
+def _fits(kind, value):
+    """Check a value can be packed as kind without losing information"""
+    if kind in ('uvarint', 'svarint', 'ovarint'):
+        if value is None:
+            return kind == 'ovarint'
+        return type(value) is int and (kind == 'svarint' or value >= 0)
+    if kind == 'f32':
+        if type(value) is float:
+            return True
+        try:
+            return type(value) is int and float(value) == value  # Large ints don't survive a float
+        except OverflowError:
+            return False
+    if kind == 'str':
+        return isinstance(value, str)
+    if kind == 'bool':
+        return type(value) is bool
+    return False
+
+def _exact_f32(value):
+    """Check a float field survives float32 unchanged (NaN stays NaN)"""
+    try:
+        packed = _F32.unpack(_F32.pack(value))[0]
+    except OverflowError:
+        return False
+    return packed == value or value != value
+
+def _write_field(out, kind, value):
+    if kind == 'uvarint':
+        write_uvarint(out, value)
+    elif kind == 'ovarint':
+        write_uvarint(out, 0 if value is None else value + 1)
+    elif kind == 'svarint':
+        write_uvarint(out, _zigzag(value))
+    elif kind == 'f32':
+        out += _F32.pack(value)
+    elif kind == 'f64':
+        out += _F64.pack(value)
+    elif kind == 'str':
+        encoded = value.encode('utf-8')
+        write_uvarint(out, len(encoded))
+        out += encoded
+    elif kind == 'bool':
+        out.append(1 if value else 0)
+
+def _read_field(buf, pos, kind):
+    if kind == 'uvarint':
+        return read_uvarint(buf, pos)
+    if kind == 'ovarint':
+        value, pos = read_uvarint(buf, pos)
+        return (None if value == 0 else value - 1), pos
+    if kind == 'svarint':
+        value, pos = read_uvarint(buf, pos)
+        return _unzigzag(value), pos
+    if kind == 'f32':
+        if pos + 4 > len(buf):
+            raise CodecError("truncated float")
+        return _F32.unpack_from(buf, pos)[0], pos + 4
+    if kind == 'f64':
+        if pos + 8 > len(buf):
+            raise CodecError("truncated float")
+        return _F64.unpack_from(buf, pos)[0], pos + 8
+    if kind == 'str':
+        length, pos = read_uvarint(buf, pos)
+        if pos + length > len(buf):
+            raise CodecError("truncated string")
+        return bytes(buf[pos:pos + length]).decode('utf-8'), pos + length
+    if kind == 'bool':
+        if pos >= len(buf):
+            raise CodecError("truncated bool")
+        return buf[pos] != 0, pos + 1
+    raise CodecError(f"unknown field kind {kind}")
+
+class JsonCodec:
+    """The original text encoding: one JSON object per message"""
+    name = 'json'
+
+    def encode(self, message):
+        return message.to_json().encode('utf-8')
+
+class BinaryCodec:
+    """Compact framed binary encoding.
+
+    Frame: magic byte, uvarint body length, then the body: type tag, flags,
+    optional zigzag sender id and the data, either schema-packed or as a
+    length-prefixed JSON object when it doesn't fit the type's schema.
+    """
+    name = 'binary'
+
+    def encode(self, message):
+        if message.sender_id is not None and type(message.sender_id) is not int:
+            # Can't pack this sender id; JSON decodes on the same stream
+            return CODECS['json'].encode(message)
+        body = bytearray()
+        body.append(TYPE_TAGS[message.type])
+        schema = SCHEMAS.get(message.type)
+        data = message.data
+        packed = (schema is not None and isinstance(data, dict) and len(data) == len(schema)
+                  and all(name in data and _fits(kind, data[name]) for name, kind in schema))
+        flags = FLAG_PACKED if packed else 0
+        wide = packed and not all(_exact_f32(data[name]) for name, kind in schema if kind == 'f32')
+        if wide:
+            flags |= FLAG_WIDE
+        if message.sender_id is not None:
+            flags |= FLAG_SENDER
+        body.append(flags)
+        if message.sender_id is not None:
+            write_uvarint(body, _zigzag(message.sender_id))
+
+        if packed:
+            for name, kind in schema:
+                _write_field(body, 'f64' if wide and kind == 'f32' else kind, data[name])
+        else:
+            _write_field(body, 'str', json.dumps(data, separators=(',', ':')))
+
+        frame = bytearray((BINARY_MAGIC,))
+        write_uvarint(frame, len(body))
+        frame += body
+        return bytes(frame)
+
+    def decode_body(self, body):
+        """Decode a frame body (without magic and length) to a message"""
+        if len(body) < 2:
+            raise CodecError("frame too short")
+        msg_type = TAG_TYPES.get(body[0])
+        if msg_type is None:
+            raise CodecError(f"unknown type tag {body[0]}")
+        flags = body[1]
+        pos = 2
+        sender_id = None
+        if flags & FLAG_SENDER:
+            value, pos = read_uvarint(body, pos)
+            sender_id = _unzigzag(value)
+
+        if flags & FLAG_PACKED:
+            schema = SCHEMAS.get(msg_type)
+            if schema is None:
+                raise CodecError(f"no schema for {msg_type.name}")
+            wide = flags & FLAG_WIDE
+            data = {}
+            for name, kind in schema:
+                data[name], pos = _read_field(body, pos, 'f64' if wide and kind == 'f32' else kind)
+        else:
+            text, pos = _read_field(body, pos, 'str')
+            data = json.loads(text)
+        return NetworkMessage(msg_type, sender_id, data)
+
+    def decode(self, frame):
+        """Decode one complete frame"""
+        messages = MessageDecoder().feed(frame)
+        if len(messages) != 1:
+            raise CodecError("expected exactly one frame")
+        return messages[0]
+
+CODECS = {
+    'json': JsonCodec(),
+    'binary': BinaryCodec(),
+}
+
+def get_codec(name):
+    """Look up a codec by name ('json' or 'binary')"""
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown codec: {name}")
+
+class MessageDecoder:
+    """Incremental decoder for a byte stream of JSON and/or binary messages.
+
+    Feed it whatever recv() returned; it returns every complete message and
+    keeps any partial one buffered for the next call. Each message is
+    detected by its first byte, so peers on either codec can share a server.
+    """
+    def __init__(self, max_buffer=1024 * 1024):
+        self.buffer = bytearray()
+        self.max_buffer = max_buffer
+        self.errors = 0  # Frames or documents that failed to decode
+        self._scan = (0, 0, False, False)  # (pos, depth, in_string, escaped) into a partial JSON document
+        self._binary = CODECS['binary']
+
+    def feed(self, data):
+        self.buffer += data
+        messages = []
+        while self.buffer:
+            # Skip whitespace between JSON documents
+            if self.buffer[0] in b' \t\r\n':
+                del self.buffer[0]
+                continue
+            if self.buffer[0] == BINARY_MAGIC:
+                consumed = self._take_binary(messages)
+            else:
+                consumed = self._take_json(messages)
+            if not consumed:
+                break
+
+        if len(self.buffer) > self.max_buffer:
+            # A peer that never completes a message shouldn't grow us forever
+            self.buffer.clear()
+            self._scan = (0, 0, False, False)
+            self.errors += 1
+        return messages
+
+    def _take_binary(self, messages):
+        try:
+            length, pos = read_uvarint(self.buffer, 1)
+        except CodecError:
+            if len(self.buffer) > 11:
+                # Not a truncated varint but a corrupt one; drop the byte
+                del self.buffer[0]
+                self.errors += 1
+                return True
+            return False
+        if pos + length > len(self.buffer):
+            return False
+        body = bytes(self.buffer[pos:pos + length])
+        del self.buffer[:pos + length]
+        try:
+            messages.append(self._binary.decode_body(body))
+        except (CodecError, ValueError, UnicodeDecodeError):
+            self.errors += 1
+        return True
+
+    def _take_json(self, messages):
+        if self.buffer[0] not in (0x7B, 0x5B):  # '{' or '['
+            self._skip_garbage()
+            return True
+        end = self._document_end()
+        if end is None:
+            return False  # Incomplete document; wait for more data
+        document = bytes(self.buffer[:end])
+        del self.buffer[:end]
+        try:
+            obj = json.loads(document.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            # Complete but malformed: drop it
+            self.errors += 1
+            return True
+
+        for item in (obj if isinstance(obj, list) else [obj]):
+            message = self._message_from_obj(item)
+            if message is None:
+                self.errors += 1
+            else:
+                messages.append(message)
+        return True
+
+    def _document_end(self):
+        """Find where the leading JSON object/array closes, or None if it doesn't yet.
+
+        The scan resumes where the last call stopped, so a large document
+        arriving in many pieces is only scanned once.
+        """
+        pos, depth, in_string, escaped = self._scan
+        buffer = self.buffer
+        for index in range(pos, len(buffer)):
+            byte = buffer[index]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif byte == 0x5C:  # backslash
+                    escaped = True
+                elif byte == 0x22:  # quote
+                    in_string = False
+            elif byte == 0x22:
+                in_string = True
+            elif byte in (0x7B, 0x5B):
+                depth += 1
+            elif byte in (0x7D, 0x5D):
+                depth -= 1
+                if depth == 0:
+                    self._scan = (0, 0, False, False)
+                    return index + 1
+        self._scan = (len(buffer), depth, in_string, escaped)
+        return None
+
+    def _skip_garbage(self):
+        """Drop bytes up to the next place a message could start"""
+        self.errors += 1
+        for index in range(1, len(self.buffer)):
+            if self.buffer[index] in (0x7B, 0x5B, BINARY_MAGIC):  # '{', '[' or magic
+                del self.buffer[:index]
+                return
+        self.buffer.clear()
+
+    @staticmethod
+    def _message_from_obj(obj):
+        try:
+            return NetworkMessage(MessageType(obj['type']), obj['sender_id'], obj['data'])
+        except (KeyError, TypeError, ValueError):
+            return None
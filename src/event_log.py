@@ -0,0 +1,260 @@
+import json
+import mmap
+import struct
+import zlib
+from bisect import bisect_right
+from enum import IntEnum
+from src.codec import CodecError, read_uvarint, write_uvarint
+
+MAGIC = b'AMEV'
+VERSION = 1
+
+class EventType(IntEnum):
+    """Record types in an event log (append only: the values are on disk)"""
+    CHECKPOINT = 0
+    START = 1
+    VELOCITY = 2
+    MOVE = 3
+    KILL = 4
+    VENT = 5
+    MEETING = 6
+    REPORT = 7
+    VOTE = 8
+    VOTE_END = 9
+    TASK = 10
+    CHAT = 11
+    DISCONNECT = 12
+    END = 13
+
+# Payload layout per record type, packed field by field:
+#   uvarint  unsigned LEB128 integer
+#   ovarint  optional unsigned integer (None allowed, e.g. a skip vote)
+#   f64      little-endian float64, so replayed movement is bit-exact
+#   str      uvarint length + UTF-8 bytes
+#   blob     the rest of the record (zlib-compressed JSON checkpoint)
+SCHEMAS = {
+    EventType.CHECKPOINT: ('blob',),
+    EventType.START: ('uvarint',),  # num_impostors
+    EventType.VELOCITY: ('uvarint', 'f64', 'f64'),  # player_id, vx, vy
+    EventType.MOVE: ('uvarint', 'f64', 'f64'),  # player_id, x, y
+    EventType.KILL: ('uvarint', 'uvarint'),  # impostor_id, victim_id
+    EventType.VENT: ('uvarint',),  # player_id
+    EventType.MEETING: (),
+    EventType.REPORT: ('uvarint',),  # reporter_id
+    EventType.VOTE: ('uvarint', 'ovarint'),  # voter_id, voted_id
+    EventType.VOTE_END: (),
+    EventType.TASK: ('uvarint',),  # index into sim.tasks
+    EventType.CHAT: ('uvarint', 'str', 'str'),  # player_id, player_name, text
+    EventType.DISCONNECT: ('uvarint',),  # player_id
+    EventType.END: ('str',),  # winning team
+}
+
+_F64 = struct.Struct('<d')
+_F64_PAIR = struct.Struct('<dd')
+_INDEX_ENTRY = struct.Struct('<QQ')  # (tick, byte offset) of a checkpoint
+
+def _pack(out, kind, value):
+    if kind == 'uvarint':
+        write_uvarint(out, value)
+    elif kind == 'ovarint':
+        write_uvarint(out, 0 if value is None else value + 1)
+    elif kind == 'f64':
+        out += _F64.pack(value)
+    elif kind == 'str':
+        data = str(value).encode('utf-8')
+        write_uvarint(out, len(data))
+        out += data
+    else:
+        out += value
+
+def _read_uvarint(buf, pos):
+    byte = buf[pos]
+    if byte < 0x80:  # Ids and lengths nearly always fit in one byte
+        return byte, pos + 1
+    return read_uvarint(buf, pos)
+
+def _unpack(buf, pos, end, kind):
+    if kind == 'uvarint':
+        return _read_uvarint(buf, pos)
+    if kind == 'ovarint':
+        value, pos = _read_uvarint(buf, pos)
+        return (None if value == 0 else value - 1), pos
+    if kind == 'f64':
+        return _F64.unpack_from(buf, pos)[0], pos + 8
+    if kind == 'str':
+        length, pos = read_uvarint(buf, pos)
+        return buf[pos:pos + length].decode('utf-8'), pos + length
+    return buf[pos:end], end
+
+def _decoder(schema):
+    """Payload decoder for one record type: (buf, pos, end) -> list of fields"""
+    if schema == ('uvarint', 'f64', 'f64'):
+        # Velocities and moves are most of a log; decode them in one go
+        def decode(buf, pos, end):
+            player_id, pos = _read_uvarint(buf, pos)
+            return [player_id, *_F64_PAIR.unpack_from(buf, pos)]
+        return decode
+
+    def decode(buf, pos, end):
+        fields = []
+        for kind in schema:
+            value, pos = _unpack(buf, pos, end, kind)
+            fields.append(value)
+        return fields
+    return decode
+
+_DECODERS = {event_type: _decoder(schema) for event_type, schema in SCHEMAS.items()}
+_DECODERS[EventType.CHECKPOINT] = lambda buf, pos, end: []  # Decoded on demand by checkpoint()
+_EVENT_TYPES = {int(event_type): event_type for event_type in EventType}
+
+def capture_checkpoint(sim):
+    """Full simulation state at the start of the current tick, as plain data.
+
+    Unlike a network snapshot nothing is rounded or left out: a Replay
+    restores a match from it and continues bit for bit.
+    """
+    votes = sim.vote_manager
+    return {
+        'tick': sim.tick_count,
+        'state': sim.current_state.name,
+        'meetings_left': sim.emergency_meetings_left,
+        'next_player_id': sim.next_player_id,
+        'game_over': sim.game_over,
+        'winner': sim.winning_team,
+        'voting_started_tick': sim._voting_started_tick,
+        'players': [[p.id, p.name, p.color.name, p.role.name, p.x, p.y, p.velocity_x, p.velocity_y, p.is_alive]
+                    for p in sim.players.values()],
+        'impostors': [p.id for p in sim.impostors],
+        'tasks': [[t.assigned_to_player_id, t.task_type, t.completed] for t in sim.tasks],
+        'disconnected': sorted(sim.disconnected),
+        'voting_active': votes.voting_active,
+        'candidates': list(votes.vote_counts),
+        'votes': list(votes.votes.items()),
+        'kill_times': list(sim.kill_manager.last_kill_time.items()),
+        'vent_times': list(sim.vent_manager.last_vent_time.items()),
+        'bodies': [[key, x, y] for key, (x, y, _) in sim.body_index.positions.items()],
+        'rng': sim.rng.getstate(),
+        'digest': sim.state_digest(),
+    }
+
+class EventLogWriter:
+    """Append-only binary log of one match.
+
+    The file starts with MAGIC, a version byte and a JSON header (seed,
+    tick rate, map size...). Each record after that is a type byte, the
+    tick as a uvarint, the payload length as a uvarint and the payload laid
+    out by SCHEMAS, so a typical input is 5-20 bytes. Checkpoints are
+    records too; their (tick, offset) pairs also go to a small <path>.idx
+    file so a reader can seek without scanning the log.
+    """
+    def __init__(self, path, header, checkpoint_interval=600):
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval  # Ticks between periodic checkpoints
+        self.last_checkpoint_tick = None
+        self.file = open(path, 'wb')
+        self.index_file = open(path + '.idx', 'wb')
+        head = bytearray(MAGIC)
+        head.append(VERSION)
+        _pack(head, 'str', json.dumps(header))
+        self.file.write(head)
+
+    def write(self, tick, event_type, *fields):
+        """Append one event recorded at tick"""
+        payload = bytearray()
+        for kind, value in zip(SCHEMAS[event_type], fields):
+            _pack(payload, kind, value)
+        record = bytearray((event_type,))
+        write_uvarint(record, tick)
+        write_uvarint(record, len(payload))
+        record += payload
+        self.file.write(record)
+
+    def checkpoint(self, tick, state):
+        """Append a checkpoint and index it; everything up to it is flushed to disk"""
+        offset = self.file.tell()
+        self.write(tick, EventType.CHECKPOINT, zlib.compress(json.dumps(state, separators=(',', ':')).encode('utf-8')))
+        self.file.flush()
+        self.index_file.write(_INDEX_ENTRY.pack(tick, offset))
+        self.index_file.flush()
+        self.last_checkpoint_tick = tick
+
+    def close(self):
+        self.file.close()
+        self.index_file.close()
+
+class EventLogReader:
+    """Memory-mapped reader for an event log.
+
+    Records are decoded straight out of the mapping, so opening a long
+    match costs nothing up front. checkpoints holds (tick, offset) pairs in
+    tick order, from the .idx file or, if that is missing, from one scan of
+    the log. A torn record at the end (from a crash) ends the log.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = self._mmap
+        if buf[:len(MAGIC)] != MAGIC:
+            raise CodecError(f"{path} is not an event log")
+        if buf[len(MAGIC)] != VERSION:
+            raise CodecError(f"Unsupported event log version {buf[len(MAGIC)]}")
+        header, self.data_start = _unpack(buf, len(MAGIC) + 1, None, 'str')
+        self.header = json.loads(header)
+        self.checkpoints = self._load_index()
+        self.checkpoint_ticks = [tick for tick, _ in self.checkpoints]
+
+    def _load_index(self):
+        try:
+            with open(self.path + '.idx', 'rb') as f:
+                data = f.read()
+        except OSError:
+            data = None
+        if data is not None:
+            entries = [entry for entry in _INDEX_ENTRY.iter_unpack(data[:len(data) - len(data) % _INDEX_ENTRY.size])
+                       if entry[1] < len(self._mmap)]
+            if entries:
+                return entries
+        return [(tick, offset) for offset, _, event_type, tick, _, _ in self.records()
+                if event_type == EventType.CHECKPOINT]
+
+    def records(self, offset=None):
+        """Yield (offset, next_offset, type, tick, payload start, payload end) for each whole record"""
+        buf = self._mmap
+        size = len(buf)
+        pos = self.data_start if offset is None else offset
+        while pos < size:
+            try:
+                tick, start = _read_uvarint(buf, pos + 1)
+                length, start = _read_uvarint(buf, start)
+            except (CodecError, IndexError):
+                return
+            end = start + length
+            if end > size:
+                return
+            yield pos, end, buf[pos], tick, start, end
+            pos = end
+
+    def events(self, offset=None):
+        """Yield (next_offset, tick, EventType, fields) from offset on; checkpoints carry no fields"""
+        buf = self._mmap
+        types = _EVENT_TYPES
+        decoders = _DECODERS
+        for _, next_offset, event_type, tick, pos, end in self.records(offset):
+            yield next_offset, tick, types[event_type], decoders[event_type](buf, pos, end)
+
+    def checkpoint(self, offset):
+        """Decode the checkpoint record at offset; returns (state, offset after it)"""
+        for _, next_offset, event_type, _, start, end in self.records(offset):
+            if event_type != EventType.CHECKPOINT:
+                break
+            return json.loads(zlib.decompress(self._mmap[start:end])), next_offset
+        raise CodecError(f"No checkpoint at offset {offset}")
+
+    def find_checkpoint(self, tick):
+        """(tick, offset) of the last checkpoint at or before tick, or None"""
+        index = bisect_right(self.checkpoint_ticks, tick) - 1
+        return self.checkpoints[index] if index >= 0 else None
+
+    def close(self):
+        self._mmap.close()
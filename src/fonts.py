@@ -0,0 +1,86 @@
+import pygame
+from collections import OrderedDict
+
+class FontRegistry:
+    """Shared pygame fonts, created once per (name, size)"""
+    def __init__(self):
+        self.fonts = {}
+
+    def get(self, size, name=None):
+        """Get the font for a size, loading it on first use"""
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(name, size)
+            self.fonts[key] = font
+        return font
+
+    def clear(self):
+        self.fonts.clear()
+
+class TextCache:
+    """LRU cache of rendered text surfaces.
+
+    Surfaces are keyed by (text, size, color, antialias) and shared between
+    callers, so they must only be blitted, never drawn on. The cache is
+    bounded both by entry count and by total pixel memory.
+    """
+    def __init__(self, fonts=None, max_entries=512, max_bytes=8 * 1024 * 1024):
+        self.fonts = fonts or FontRegistry()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # {key: (surface, bytes)}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, text, size, color, antialias=True):
+        """Get a rendered surface for text, rendering it only on a miss"""
+        key = (text, size, tuple(color), antialias)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        surface = self.fonts.get(size).render(text, antialias, color)
+        surface_bytes = surface.get_width() * surface.get_height() * surface.get_bytesize()
+        self.entries[key] = (surface, surface_bytes)
+        self.total_bytes += surface_bytes
+
+        # Evict least recently used entries until back under both limits
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            _, (_, evicted_bytes) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_bytes
+            self.evictions += 1
+        return surface
+
+    def get_stats(self):
+        """Get hit/miss counters and memory use"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+# Shared instances used by every draw path
+font_registry = FontRegistry()
+text_cache = TextCache(font_registry)
+
+def get_font(size):
+    """Get the shared default font for a size"""
+    return font_registry.get(size)
+
+def render_text(text, size, color):
+    """Get a cached antialiased rendering of text"""
+    return text_cache.render(text, size, color)
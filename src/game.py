@@ -1,30 +1,19 @@
 import pygame
 import sys
-import random
 import os
-from src.player import Player, PlayerColor, PlayerRole
-from src.task import Task
-from src.map import GameMap
-from src.impostor_abilities import KillManager, VentManager
-from src.voting import VoteManager
-from src.minigames import TaskMinigameFactory
+from src.player import PlayerColor
+from src.simulation import Simulation, GameState
 from src.ui import LobbyUI, SettingsUI, HUD, UIState
-from src.systems import SoundManager, ChatManager, StatisticsTracker
-from src.network import NetworkServer, NetworkClient, MessageType
-from enum import Enum
+from src.network import MessageType, NetworkMessage
+from src.fonts import render_text
+from src.snapshot import SnapshotReplicator, SnapshotReceiver, capture_snapshot, apply_snapshot
+from src.interest import InterestManager
+from src.udp import UdpClientChannel, MovementPredictor, InputBuffer
 
-class GameState(Enum):
-    LOBBY = 1
-    DISCUSSION = 2
-    PLAYING = 3
-    VOTING = 4
-    GAME_OVER = 5
-
-class Game:
-    def __init__(self, width=1280, height=720, multiplayer=False, enable_sound=True, record_frames=False, record_dir="snapshots", record_duration=None):
+class Game(Simulation):
+    def __init__(self, width=1280, height=720, multiplayer=False, enable_sound=True, record_frames=False, record_dir="snapshots", record_duration=None, seed=None, dirty_rects=False):
         pygame.init()
-        self.width = width
-        self.height = height
+        super().__init__(width, height, enable_sound=enable_sound, seed=seed)
         self.screen = pygame.display.set_mode((width, height))
         pygame.display.set_caption("Among Us Clone")
         
@@ -32,21 +21,6 @@ class Game:
         self.fps = 60
         self.running = True
         
-        self.players = {}
-        self.current_state = GameState.LOBBY
-        self.tasks = []
-        self.impostors = []
-        self.emergency_meetings_left = 1
-        self.next_player_id = 1
-        
-        # Game systems
-        self.game_map = GameMap(width, height)
-        self.kill_manager = KillManager()
-        self.vent_manager = VentManager()
-        self.vote_manager = VoteManager()
-        self.sound_manager = SoundManager(enable_sound=enable_sound)
-        self.chat_manager = ChatManager()
-        self.stats_tracker = StatisticsTracker()
         self.hud = HUD(width, height)
         
         # UI
@@ -54,14 +28,28 @@ class Game:
         self.settings_ui = SettingsUI(width, height)
         self.ui_state = UIState.MAIN_MENU
         
+        # Rendering: in dirty-rect mode only changed areas are presented
+        self.dirty_rects = dirty_rects
+        self._drawn_rects = []  # Areas drawn over the background last frame
+        self._drawn_background = None  # Background the screen was last built on
+        
         # Networking
         self.multiplayer = multiplayer
         self.network_server = None
         self.network_client = None
+        self.snapshot_interval = 3  # Ticks between GAME_STATE updates
+        self.snapshot_replicator = SnapshotReplicator()
+        self.snapshot_receiver = SnapshotReceiver()
+        self.interest = InterestManager(self.game_map)  # Who hears about which player
+        self.local_player_id = 1  # Player driven by this machine's keyboard
+        self.udp_server = None  # Optional UdpServerChannel for moves and snapshots
+        self.input_buffer = InputBuffer()  # Inputs from predicting UDP clients
+        self._udp_acks_sent = {}  # {client_id: input ack last sent}
+        self.use_udp = False  # Client: move over UDP when the server offers it
+        self.udp_client = None
+        self.predictor = None
         
         # Game state
-        self.game_over = False
-        self.winning_team = None
         self.minigame_active = False
         self.current_minigame = None
         # Recording screenshots (for headless viewing)
@@ -75,56 +63,6 @@ class Game:
             except Exception:
                 pass
 
-    def add_player(self, name, color):
-        """Add a new player to the game"""
-        player = Player(self.next_player_id, name, color)
-        player.x = self.width // 2 + random.randint(-100, 100)
-        player.y = self.height // 2 + random.randint(-100, 100)
-        self.players[self.next_player_id] = player
-        self.stats_tracker.create_player_stat(self.next_player_id, name)
-        self.next_player_id += 1
-        return player
-
-    def start_game(self, num_impostors=1):
-        """Start the game and assign roles"""
-        if len(self.players) < 4:
-            print("Need at least 4 players to start")
-            return False
-        
-        player_list = list(self.players.values())
-        
-        # Randomly assign impostors
-        import random
-        random.shuffle(player_list)
-        self.impostors = player_list[:num_impostors]
-        
-        for impostor in self.impostors:
-            impostor.set_role(PlayerRole.IMPOSTOR)
-        
-        # Create tasks for crewmates
-        self.create_tasks()
-        
-        self.current_state = GameState.PLAYING
-        return True
-
-    def create_tasks(self):
-        """Create tasks for the game"""
-        task_types = [
-            "Fix Wiring",
-            "Swipe Card",
-            "Start Reactor",
-            "Divert Power",
-        ]
-        
-        for player in self.players.values():
-            if player.role == PlayerRole.CREWMATE:
-                # Assign 2-3 tasks per crewmate
-                num_tasks = random.randint(2, 3)
-                for _ in range(num_tasks):
-                    task_type = random.choice(task_types)
-                    task = Task(player.id, task_type)
-                    self.tasks.append(task)
-
     def handle_events(self):
         """Handle user input and events"""
         for event in pygame.event.get():
@@ -135,26 +73,13 @@ class Game:
                     self.running = False
                 elif event.key == pygame.K_e and self.current_state == GameState.PLAYING:
                     # Emergency meeting
-                    if self.emergency_meetings_left > 0:
-                        self.start_voting()
-                        self.emergency_meetings_left -= 1
-                        self.sound_manager.play_sound('emergency')
+                    self.call_emergency_meeting()
                 elif event.key == pygame.K_k and self.current_state == GameState.PLAYING:
                     # Kill key (for testing)
-                    if 1 in self.players and 2 in self.players:
-                        self.kill_manager.execute_kill(self.players[1], self.players[2])
-                        self.sound_manager.play_sound('kill')
+                    self.try_kill(1, 2)
                 elif event.key == pygame.K_v and self.current_state == GameState.PLAYING:
                     # Vent key (for testing)
-                    if 1 in self.players:
-                        player = self.players[1]
-                        vent = self.game_map.get_vent_near(player.x, player.y)
-                        if vent and player.role == PlayerRole.IMPOSTOR:
-                            # Find connected vent
-                            if vent.connected_vent_id in self.game_map.vents:
-                                connected = self.game_map.vents[vent.connected_vent_id]
-                                self.vent_manager.execute_vent(player, vent, connected, self.game_map)
-                                self.sound_manager.play_sound('vent')
+                    self.try_vent(1)
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 self.handle_click(event.pos)
         
@@ -195,13 +120,21 @@ class Game:
                 self.sound_manager.play_sound('button_click')
 
     def update(self):
-        """Update game logic"""
-        if self.current_state == GameState.PLAYING:
-            for player in self.players.values():
-                player.update()
-            
-            # Check if game should end
-            self.check_game_end()
+        """Advance game logic by one fixed tick"""
+        if self.udp_server:
+            # Predicting clients move one buffered input per tick
+            while True:
+                item = self.udp_server.get_message()
+                if not item:
+                    break
+                client_id, msg = item
+                player = self.players.get(self.interest.viewers.get(client_id))
+                data = msg.data if isinstance(msg.data, dict) else {}
+                if msg.type == MessageType.PLAYER_INPUT and player and data.get('player_id') == player.id:
+                    self.input_buffer.add(player.id, data.get('seq'), data.get('vx'), data.get('vy'), player.speed)
+            self.input_buffer.apply(self.players)
+        
+        super().update()
         
         # Process network messages if multiplayer
         if self.network_client and self.network_client.connected:
@@ -210,62 +143,198 @@ class Game:
                 if not msg:
                     break
                 self.handle_network_message(msg)
+        
+        if self.udp_client:
+            self.update_prediction()
+        
+        if self.network_server and self.network_server.running:
+            while True:
+                item = self.network_server.get_message()
+                if not item:
+                    break
+                client_id, msg = item
+                self.handle_client_message(client_id, msg)
+            self.send_player_moves()
+            if self.tick_count % self.snapshot_interval == 0:
+                self.send_snapshots()
+            self.network_server.flush()
+        
+        if self.network_client and self.network_client.connected:
+            self.network_client.flush()
 
-    def start_voting(self):
-        """Start voting phase"""
-        self.current_state = GameState.VOTING
-        self.vote_manager.start_voting(self.players)
-        self.sound_manager.play_sound('vote')
+    def handle_client_message(self, client_id, message):
+        """Server: apply one client message, acting only for the client's own player"""
+        data = message.data if isinstance(message.data, dict) else {}
+        if message.type == MessageType.STATE_ACK:
+            self.snapshot_replicator.acknowledge(client_id, data.get('tick'))
+            return
+        if message.type == MessageType.PLAYER_JOIN:
+            self.join_client(client_id, data.get('name'))
+            return
+        
+        player = self.players.get(self.interest.viewers.get(client_id))
+        if player is None:
+            return
+        if message.type == MessageType.PLAYER_MOVE:
+            if player.is_alive and self.current_state == GameState.PLAYING:
+                self.move_player(player.id, data.get('x', player.x), data.get('y', player.y))
+        elif message.type == MessageType.VOTE_CAST:
+            self.queue_vote(player.id, data.get('voted_id'))
+        elif message.type == MessageType.CHAT:
+            self.add_chat_message(player.name, player.id, str(data.get('text', '')))
+
+    def join_client(self, client_id, name):
+        """Server: bind a joining client to a new player of its own.
 
-    def end_game(self, winning_team):
-        """End the game"""
-        self.game_over = True
-        self.winning_team = winning_team
-        self.sound_manager.play_sound('eject')
+        A client is only ever bound to the player created for it, so it
+        can't take over another player's view. Joins after the lobby are
+        refused; a client that already joined is told its player again.
+        """
+        player = self.players.get(self.interest.viewers.get(client_id))
+        if player is None and self.current_state == GameState.LOBBY:
+            colors = list(PlayerColor)
+            player = self.add_player(str(name or f"Player {client_id}"), colors[len(self.players) % len(colors)])
+            self.interest.set_viewer(client_id, player.id)
+            if self.udp_server:
+                # Offer the UDP channel; the token binds the client's address
+                self.network_server.send_to_client(client_id, NetworkMessage(MessageType.UDP_HELLO, 0, {
+                    'client_id': client_id,
+                    'token': self.udp_server.register(client_id),
+                    'port': self.udp_server.port,
+                }))
+        self.network_server.send_to_client(client_id, NetworkMessage(MessageType.PLAYER_JOIN, 0, {
+            'player_id': player.id if player else None,
+            'name': player.name if player else None,
+        }))
 
-    def check_game_end(self):
-        """Check win/loss conditions"""
-        alive_players = [p for p in self.players.values() if p.is_alive]
-        alive_crewmates = [p for p in alive_players if p.role == PlayerRole.CREWMATE]
-        alive_impostors = [p for p in alive_players if p.role == PlayerRole.IMPOSTOR]
+    def send_player_moves(self):
+        """Send each client the player movement relevant to it this tick"""
+        clients = list(self.network_server.clients)
+        for client_id in set(self.interest.sent_positions) | set(self.interest.viewers):
+            if client_id not in self.network_server.clients:
+                player_id = self.interest.viewers.get(client_id)
+                self.interest.remove_client(client_id)
+                if player_id is not None and self.current_state != GameState.LOBBY:
+                    self.disconnect_player(player_id)
+        self.interest.update(self.players)
+        plan = self.interest.plan_moves(clients, self.players, self.tick_count)
         
-        # Impostors win if they equal or outnumber crewmates
-        if len(alive_impostors) >= len(alive_crewmates) and len(alive_crewmates) > 0:
-            self.end_game("IMPOSTORS")
-            for impostor in alive_impostors:
-                self.stats_tracker.add_game_win(impostor.id, "IMPOSTOR")
-            for crewmate in alive_crewmates:
-                self.stats_tracker.add_game_loss(crewmate.id, "CREWMATE")
+        if self.udp_server:
+            # Predicting clients need their own position whenever their ack moves on
+            for client_id in clients:
+                player = self.players.get(self.interest.viewers.get(client_id))
+                ack = self.input_buffer.acked.get(player.id) if player else None
+                if ack is None or self._udp_acks_sent.get(client_id) == ack:
+                    continue
+                self._udp_acks_sent[client_id] = ack
+                moved = plan.setdefault(client_id, [])
+                if player not in moved:
+                    moved.append(player)
         
-        # Crewmates win if all tasks are completed
-        completed_tasks = sum(1 for t in self.tasks if t.completed)
-        if completed_tasks == len(self.tasks) and len(self.tasks) > 0:
-            self.end_game("CREWMATES")
-            for crewmate in alive_crewmates:
-                self.stats_tracker.add_game_win(crewmate.id, "CREWMATE")
-            for impostor in alive_impostors:
-                self.stats_tracker.add_game_loss(impostor.id, "IMPOSTOR")
+        for client_id, moved in plan.items():
+            self.send_unreliable(client_id, [NetworkMessage(
+                MessageType.PLAYER_MOVE, 0, {'player_id': player.id, 'x': player.x, 'y': player.y})
+                for player in moved])
+
+    def send_unreliable(self, client_id, messages):
+        """Send moves or snapshots over UDP when the client has it, else TCP"""
+        if self.udp_server:
+            if not self.network_server.clients.get(client_id):
+                self.udp_server.remove_client(client_id)
+                self._udp_acks_sent.pop(client_id, None)
+                return
+            ack = self.input_buffer.acked.get(self.interest.viewers.get(client_id), 0)
+            messages = self.udp_server.send(client_id, messages, ack)
+        for message in messages:
+            self.network_server.send_to_client(client_id, message)
+
+    def send_event(self, message, x, y):
+        """Send an event to the clients that can see where it happened"""
+        if self.network_server and self.network_server.running:
+            clients = list(self.network_server.clients)
+            self.network_server.send_to_clients(
+                self.interest.event_recipients(clients, self.players, x, y), message)
+
+    def try_kill(self, impostor_id, victim_id):
+        if not super().try_kill(impostor_id, victim_id):
+            return False
+        victim = self.players[victim_id]
+        self.send_event(NetworkMessage(MessageType.PLAYER_KILL, 0,
+                                       {'impostor_id': impostor_id, 'victim_id': victim_id}), victim.x, victim.y)
+        return True
+
+    def try_vent(self, player_id):
+        player = self.players.get(player_id)
+        if player is None:
+            return False
+        x, y = player.x, player.y
+        if not super().try_vent(player_id):
+            return False
+        vent = self.game_map.get_vent_near(x, y)
+        self.send_event(NetworkMessage(MessageType.PLAYER_VENT, 0,
+                                       {'player_id': player_id, 'vent_id': vent.id}), x, y)
+        return True
+
+    def send_snapshots(self):
+        """Send each client a GAME_STATE delta against its last acknowledged tick"""
+        replicator = self.snapshot_replicator
+        replicator.record(self.tick_count, capture_snapshot(self))
+        for client_id in list(replicator.sent):
+            if client_id not in self.network_server.clients:
+                replicator.remove_client(client_id)
+        for client_id in list(self.network_server.clients):
+            update = replicator.build_update(
+                client_id, view=lambda snapshot: self.interest.snapshot_view(client_id, snapshot, self))
+            self.send_unreliable(client_id, [NetworkMessage(MessageType.GAME_STATE, 0, update)])
+
+    def update_prediction(self):
+        """Client: send this tick's input and reconcile with the server's positions"""
+        if self.predictor and self.current_state == GameState.PLAYING:
+            self.predictor.record_input()
+            self.udp_client.send(self.predictor.input_messages())
         
-        # Crewmates win if all impostors are eliminated
-        if len(alive_impostors) == 0 and len(alive_crewmates) > 0:
-            self.end_game("CREWMATES")
-            for crewmate in alive_crewmates:
-                self.stats_tracker.add_game_win(crewmate.id, "CREWMATE")
+        while True:
+            msg = self.udp_client.get_message()
+            if not msg:
+                break
+            if (self.predictor and msg.type == MessageType.PLAYER_MOVE
+                    and msg.data.get('player_id') == self.local_player_id):
+                self.predictor.reconcile(msg.data['x'], msg.data['y'], self.udp_client.last_ack)
+            else:
+                self.handle_network_message(msg)
 
     def handle_network_message(self, message):
         """Handle incoming network messages"""
         if message.type == MessageType.GAME_STATE:
-            # Update game state from server
-            pass
+            # Rebuild the server's snapshot and acknowledge it so the next
+            # delta is taken against it
+            snapshot = self.snapshot_receiver.apply(message.data)
+            if snapshot is not None:
+                predicted = (self.local_player_id,) if self.predictor else ()
+                apply_snapshot(self, snapshot, predicted)
+                if self.network_client:
+                    self.network_client.send_message(MessageType.STATE_ACK, {'tick': message.data['tick']})
+        elif message.type == MessageType.GAME_END:
+            # The server decided the match (winner is None if it failed)
+            if not self.game_over:
+                self.end_game(message.data.get('winner'))
+        elif message.type == MessageType.PLAYER_JOIN:
+            # The server's reply names the player it created for us
+            if type(message.data.get('player_id')) is int:
+                self.local_player_id = message.data['player_id']
         elif message.type == MessageType.PLAYER_MOVE:
             # Update player position
             player_id = message.data.get('player_id')
-            if player_id in self.players:
-                self.players[player_id].x = message.data.get('x')
-                self.players[player_id].y = message.data.get('y')
+            self.set_player_position(player_id, message.data.get('x'), message.data.get('y'))
+        elif message.type == MessageType.UDP_HELLO and self.use_udp and self.network_client and not self.udp_client:
+            # Server offers the UDP channel: move the local player with prediction
+            self.udp_client = UdpClientChannel(self.network_client.host, message.data['port'])
+            self.udp_client.start(message.data['client_id'], message.data['token'])
+            if self.local_player_id in self.players:
+                self.predictor = MovementPredictor(self.players[self.local_player_id], self.sim_clock.dt)
         elif message.type == MessageType.CHAT:
             # Add chat message
-            self.chat_manager.add_message(
+            self.add_chat_message(
                 message.data.get('player_name'),
                 message.sender_id,
                 message.data.get('text')
@@ -273,59 +342,86 @@ class Game:
 
     def draw(self):
         """Draw everything on screen"""
+        if self.ui_state == UIState.GAME:
+            self.draw_game()
+            return
+        
+        self._drawn_background = None  # Menus cover the map; redraw it fully later
         self.screen.fill((30, 30, 40))  # Dark background
         
         if self.ui_state == UIState.MAIN_MENU:
             self.lobby_ui.draw(self.screen)
         elif self.ui_state == UIState.SETTINGS:
             self.settings_ui.draw(self.screen)
-        elif self.ui_state == UIState.GAME:
-            # Draw map
-            self.game_map.draw(self.screen)
-            
-            # Draw players
-            for player in self.players.values():
-                player.draw(self.screen)
-            
-            # Draw HUD
-            self.hud.draw(self.screen, self)
-            
-            # Draw game state UI
-            self.draw_game_ui()
         
         pygame.display.flip()
 
+    def draw_game(self):
+        """Draw the in-game view on top of the cached static map layer"""
+        background = self.game_map.get_background()
+        full_redraw = not self.dirty_rects or background is not self._drawn_background
+        
+        # Draw map
+        if full_redraw:
+            self.screen.blit(background, (0, 0))
+        else:
+            # Erase last frame's sprites and text by restoring the background
+            for rect in self._drawn_rects:
+                self.screen.blit(background, rect, rect)
+        
+        # Draw players
+        rects = []
+        for player in self.players.values():
+            rects.extend(player.draw(self.screen))
+        
+        # Draw HUD
+        rects.extend(self.hud.draw(self.screen, self))
+        
+        # Draw game state UI
+        rects.extend(self.draw_game_ui())
+        
+        if full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self._drawn_rects + rects)
+        self._drawn_rects = rects
+        self._drawn_background = background
+
     def draw_game_ui(self):
-        """Draw game-specific UI"""
-        font_small = pygame.font.Font(None, 20)
-        font_large = pygame.font.Font(None, 36)
+        """Draw game-specific UI, returning the screen areas touched"""
+        rects = []
         
         # Draw state
-        state_text = font_small.render(f"State: {self.current_state.name}", True, (255, 255, 255))
-        self.screen.blit(state_text, (10, 10))
+        state_text = render_text(f"State: {self.current_state.name}", 20, (255, 255, 255))
+        rects.append(self.screen.blit(state_text, (10, 10)))
         
         # Draw emergency meetings left
         if self.current_state == GameState.PLAYING:
-            meetings_text = font_small.render(f"Emergency Meetings: {self.emergency_meetings_left}", True, (255, 255, 255))
-            self.screen.blit(meetings_text, (10, 70))
+            meetings_text = render_text(f"Emergency Meetings: {self.emergency_meetings_left}", 20, (255, 255, 255))
+            rects.append(self.screen.blit(meetings_text, (10, 70)))
         
         # Draw game over message
         if self.game_over:
-            game_over_text = font_large.render("GAME OVER", True, (255, 100, 100))
+            game_over_text = render_text("GAME OVER", 36, (255, 100, 100))
             game_over_rect = game_over_text.get_rect(center=(self.width // 2, self.height // 2))
-            self.screen.blit(game_over_text, game_over_rect)
+            rects.append(self.screen.blit(game_over_text, game_over_rect))
             
             if self.winning_team:
-                winner_text = font_large.render(f"{self.winning_team} WIN", True, (100, 255, 100))
+                winner_text = render_text(f"{self.winning_team} WIN", 36, (100, 255, 100))
                 winner_rect = winner_text.get_rect(center=(self.width // 2, self.height // 2 + 50))
-                self.screen.blit(winner_text, winner_rect)
+                rects.append(self.screen.blit(winner_text, winner_rect))
+        
+        return rects
 
     def run(self):
         """Main game loop"""
         start_ticks = pygame.time.get_ticks()
+        frame_seconds = self.sim_clock.dt
         while self.running:
             self.handle_events()
-            self.update()
+            # Run as many fixed ticks as real time allows, then render once
+            for _ in range(self.sim_clock.consume(frame_seconds)):
+                self.update()
             self.draw()
             # Save frame if requested
             if self.record_frames:
@@ -335,7 +431,7 @@ class Game:
                     self._frame_count += 1
                 except Exception:
                     pass
-            self.clock.tick(self.fps)
+            frame_seconds = self.clock.tick(self.fps) / 1000.0
             # Exit after duration if recording for automated captures
             if self.record_frames and self.record_duration is not None:
                 elapsed_ms = pygame.time.get_ticks() - start_ticks
@@ -343,6 +439,11 @@ class Game:
                     self.running = False
         
         pygame.quit()
+        self.close()
+        if self.udp_client:
+            self.udp_client.close()
+        if self.udp_server:
+            self.udp_server.stop()
         if self.network_client:
             self.network_client.disconnect()
         if self.network_server:
@@ -2,22 +2,25 @@ import pygame
 import time
 
 class KillManager:
-    def __init__(self):
+    def __init__(self, clock=None):
         self.kill_cooldown = 25  # Seconds between kills
         self.last_kill_time = {}  # {impostor_id: timestamp}
         self.kill_distance = 50
+        self.clock = clock  # SimulationClock; wall clock if None
+
+    def _now(self):
+        return self.clock.now() if self.clock else time.time()
 
     def can_kill(self, impostor_id):
         """Check if impostor can kill"""
-        current_time = time.time()
-        last_kill = self.last_kill_time.get(impostor_id, 0)
-        return current_time - last_kill >= self.kill_cooldown
+        return self.get_kill_cooldown(impostor_id) == 0
 
     def get_kill_cooldown(self, impostor_id):
         """Get remaining cooldown time"""
-        current_time = time.time()
-        last_kill = self.last_kill_time.get(impostor_id, 0)
-        cooldown = self.kill_cooldown - (current_time - last_kill)
+        last_kill = self.last_kill_time.get(impostor_id)
+        if last_kill is None:
+            return 0
+        cooldown = self.kill_cooldown - (self._now() - last_kill)
         return max(0, cooldown)
 
     def execute_kill(self, impostor, victim):
@@ -28,33 +31,45 @@ class KillManager:
         # Check distance
         dx = impostor.x - victim.x
         dy = impostor.y - victim.y
-        distance = (dx**2 + dy**2) ** 0.5
         
-        if distance > self.kill_distance:
+        if dx * dx + dy * dy > self.kill_distance * self.kill_distance:
             return False
         
         # Execute kill
         victim.kill()
-        self.last_kill_time[impostor.id] = time.time()
+        self.last_kill_time[impostor.id] = self._now()
         return True
 
+    def find_target(self, impostor, players, spatial_index):
+        """Get the nearest living crewmate within kill range, or None"""
+        def is_target(player_id):
+            player = players.get(player_id)
+            return (player is not None and player is not impostor and player.is_alive
+                    and player.role != impostor.role)
+        
+        target_id = spatial_index.nearest(impostor.x, impostor.y, self.kill_distance, is_target)
+        return players.get(target_id) if target_id is not None else None
+
 class VentManager:
-    def __init__(self):
+    def __init__(self, clock=None):
         self.vent_cooldown = 10  # Seconds between vents
         self.last_vent_time = {}  # {impostor_id: timestamp}
         self.vent_duration = 3  # Seconds to complete vent animation
+        self.clock = clock  # SimulationClock; wall clock if None
+
+    def _now(self):
+        return self.clock.now() if self.clock else time.time()
 
     def can_vent(self, impostor_id):
         """Check if impostor can use vent"""
-        current_time = time.time()
-        last_vent = self.last_vent_time.get(impostor_id, 0)
-        return current_time - last_vent >= self.vent_cooldown
+        return self.get_vent_cooldown(impostor_id) == 0
 
     def get_vent_cooldown(self, impostor_id):
         """Get remaining cooldown time"""
-        current_time = time.time()
-        last_vent = self.last_vent_time.get(impostor_id, 0)
-        cooldown = self.vent_cooldown - (current_time - last_vent)
+        last_vent = self.last_vent_time.get(impostor_id)
+        if last_vent is None:
+            return 0
+        cooldown = self.vent_cooldown - (self._now() - last_vent)
         return max(0, cooldown)
 
     def execute_vent(self, impostor, vent_from, vent_to, game_map):
@@ -67,7 +82,6 @@ class VentManager:
             return False
         
         # Teleport
-        impostor.x = vent_to.x
-        impostor.y = vent_to.y
-        self.last_vent_time[impostor.id] = time.time()
+        impostor.set_position(vent_to.x, vent_to.y)
+        self.last_vent_time[impostor.id] = self._now()
         return True
@@ -0,0 +1,184 @@
+from enum import Enum
+from src.simulation import GameState
+from src.snapshot import own_view
+
+class Relevance(Enum):
+    FULL = 0  # Same room or nearby: every update
+    REDUCED = 1  # Visible but distant: every reduced_interval ticks
+    NONE = 2  # Invisible to the viewer: never
+
+class InterestManager:
+    """Decides which player updates each connected client receives.
+
+    Each client views the world through one player. Players in the viewer's
+    room or within near_distance of it are relevant at full rate, other
+    visible players at a reduced rate, and ghosts are invisible to living
+    viewers. Clients without a bound player see everything at full rate.
+
+    Room membership is kept incrementally: update() only touches the
+    subscription sets of clients whose room gained or lost a player.
+    """
+    def __init__(self, game_map, near_distance=250, reduced_interval=10):
+        self.game_map = game_map
+        self.near_distance = near_distance
+        self.reduced_interval = reduced_interval
+        self.viewers = {}  # {client_id: player_id}
+        self.viewer_clients = {}  # {player_id: set(client_id)}
+        self.player_rooms = {}  # {player_id: room_id, -1 outside rooms}
+        self.room_members = {}  # {room_id: set(player_id)}
+        self.subscriptions = {}  # {client_id: set(player_id) in the viewer's room}
+        self.sent_positions = {}  # {client_id: {player_id: (x, y)}}
+
+    def set_viewer(self, client_id, player_id):
+        """Bind a client to the player it views the world through"""
+        self.remove_client(client_id)
+        self.viewers[client_id] = player_id
+        self.viewer_clients.setdefault(player_id, set()).add(client_id)
+        room_id = self.player_rooms.get(player_id, -1)
+        self.subscriptions[client_id] = set(self.room_members.get(room_id, ())) if room_id >= 0 else set()
+        self.sent_positions[client_id] = {}
+
+    def remove_client(self, client_id):
+        player_id = self.viewers.pop(client_id, None)
+        if player_id is not None:
+            clients = self.viewer_clients.get(player_id)
+            if clients:
+                clients.discard(client_id)
+                if not clients:
+                    del self.viewer_clients[player_id]
+        self.subscriptions.pop(client_id, None)
+        self.sent_positions.pop(client_id, None)
+
+    def update(self, players):
+        """Track room changes since the last call"""
+        for player in players.values():
+            room_id = self.game_map.get_room_id_at(player.x, player.y)
+            old_room = self.player_rooms.get(player.id)
+            if room_id == old_room:
+                continue
+            self.player_rooms[player.id] = room_id
+            self._leave_room(player.id, old_room)
+            self._enter_room(player.id, room_id)
+
+        for player_id in [pid for pid in self.player_rooms if pid not in players]:
+            self._leave_room(player_id, self.player_rooms.pop(player_id))
+
+    def _leave_room(self, player_id, room_id):
+        if room_id is None or room_id < 0:
+            return
+        members = self.room_members.get(room_id)
+        if members is None:
+            return
+        members.discard(player_id)
+        for member_id in members:
+            for client_id in self.viewer_clients.get(member_id, ()):
+                self.subscriptions[client_id].discard(player_id)
+        for client_id in self.viewer_clients.get(player_id, ()):
+            self.subscriptions[client_id].clear()
+
+    def _enter_room(self, player_id, room_id):
+        if room_id is None or room_id < 0:
+            return
+        members = self.room_members.setdefault(room_id, set())
+        for member_id in members:
+            for client_id in self.viewer_clients.get(member_id, ()):
+                self.subscriptions[client_id].add(player_id)
+        members.add(player_id)
+        for client_id in self.viewer_clients.get(player_id, ()):
+            self.subscriptions[client_id] = set(members)
+
+    def relevance(self, client_id, player, players):
+        """How often a client should hear about a player"""
+        viewer = players.get(self.viewers.get(client_id))
+        if viewer is None or viewer is player:
+            return Relevance.FULL
+        if not player.is_alive and viewer.is_alive:
+            return Relevance.NONE
+        if player.id in self.subscriptions[client_id]:
+            return Relevance.FULL
+        dx = player.x - viewer.x
+        dy = player.y - viewer.y
+        if dx * dx + dy * dy <= self.near_distance * self.near_distance:
+            return Relevance.FULL
+        return Relevance.REDUCED
+
+    def plan_moves(self, client_ids, players, tick):
+        """Get {client_id: [player, ...]} of position updates due this tick.
+
+        A player is included when its position differs from the last one
+        sent to that client, so a distant player that stops between reduced
+        ticks still gets its final position delivered.
+        """
+        plan = {}
+        for client_id in client_ids:
+            sent = self.sent_positions.setdefault(client_id, {})
+            due = []
+            for player in players.values():
+                position = (player.x, player.y)
+                if sent.get(player.id) == position:
+                    continue
+                relevance = self.relevance(client_id, player, players)
+                if relevance is Relevance.NONE:
+                    continue
+                # Stagger reduced updates across ticks by player id
+                if relevance is Relevance.REDUCED and (tick + player.id) % self.reduced_interval:
+                    continue
+                sent[player.id] = position
+                due.append(player)
+            if due:
+                plan[client_id] = due
+        return plan
+
+    def snapshot_view(self, client_id, snapshot, sim):
+        """Cut a GAME_STATE snapshot down to what a client may see.
+
+        Other living players appear at the position last planned for the
+        client by plan_moves (so it must have run this tick), unreported
+        bodies only where a kill there would have reached the client, and
+        players everyone knows are dead (reported, ejected or gone) as dead
+        with no position. Ghosts, clients without a player, meetings and
+        the end of the game see every player. Cooldowns are the viewer's own.
+        """
+        viewer_id = self.viewers.get(client_id)
+        view = own_view(snapshot, viewer_id)
+        viewer = sim.players.get(viewer_id)
+        if viewer is None or not viewer.is_alive or sim.game_over or sim.current_state != GameState.PLAYING:
+            return view
+        sent = self.sent_positions.get(client_id, {})
+        players = {}
+        for key, entry in snapshot['players'].items():
+            player = sim.players.get(int(key))
+            if player is None:
+                continue
+            if player is viewer:
+                players[key] = entry
+            elif player.id in sim.body_index:
+                x, y = sim.body_index.get_position(player.id)
+                if self.event_recipients([client_id], sim.players, x, y):
+                    players[key] = [round(x, 1), round(y, 1), False]
+            elif not player.is_alive:
+                players[key] = [None, None, False]
+            elif player.id in sent:
+                x, y = sent[player.id]
+                players[key] = [round(x, 1), round(y, 1), True]
+        view['players'] = players
+        return view
+
+    def event_recipients(self, client_ids, players, x, y):
+        """Get the clients that can see an event at (x, y), e.g. a kill"""
+        room_id = self.game_map.get_room_id_at(x, y)
+        near_sq = self.near_distance * self.near_distance
+        recipients = []
+        for client_id in client_ids:
+            viewer = players.get(self.viewers.get(client_id))
+            if viewer is None or not viewer.is_alive:
+                recipients.append(client_id)
+                continue
+            if room_id >= 0 and self.player_rooms.get(viewer.id) == room_id:
+                recipients.append(client_id)
+                continue
+            dx = x - viewer.x
+            dy = y - viewer.y
+            if dx * dx + dy * dy <= near_sq:
+                recipients.append(client_id)
+        return recipients
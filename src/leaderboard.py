@@ -0,0 +1,206 @@
+from bisect import bisect_left, insort
+
+# Sort keys a leaderboard can rank by (all highest first)
+SORT_KEYS = ('win_rate', 'kills', 'tasks_completed', 'games_won')
+
+class SortedKeys:
+    """Sorted multiset with positional access.
+
+    Keys live in a list of sorted chunks of at most 2 * load keys, so an
+    insert or delete only shifts one chunk. A Fenwick tree over the chunk
+    lengths turns "how many keys come before this one" and "which key is at
+    position n" into O(log N) lookups.
+    """
+    def __init__(self, keys=(), load=256):
+        self.load = load
+        self._chunks = []
+        self._maxes = []  # Last key of each chunk
+        self._tree = []  # Fenwick tree over chunk lengths
+        self._len = 0
+        keys = sorted(keys)
+        for start in range(0, len(keys), load):
+            chunk = keys[start:start + load]
+            self._chunks.append(chunk)
+            self._maxes.append(chunk[-1])
+        self._len = len(keys)
+        self._rebuild()
+
+    def __len__(self):
+        return self._len
+
+    def _rebuild(self):
+        tree = [0] + [len(chunk) for chunk in self._chunks]
+        for index in range(1, len(tree)):
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self._tree = tree
+
+    def _bump(self, chunk_index, delta):
+        tree = self._tree
+        index = chunk_index + 1
+        while index < len(tree):
+            tree[index] += delta
+            index += index & -index
+
+    def _before(self, chunk_index):
+        """Number of keys in chunks before chunk_index"""
+        total = 0
+        index = chunk_index
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def add(self, key):
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            self._rebuild()
+            return
+        index = bisect_left(self._maxes, key)
+        if index == len(self._maxes):
+            index -= 1
+            self._maxes[index] = key
+        chunk = self._chunks[index]
+        insort(chunk, key)
+        self._len += 1
+        if len(chunk) > 2 * self.load:
+            self._chunks[index:index + 1] = [chunk[:self.load], chunk[self.load:]]
+            self._maxes[index:index + 1] = [chunk[self.load - 1], chunk[-1]]
+            self._rebuild()
+        else:
+            self._bump(index, 1)
+
+    def remove(self, key):
+        index = bisect_left(self._maxes, key)
+        if index == len(self._maxes):
+            raise KeyError(key)
+        chunk = self._chunks[index]
+        position = bisect_left(chunk, key)
+        if position == len(chunk) or chunk[position] != key:
+            raise KeyError(key)
+        del chunk[position]
+        self._len -= 1
+        if not chunk:
+            del self._chunks[index]
+            del self._maxes[index]
+            self._rebuild()
+            return
+        self._maxes[index] = chunk[-1]
+        self._bump(index, -1)
+
+    def index(self, key):
+        """Position of key (keys equal to it sort after), raising KeyError if absent"""
+        index = bisect_left(self._maxes, key)
+        if index < len(self._maxes):
+            chunk = self._chunks[index]
+            position = bisect_left(chunk, key)
+            if position < len(chunk) and chunk[position] == key:
+                return self._before(index) + position
+        raise KeyError(key)
+
+    def count_before(self, key):
+        """Number of keys strictly less than key"""
+        index = bisect_left(self._maxes, key)
+        if index == len(self._maxes):
+            return self._len
+        return self._before(index) + bisect_left(self._chunks[index], key)
+
+    def slice(self, start, stop):
+        """Keys from position start up to (not including) stop"""
+        start = max(0, start)
+        stop = min(self._len, stop)
+        if start >= stop:
+            return []
+        # Walk down the Fenwick tree to the chunk holding position start
+        tree = self._tree
+        index = 0
+        remaining = start
+        step = 1 << (len(tree).bit_length() - 1)
+        while step:
+            nxt = index + step
+            if nxt < len(tree) and tree[nxt] <= remaining:
+                index = nxt
+                remaining -= tree[nxt]
+            step >>= 1
+        keys = []
+        wanted = stop - start
+        position = remaining
+        while len(keys) < wanted and index < len(self._chunks):
+            chunk = self._chunks[index]
+            keys.extend(chunk[position:position + wanted - len(keys)])
+            index += 1
+            position = 0
+        return keys
+
+class Leaderboard:
+    """Players ordered by one stat, highest first, kept current as stats change.
+
+    Only players with at least min_games games played are ranked. Ties are
+    broken by games won, then by id. update() moves one player in O(log N);
+    page() and rank() never sort the population.
+    """
+    def __init__(self, sort_key='win_rate', min_games=0):
+        if sort_key not in SORT_KEYS:
+            raise ValueError(f"Unknown leaderboard sort key: {sort_key}")
+        self.sort_key = sort_key
+        self.min_games = min_games
+        self.keys = SortedKeys()
+        self.entries = {}  # {player_id: current key}
+
+    def _key(self, player_id, stats):
+        return (-stats[self.sort_key], -stats['games_won'], player_id)
+
+    def update(self, player_id, stats):
+        """Re-rank a player after their stats changed"""
+        old = self.entries.pop(player_id, None)
+        if old is not None:
+            self.keys.remove(old)
+        if stats is not None and stats['games_played'] >= self.min_games:
+            key = self._key(player_id, stats)
+            self.entries[player_id] = key
+            self.keys.add(key)
+
+    def page(self, offset=0, limit=None):
+        """Player ids from rank offset + 1 on, best first"""
+        stop = len(self.keys) if limit is None else offset + limit
+        return [key[2] for key in self.keys.slice(offset, stop)]
+
+    def rank(self, player_id):
+        """1-based rank of a player, or None if they aren't ranked.
+
+        Players tied on the sort stat share the best rank among them.
+        """
+        key = self.entries.get(player_id)
+        if key is None:
+            return None
+        return self.keys.count_before((key[0],)) + 1
+
+    def __len__(self):
+        return len(self.keys)
+
+class LeaderboardSet:
+    """Leaderboards over one population, built on first use and then kept current"""
+    def __init__(self):
+        self.boards = {}  # {(sort_key, min_games): Leaderboard}
+
+    def get(self, sort_key, min_games, records):
+        """Get a leaderboard, building it from records ({player_id: stats}) the first time"""
+        board = self.boards.get((sort_key, min_games))
+        if board is None:
+            board = Leaderboard(sort_key, min_games)
+            keys = []
+            for player_id, stats in records.items():
+                if stats['games_played'] >= min_games:
+                    key = board._key(player_id, stats)
+                    board.entries[player_id] = key
+                    keys.append(key)
+            board.keys = SortedKeys(keys)
+            self.boards[(sort_key, min_games)] = board
+        return board
+
+    def update(self, player_id, stats):
+        for board in self.boards.values():
+            board.update(player_id, stats)
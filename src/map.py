@@ -1,4 +1,11 @@
 import pygame
+from src.spatial import SpatialHash
+from src.fonts import render_text
+
+try:
+    import numpy
+except ImportError:  # numpy is optional; bulk lookups fall back to lists
+    numpy = None
 
 class Room:
     def __init__(self, name, x, y, width, height):
@@ -19,8 +26,7 @@ class Room:
 
     def draw(self, screen):
         pygame.draw.rect(screen, (50, 50, 70), self.rect, 2)
-        font = pygame.font.Font(None, 20)
-        text = font.render(self.name, True, (200, 200, 200))
+        text = render_text(self.name, 20, (200, 200, 200))
         screen.blit(text, (self.x + 5, self.y + 5))
 
 class Vent:
@@ -36,7 +42,7 @@ class Vent:
     def is_near(self, x, y, distance=30):
         dx = x - self.x
         dy = y - self.y
-        return (dx**2 + dy**2) ** 0.5 <= distance
+        return dx * dx + dy * dy <= distance * distance
 
     def draw(self, screen):
         if self.is_active:
@@ -49,7 +55,11 @@ class GameMap:
         self.height = height
         self.rooms = {}
         self.vents = {}
+        self.vent_index = SpatialHash(cell_size=64)
+        self._background = None  # Pre-rendered static map layer
+        self._background_key = None
         self.create_skeld_map()
+        self.build_room_index()
 
     def create_skeld_map(self):
         """Create the classic Skeld map from Among Us"""
@@ -77,25 +87,107 @@ class GameMap:
         for vent_id, x, y, connected in vents:
             vent = Vent(vent_id, x, y, connected)
             self.vents[vent_id] = vent
+            self.vent_index.insert(vent_id, x, y)
             # Add vent to nearest room
             for room in self.rooms.values():
                 if room.contains_point(x, y):
                     room.add_vent(vent)
                     break
 
+    def build_room_index(self, cell_size=10):
+        """Rasterise rooms into a coarse grid so room lookups are O(1).
+
+        Each cell holds the id of the room covering it entirely, -1 when no
+        room touches it, or a tuple of candidate ids for cells on a room
+        edge, which are resolved with contains_point. Room ids are positions
+        in self.room_list. Call again after adding or moving rooms.
+        """
+        self.room_list = list(self.rooms.values())
+        self.room_ids = {room.name: i for i, room in enumerate(self.room_list)}
+        self._room_cell_size = cell_size
+        extent_x = max([self.width] + [room.rect.right for room in self.room_list])
+        extent_y = max([self.height] + [room.rect.bottom for room in self.room_list])
+        self._room_cols = -(-extent_x // cell_size)
+        self._room_rows = -(-extent_y // cell_size)
+
+        # Candidate rooms per cell, in dict order so the first match wins
+        candidates = [[] for _ in range(self._room_cols * self._room_rows)]
+        for room_id, room in enumerate(self.room_list):
+            rect = room.rect
+            col_start = max(0, rect.left // cell_size)
+            col_end = min(self._room_cols, -(-rect.right // cell_size))
+            row_start = max(0, rect.top // cell_size)
+            row_end = min(self._room_rows, -(-rect.bottom // cell_size))
+            for row in range(row_start, row_end):
+                for col in range(col_start, col_end):
+                    candidates[row * self._room_cols + col].append(room_id)
+
+        cells = []
+        for index, room_ids in enumerate(candidates):
+            if not room_ids:
+                cells.append(-1)
+                continue
+            cell_x = (index % self._room_cols) * cell_size
+            cell_y = (index // self._room_cols) * cell_size
+            first = self.room_list[room_ids[0]].rect
+            if (first.left <= cell_x and cell_x + cell_size <= first.right
+                    and first.top <= cell_y and cell_y + cell_size <= first.bottom):
+                cells.append(room_ids[0])
+            else:
+                cells.append(tuple(room_ids))
+        self._room_cells = cells
+
+        # Flat id array for vectorised bulk lookups; -2 marks edge cells
+        if numpy is not None:
+            self._room_cells_array = numpy.array(
+                [c if isinstance(c, int) else -2 for c in cells], dtype=numpy.int32)
+
+    def get_room_id_at(self, x, y):
+        """Get the id of the room at given coordinates, or -1"""
+        col = int(x // self._room_cell_size)
+        row = int(y // self._room_cell_size)
+        if 0 <= col < self._room_cols and 0 <= row < self._room_rows:
+            entry = self._room_cells[row * self._room_cols + col]
+            if entry.__class__ is int:
+                return entry
+            room_ids = entry
+        else:
+            # Off the raster: rare, so just check every room
+            room_ids = range(len(self.room_list))
+        for room_id in room_ids:
+            if self.room_list[room_id].contains_point(x, y):
+                return room_id
+        return -1
+
     def get_room_at(self, x, y):
         """Get the room at given coordinates"""
-        for room in self.rooms.values():
-            if room.contains_point(x, y):
-                return room
-        return None
+        room_id = self.get_room_id_at(x, y)
+        return self.room_list[room_id] if room_id >= 0 else None
+
+    def get_room_ids_at(self, positions):
+        """Map many (x, y) positions to room ids (-1 for none) in one call.
+
+        A numpy array of shape (N, 2) gets a numpy array back, computed with
+        one gather; any other sequence of pairs gets a list.
+        """
+        if numpy is not None and isinstance(positions, numpy.ndarray):
+            cols = (positions[:, 0] // self._room_cell_size).astype(numpy.int64)
+            rows = (positions[:, 1] // self._room_cell_size).astype(numpy.int64)
+            in_bounds = (cols >= 0) & (cols < self._room_cols) & (rows >= 0) & (rows < self._room_rows)
+            room_ids = numpy.full(len(positions), -2, dtype=numpy.int32)
+            room_ids[in_bounds] = self._room_cells_array[rows[in_bounds] * self._room_cols + cols[in_bounds]]
+            # Edge cells and off-raster points need an exact check
+            for i in numpy.nonzero(room_ids == -2)[0]:
+                room_ids[i] = self.get_room_id_at(positions[i, 0], positions[i, 1])
+            return room_ids
+        
+        get_room_id_at = self.get_room_id_at
+        return [get_room_id_at(x, y) for x, y in positions]
 
     def get_vent_near(self, x, y, distance=30):
-        """Get vent near given coordinates"""
-        for vent in self.vents.values():
-            if vent.is_near(x, y, distance):
-                return vent
-        return None
+        """Get the closest vent within distance of given coordinates"""
+        vent_id = self.vent_index.nearest(x, y, distance)
+        return self.vents[vent_id] if vent_id is not None else None
 
     def draw(self, screen):
         """Draw all map elements"""
@@ -103,3 +195,29 @@ class GameMap:
             room.draw(screen)
         for vent in self.vents.values():
             vent.draw(screen)
+
+    def _background_state(self):
+        """Everything the static layer depends on that can change in play"""
+        return (len(self.rooms),) + tuple(
+            (vent.id, vent.is_active, vent.cooldown == 0) for vent in self.vents.values())
+
+    def invalidate_background(self):
+        """Force the static layer to be rebuilt (e.g. after editing rooms)"""
+        self._background = None
+
+    def get_background(self, fill_color=(30, 30, 40)):
+        """Get the map pre-rendered onto a background surface.
+
+        The surface is reused frame to frame and only redrawn when a vent
+        changes state or invalidate_background() is called.
+        """
+        state = self._background_state()
+        if self._background is None or state != self._background_key:
+            surface = pygame.Surface((self.width, self.height))
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            surface.fill(fill_color)
+            self.draw(surface)
+            self._background = surface
+            self._background_key = state
+        return self._background
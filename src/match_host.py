@@ -0,0 +1,268 @@
+import os
+import time
+import traceback
+from src.network import MessageType, NetworkMessage
+from src.player import PlayerColor
+from src.simulation import Simulation, GameState
+from src.snapshot import SnapshotReplicator, capture_snapshot
+from src.interest import InterestManager
+from src.stats_store import StatsStore
+
+class MatchState:
+    LOBBY = 'lobby'
+    RUNNING = 'running'
+    FINISHED = 'finished'
+    FAILED = 'failed'
+
+class Match:
+    """One match hosted by a MatchHost: its own Simulation and its clients"""
+    def __init__(self, match_id, sim, snapshot_interval=3):
+        self.match_id = match_id
+        self.sim = sim
+        self.state = MatchState.LOBBY
+        self.clients = {}  # {client_id: player_id}
+        self.replicator = SnapshotReplicator()
+        self.interest = InterestManager(sim.game_map)  # Filters each client's snapshots
+        self.snapshot_interval = snapshot_interval
+        self.error = None  # Traceback text once FAILED
+
+    @property
+    def active(self):
+        return self.state in (MatchState.LOBBY, MatchState.RUNNING)
+
+    def player_for(self, client_id):
+        return self.sim.players.get(self.clients.get(client_id))
+
+class MatchHost:
+    """Runs many independent matches behind one network server.
+
+    Clients pick a match with MATCH_JOIN; after that every message they
+    send is routed to that match. All matches tick on one loop: each round
+    works out how many fixed ticks every match owes and runs them one tick
+    per match at a time, so a busy match can't starve the others. An
+    exception in a match fails only that match; its clients are told and
+    the rest keep running.
+    """
+    def __init__(self, server, max_matches=64, max_players_per_match=10, tick_rate=60,
+                 max_ticks_per_round=5, seed=None, chat_dir=None, stats_db=None, event_dir=None):
+        self.server = server
+        self.max_matches = max_matches
+        self.max_players_per_match = max_players_per_match
+        self.tick_rate = tick_rate
+        self.max_ticks_per_round = max_ticks_per_round  # Catch-up cap after a stall
+        self.seed = seed  # Base seed; each match gets seed + match_id
+        self.chat_dir = chat_dir  # Each match logs chat to chat_dir/match-<id>
+        self.stats_store = StatsStore(stats_db) if stats_db else None  # Shared by all matches
+        self.event_dir = event_dir  # Each match records to event_dir/match-<id>.evlog
+        self.matches = {}  # {match_id: Match}
+        self.client_matches = {}  # {client_id: match_id}
+        self.running = False
+        self._accumulator = 0.0
+        self._first = 0  # Rotates which match ticks first each round
+
+    def create_match(self, match_id):
+        """Create a new empty match, or None if the host is full"""
+        if match_id in self.matches:
+            return self.matches[match_id]
+        if len(self.matches) >= self.max_matches:
+            return None
+        seed = None if self.seed is None else self.seed + match_id
+        chat_dir = None if self.chat_dir is None else os.path.join(self.chat_dir, f"match-{match_id}")
+        match = Match(match_id, Simulation(seed=seed, tick_rate=self.tick_rate, chat_dir=chat_dir,
+                                              stats_store=self.stats_store))
+        if self.event_dir is not None:
+            os.makedirs(self.event_dir, exist_ok=True)
+            match.sim.record_events(os.path.join(self.event_dir, f"match-{match_id}.evlog"))
+        self.matches[match_id] = match
+        return match
+
+    def remove_match(self, match_id):
+        match = self.matches.pop(match_id, None)
+        if match is None:
+            return
+        for client_id in match.clients:
+            self.client_matches.pop(client_id, None)
+        match.sim.close()
+
+    def join(self, client_id, match_id, name):
+        """Add a client's player to a match, creating the match on first join"""
+        if client_id in self.client_matches:
+            return self.matches.get(self.client_matches[client_id])
+        match = self.create_match(match_id)
+        if match is None or match.state != MatchState.LOBBY or len(match.clients) >= self.max_players_per_match:
+            return None
+        colors = list(PlayerColor)
+        player = match.sim.add_player(name, colors[len(match.sim.players) % len(colors)])
+        match.clients[client_id] = player.id
+        match.interest.set_viewer(client_id, player.id)
+        self.client_matches[client_id] = match_id
+        return match
+
+    def poll_messages(self):
+        """Route every queued client message to its match"""
+        while True:
+            item = self.server.get_message()
+            if not item:
+                break
+            client_id, message = item
+            if message.type == MessageType.MATCH_JOIN:
+                self._handle_join(client_id, message)
+                continue
+            match = self.matches.get(self.client_matches.get(client_id))
+            if match is None or not match.active:
+                continue
+            self._guard(match, self.handle_match_message, match, client_id, message)
+
+    def _handle_join(self, client_id, message):
+        data = message.data if isinstance(message.data, dict) else {}
+        match_id = data.get('match_id')
+        if type(match_id) is not int or match_id < 0:
+            return
+        match = self.join(client_id, match_id, str(data.get('name', f"Player {client_id}")))
+        # A client already in a match is told which one it is actually in
+        reply = {'match_id': match.match_id if match else match_id,
+                 'player_id': match.clients[client_id] if match else None}
+        self.server.send_to_client(client_id, NetworkMessage(MessageType.MATCH_JOIN, 0, reply))
+
+    def handle_match_message(self, match, client_id, message):
+        """Apply one client message to its match"""
+        sim = match.sim
+        player = match.player_for(client_id)
+        if player is None:
+            return
+        data = message.data if isinstance(message.data, dict) else {}
+
+        if message.type == MessageType.STATE_ACK:
+            match.replicator.acknowledge(client_id, data.get('tick'))
+        elif message.type == MessageType.PLAYER_MOVE:
+            if player.is_alive and sim.current_state == GameState.PLAYING:
+                sim.move_player(player.id, data.get('x', player.x), data.get('y', player.y))
+        elif message.type == MessageType.GAME_START:
+            num_impostors = data.get('num_impostors', 1)
+            if type(num_impostors) is not int or num_impostors < 1:
+                return
+            if match.state == MatchState.LOBBY and sim.start_game(num_impostors):
+                match.state = MatchState.RUNNING
+                self.broadcast(match, NetworkMessage(MessageType.GAME_START, 0, {'num_impostors': len(sim.impostors)}))
+        elif message.type == MessageType.PLAYER_KILL:
+            victim_id = data.get('victim_id')
+            if type(victim_id) is int and sim.try_kill(player.id, victim_id):
+                self.broadcast(match, NetworkMessage(MessageType.PLAYER_KILL, 0,
+                                                     {'impostor_id': player.id, 'victim_id': victim_id}))
+        elif message.type == MessageType.PLAYER_VENT:
+            sim.try_vent(player.id)
+        elif message.type == MessageType.VOTING_START:
+            if sim.call_emergency_meeting():
+                self.broadcast(match, NetworkMessage(MessageType.VOTING_START, 0, {}))
+        elif message.type == MessageType.VOTE_CAST:
+            # Applied as a batch on the match's next tick, then echoed
+            sim.queue_vote(player.id, data.get('voted_id'))
+        elif message.type == MessageType.CHAT:
+            text = str(data.get('text', ''))
+            sim.add_chat_message(player.name, player.id, text)
+            self.broadcast(match, NetworkMessage(MessageType.CHAT, player.id,
+                                                 {'player_name': player.name, 'text': text}))
+
+    def broadcast(self, match, message):
+        self.server.send_to_clients(list(match.clients), message)
+
+    def tick_match(self, match):
+        """Advance one match by one tick and replicate its state"""
+        sim = match.sim
+        sim.step()
+        for voter_id, voted_id in sim.applied_votes:
+            self.broadcast(match, NetworkMessage(MessageType.VOTE_CAST, 0, {'voter_id': voter_id, 'voted_id': voted_id}))
+        if match.state == MatchState.RUNNING and sim.game_over:
+            match.state = MatchState.FINISHED
+            self.broadcast(match, NetworkMessage(MessageType.GAME_END, 0, {'winner': sim.winning_team}))
+        if sim.tick_count % match.snapshot_interval == 0 and match.clients:
+            match.replicator.record(sim.tick_count, capture_snapshot(sim))
+            # Snapshots carry the positions plan_moves lets each client see
+            match.interest.update(sim.players)
+            match.interest.plan_moves(list(match.clients), sim.players, sim.tick_count)
+            for client_id in match.clients:
+                update = match.replicator.build_update(
+                    client_id, view=lambda snapshot: match.interest.snapshot_view(client_id, snapshot, sim))
+                self.server.send_to_client(client_id, NetworkMessage(MessageType.GAME_STATE, 0, update))
+
+    def _guard(self, match, func, *args):
+        """Run func for a match, failing only that match if it raises"""
+        try:
+            func(*args)
+            return True
+        except Exception:
+            match.state = MatchState.FAILED
+            match.error = traceback.format_exc()
+            print(f"Match {match.match_id} failed:\n{match.error}")
+            self.broadcast(match, NetworkMessage(MessageType.GAME_END, 0, {'winner': None, 'error': 'match failed'}))
+            return False
+
+    def drop_disconnected(self):
+        """Forget clients that have left, and matches nobody is in any more"""
+        connected = self.server.clients
+        for client_id in [cid for cid in self.client_matches if cid not in connected]:
+            match = self.matches.get(self.client_matches.pop(client_id))
+            if match is not None:
+                player_id = match.clients.pop(client_id, None)
+                match.replicator.remove_client(client_id)
+                match.interest.remove_client(client_id)
+                if match.state == MatchState.RUNNING and player_id is not None:
+                    match.sim.disconnect_player(player_id)
+        for match_id in [mid for mid, match in self.matches.items() if not match.clients]:
+            self.matches.pop(match_id).sim.close()
+
+    def step_round(self, elapsed):
+        """Run every tick owed after elapsed seconds, interleaved fairly"""
+        dt = 1.0 / self.tick_rate
+        self._accumulator += elapsed
+        ticks = int(self._accumulator // dt)
+        if ticks > self.max_ticks_per_round:
+            ticks = self.max_ticks_per_round
+            self._accumulator = 0.0
+        else:
+            self._accumulator -= ticks * dt
+
+        self.poll_messages()
+        self.drop_disconnected()
+
+        matches = [match for match in self.matches.values() if match.active]
+        if matches:
+            # Rotate the starting match so none is always served first
+            self._first = (self._first + 1) % len(matches)
+            matches = matches[self._first:] + matches[:self._first]
+        for _ in range(ticks):
+            for match in matches:
+                if match.active:
+                    self._guard(match, self.tick_match, match)
+
+        self.server.flush()
+        return ticks
+
+    def run(self):
+        """Tick all matches in real time until stop() is called"""
+        self.running = True
+        last = time.perf_counter()
+        dt = 1.0 / self.tick_rate
+        while self.running:
+            now = time.perf_counter()
+            self.step_round(now - last)
+            last = now
+            time.sleep(max(0.0, dt - (time.perf_counter() - now)))
+
+    def stop(self):
+        self.running = False
+        for match in self.matches.values():
+            match.sim.stop_recording()
+        if self.stats_store is not None:
+            self.stats_store.close()
+
+    def get_stats(self):
+        """Get per-match state, player count and tick for monitoring"""
+        return {
+            match_id: {
+                'state': match.state,
+                'players': len(match.clients),
+                'tick': match.sim.tick_count,
+            }
+            for match_id, match in self.matches.items()
+        }
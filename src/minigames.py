@@ -13,8 +13,9 @@ class TaskMinigame:
 
 class WiringMinigame(TaskMinigame):
     """Fix wiring puzzle"""
-    def __init__(self, task_id):
+    def __init__(self, task_id, rng=None):
         super().__init__(task_id, "Fix Wiring")
+        self.rng = rng or random
         self.connections = []
         self.correct_connections = 0
         self.total_connections = 6
@@ -22,7 +23,7 @@ class WiringMinigame(TaskMinigame):
 
     def generate_puzzle(self):
         """Generate random wiring connections"""
-        self.connections = [(i, random.randint(0, 5)) for i in range(6)]
+        self.connections = [(i, self.rng.randint(0, 5)) for i in range(6)]
 
     def attempt_connection(self, left_port, right_port):
         """Try to connect two ports"""
@@ -41,7 +42,7 @@ class WiringMinigame(TaskMinigame):
 
 class CardSwipeMinigame(TaskMinigame):
     """Swipe card minigame"""
-    def __init__(self, task_id):
+    def __init__(self, task_id, rng=None):
         super().__init__(task_id, "Swipe Card")
         self.swipes_needed = 3
         self.swipes_done = 0
@@ -56,9 +57,10 @@ class CardSwipeMinigame(TaskMinigame):
 
 class ReactorStartMinigame(TaskMinigame):
     """Start reactor minigame - memory puzzle"""
-    def __init__(self, task_id):
+    def __init__(self, task_id, rng=None):
         super().__init__(task_id, "Start Reactor")
-        self.sequence = [random.randint(0, 3) for _ in range(5)]
+        rng = rng or random
+        self.sequence = [rng.randint(0, 3) for _ in range(5)]
         self.player_sequence = []
         self.is_correct_so_far = True
 
@@ -87,7 +89,7 @@ class ReactorStartMinigame(TaskMinigame):
 
 class DivertPowerMinigame(TaskMinigame):
     """Divert power from other rooms"""
-    def __init__(self, task_id):
+    def __init__(self, task_id, rng=None):
         super().__init__(task_id, "Divert Power")
         self.switches = [False] * 5  # 5 switches to flip
 
@@ -122,7 +124,9 @@ class TaskMinigameFactory:
     }
 
     @staticmethod
-    def create_minigame(task_id, task_type):
-        """Create a minigame based on task type"""
-        minigame_class = TaskMinigameFactory.MINIGAME_TYPES.get(task_type, TaskMinigame)
-        return minigame_class(task_id)
+    def create_minigame(task_id, task_type, rng=None):
+        """Create a minigame based on task type, seeded from rng if given"""
+        minigame_class = TaskMinigameFactory.MINIGAME_TYPES.get(task_type)
+        if minigame_class is None:
+            return TaskMinigame(task_id, task_type)
+        return minigame_class(task_id, rng=rng)
@@ -2,6 +2,7 @@ import socket
 import json
 import threading
 import queue
+from collections import OrderedDict
 from enum import Enum
 
 class MessageType(Enum):
@@ -17,6 +18,10 @@ class MessageType(Enum):
     VOTING_END = "voting_end"
     CHAT = "chat"
     GAME_END = "game_end"
+    STATE_ACK = "state_ack"
+    PLAYER_INPUT = "player_input"
+    UDP_HELLO = "udp_hello"
+    MATCH_JOIN = "match_join"
 
 class NetworkMessage:
     def __init__(self, msg_type, sender_id, data):
@@ -31,6 +36,18 @@ class NetworkMessage:
             'data': self.data
         })
 
+    def to_bytes(self, codec='json'):
+        """Encode for the wire with the named codec ('json' or 'binary')"""
+        from src.codec import get_codec
+        return get_codec(codec).encode(self)
+
+    @staticmethod
+    def from_bytes(data):
+        """Decode one message encoded by either codec"""
+        from src.codec import MessageDecoder
+        messages = MessageDecoder().feed(data)
+        return messages[0] if len(messages) == 1 else None
+
     @staticmethod
     def from_json(json_str):
         try:
@@ -44,11 +61,18 @@ class NetworkMessage:
             return None
 
 class NetworkServer:
-    def __init__(self, host='localhost', port=5000):
+    def __init__(self, host='localhost', port=5000, codec='json', queue_size=256, batch=False, send_timeout=5.0):
         self.host = host
         self.port = port
+        self.codec = codec  # Used until a client shows which codec it speaks
+        self.queue_size = queue_size  # Outbound messages buffered per client
+        self.batch = batch  # Hold sends until flush(), then one write per client
+        self.send_timeout = send_timeout  # Seconds a write may block before the client counts as stalled
         self.server_socket = None
         self.clients = {}  # {client_id: (socket, address)}
+        self.client_codecs = {}  # {client_id: codec name seen from that client}
+        self.outboxes = {}  # {client_id: OutboundQueue}
+        self.clients_lock = threading.Lock()
         self.message_queue = queue.Queue()
         self.running = False
         self.next_client_id = 1
@@ -67,19 +91,30 @@ class NetworkServer:
 
     def _accept_connections(self):
         """Accept incoming client connections"""
+        from src.outbound import OutboundQueue
         while self.running:
             try:
                 client_socket, address = self.server_socket.accept()
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                client_socket.settimeout(self.send_timeout)
                 client_id = self.next_client_id
                 self.next_client_id += 1
-                self.clients[client_id] = (client_socket, address)
+                outbox = OutboundQueue(self.queue_size, batch=self.batch)
+                with self.clients_lock:
+                    self.clients[client_id] = (client_socket, address)
+                    self.outboxes[client_id] = outbox
                 
-                # Handle client in separate thread
+                # Handle client in separate threads: one reads, one writes
                 threading.Thread(
                     target=self._handle_client,
                     args=(client_id, client_socket),
                     daemon=True
                 ).start()
+                threading.Thread(
+                    target=self._write_client,
+                    args=(client_id, client_socket, outbox),
+                    daemon=True
+                ).start()
                 
                 print(f"Client {client_id} connected from {address}")
             except:
@@ -88,41 +123,105 @@ class NetworkServer:
 
     def _handle_client(self, client_id, client_socket):
         """Handle individual client"""
+        from src.codec import MessageDecoder, BINARY_MAGIC
+        decoder = MessageDecoder()
         while self.running:
             try:
-                data = client_socket.recv(4096).decode('utf-8')
+                try:
+                    data = client_socket.recv(4096)
+                except socket.timeout:
+                    continue  # The timeout is for sends; idle readers just wait
                 if not data:
                     break
                 
-                # Parse message and add to queue
-                message = NetworkMessage.from_json(data)
-                if message:
+                # Reply in whatever encoding the client speaks
+                if client_id not in self.client_codecs:
+                    self.client_codecs[client_id] = 'binary' if data[0] == BINARY_MAGIC else 'json'
+                
+                # Parse messages and add to queue
+                for message in decoder.feed(data):
                     self.message_queue.put((client_id, message))
             except:
                 break
         
         # Client disconnected
-        if client_id in self.clients:
-            del self.clients[client_id]
+        self._drop_client(client_id)
         print(f"Client {client_id} disconnected")
 
-    def broadcast_message(self, message):
-        """Broadcast message to all clients"""
-        json_data = message.to_json()
-        for client_id, (client_socket, _) in self.clients.items():
+    def _write_client(self, client_id, client_socket, outbox):
+        """Drain a client's outbound queue so slow clients only delay themselves"""
+        while True:
+            batch = outbox.get_batch()
+            if batch is None:
+                break
             try:
-                client_socket.send(json_data.encode('utf-8'))
+                client_socket.sendall(b''.join(batch))
+            except socket.timeout:
+                outbox.stalled = True  # The client stopped reading
+                break
             except:
-                pass
+                break
+        
+        if outbox.stalled:
+            print(f"Client {client_id} stalled; disconnecting")
+        # Unblocks the reader, which then cleans up
+        try:
+            client_socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _drop_client(self, client_id):
+        with self.clients_lock:
+            self.clients.pop(client_id, None)
+            self.client_codecs.pop(client_id, None)
+            outbox = self.outboxes.pop(client_id, None)
+        if outbox is not None:
+            outbox.close()
+
+    def broadcast_message(self, message):
+        """Broadcast message to all clients"""
+        with self.clients_lock:
+            client_ids = list(self.clients)
+        self.send_to_clients(client_ids, message)
+
+    def send_to_clients(self, client_ids, message):
+        """Queue one message for several clients, encoded once per codec"""
+        from src.outbound import stale_key
+        key = stale_key(message)
+        encoded = {}  # Encode once per codec in use
+        for client_id in client_ids:
+            outbox = self.outboxes.get(client_id)
+            if outbox is None:
+                continue
+            codec = self.client_codecs.get(client_id, self.codec)
+            if codec not in encoded:
+                encoded[codec] = message.to_bytes(codec)
+            if not outbox.put(encoded[codec], key) and outbox.stalled:
+                self._disconnect_stalled(client_id)
+
+    def _disconnect_stalled(self, client_id):
+        """Cut off a client whose reliable backlog overflowed"""
+        entry = self.clients.get(client_id)
+        if entry is None:
+            return
+        try:
+            entry[0].shutdown(socket.SHUT_RDWR)  # Also unblocks its writer
+        except OSError:
+            pass
 
     def send_to_client(self, client_id, message):
-        """Send message to specific client"""
-        if client_id in self.clients:
-            client_socket, _ = self.clients[client_id]
-            try:
-                client_socket.send(message.to_json().encode('utf-8'))
-            except:
-                pass
+        """Queue message for a specific client"""
+        self.send_to_clients((client_id,), message)
+
+    def flush(self):
+        """Send everything queued this tick, one write per client"""
+        for outbox in list(self.outboxes.values()):
+            outbox.flush()
+
+    def get_client_stats(self, client_id):
+        """Get outbound queue depth and lag metrics for a client, or None"""
+        outbox = self.outboxes.get(client_id)
+        return outbox.get_stats() if outbox is not None else None
 
     def get_message(self):
         """Get next message from queue"""
@@ -134,13 +233,21 @@ class NetworkServer:
     def stop(self):
         """Stop the server"""
         self.running = False
+        with self.clients_lock:
+            outboxes = list(self.outboxes.values())
+        for outbox in outboxes:
+            outbox.close()
         if self.server_socket:
             self.server_socket.close()
 
 class NetworkClient:
-    def __init__(self, host='localhost', port=5000):
+    def __init__(self, host='localhost', port=5000, codec='json', batch=False):
         self.host = host
         self.port = port
+        self.codec = codec  # 'binary' for the compact encoding
+        self.batch = batch  # Hold sends until flush(), then one write
+        self.pending = OrderedDict()  # {stale key or unique key: message} awaiting flush
+        self.decoder = None  # Stream decoder of the current connection; counts garbled input
         self.socket = None
         self.connected = False
         self.message_queue = queue.Queue()
@@ -151,6 +258,7 @@ class NetworkClient:
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.connect((self.host, self.port))
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self.connected = True
             
             # Start receiving messages in separate thread
@@ -163,14 +271,15 @@ class NetworkClient:
 
     def _receive_messages(self):
         """Receive messages from server"""
+        from src.codec import MessageDecoder
+        decoder = self.decoder = MessageDecoder()
         while self.connected:
             try:
-                data = self.socket.recv(4096).decode('utf-8')
+                data = self.socket.recv(4096)
                 if not data:
                     break
                 
-                message = NetworkMessage.from_json(data)
-                if message:
+                for message in decoder.feed(data):
                     self.message_queue.put(message)
             except:
                 break
@@ -183,8 +292,31 @@ class NetworkClient:
             return False
         
         message = NetworkMessage(msg_type, self.client_id, data)
+        if self.batch:
+            # A newer move for the same player replaces the pending one
+            from src.outbound import stale_key
+            key = stale_key(message)
+            if key is None:
+                key = object()
+            else:
+                self.pending.pop(key, None)
+            self.pending[key] = message
+            return True
+        return self._send(message.to_bytes(self.codec))
+
+    def flush(self):
+        """Send everything queued since the last flush in one write"""
+        if not self.pending:
+            return True
+        messages = list(self.pending.values())
+        self.pending.clear()
+        if not self.connected:
+            return False
+        return self._send(b''.join(message.to_bytes(self.codec) for message in messages))
+
+    def _send(self, data):
         try:
-            self.socket.send(message.to_json().encode('utf-8'))
+            self.socket.sendall(data)
             return True
         except:
             self.connected = False
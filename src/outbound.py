@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict
+from src.network import MessageType
+
+def stale_key(message):
+    """Get the key under which a newer message supersedes this one, or None.
+
+    Keyed messages are unreliable: a queued move or state update is dropped
+    when a newer one for the same key arrives or the queue overflows.
+    Everything else (kills, votes, chat, ...) is reliable and always sent.
+    """
+    if message.type == MessageType.PLAYER_MOVE and isinstance(message.data, dict):
+        return ('move', message.data.get('player_id'))
+    if message.type == MessageType.GAME_STATE:
+        return ('state',)
+    return None
+
+class OutboundQueue:
+    """Bounded per-client queue of encoded messages, drained by one writer.
+
+    Producers never block. When the queue is full the oldest unreliable
+    message is dropped to make room; reliable messages may exceed
+    max_messages up to max_reliable, past which the client counts as
+    stalled and the queue closes so the server can disconnect it.
+    Superseded and dropped messages are removed outright, so the queue
+    never holds more than it reports.
+
+    With batch=True the writer is only woken by flush(), so everything
+    queued during a tick leaves in a single write.
+    """
+    def __init__(self, max_messages=256, max_reliable=1024, batch=False):
+        self.max_messages = max_messages
+        self.max_reliable = max_reliable
+        self.batch = batch
+        self.flush_requested = False
+        self.entries = OrderedDict()  # {seq: (data, key, enqueued_at)} in send order
+        self.latest = {}  # {key: seq} for pending unreliable messages, oldest first
+        self.next_seq = 0
+        self.closed = False
+        self.stalled = False
+        self.lock = threading.Condition()
+
+        # Lag metrics
+        self.sent_messages = 0
+        self.sent_bytes = 0
+        self.sent_writes = 0  # Socket writes; below sent_messages when batching
+        self.dropped = 0  # Unreliable messages dropped on overflow
+        self.replaced = 0  # Unreliable messages superseded by a newer one
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def put(self, data, key=None):
+        """Queue encoded bytes; returns False if they were not queued"""
+        with self.lock:
+            if self.closed:
+                return False
+            if key is not None:
+                previous = self.latest.pop(key, None)
+                if previous is not None:
+                    del self.entries[previous]
+                    self.replaced += 1
+
+            if self.size >= self.max_messages and not self._drop_oldest_unreliable():
+                if key is not None:
+                    self.dropped += 1
+                    return False
+                if self.size >= self.max_reliable:
+                    self.stalled = True
+                    self._close()
+                    return False
+
+            seq = self.next_seq
+            self.next_seq += 1
+            self.entries[seq] = (data, key, time.monotonic())
+            if key is not None:
+                self.latest[key] = seq
+            if not self.batch:
+                self.lock.notify()
+            return True
+
+    def flush(self):
+        """Wake the writer to send everything queued so far"""
+        with self.lock:
+            if self.size:
+                self.flush_requested = True
+                self.lock.notify()
+
+    @property
+    def size(self):
+        """Messages waiting to be sent"""
+        return len(self.entries)
+
+    def _drop_oldest_unreliable(self):
+        # latest is in insertion order and a superseded key is re-inserted,
+        # so its first item is the oldest pending unreliable message
+        if not self.latest:
+            return False
+        key = next(iter(self.latest))
+        del self.entries[self.latest.pop(key)]
+        self.dropped += 1
+        return True
+
+    def get_batch(self, timeout=None):
+        """Wait for queued messages and take them all, as a list of bytes.
+
+        Returns None once the queue is closed and drained, or on timeout.
+        """
+        with self.lock:
+            while True:
+                if self.size and (not self.batch or self.flush_requested or self.closed):
+                    break
+                if self.closed and not self.size:
+                    return None
+                if not self.lock.wait(timeout):
+                    return None
+
+            self.flush_requested = False
+            now = time.monotonic()
+            batch = []
+            for data, _, enqueued_at in self.entries.values():
+                batch.append(data)
+                latency = now - enqueued_at
+                self.sent_bytes += len(data)
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+            self.entries.clear()
+            self.latest.clear()
+            self.sent_messages += len(batch)
+            self.sent_writes += 1
+            return batch
+
+    def close(self):
+        with self.lock:
+            self._close()
+
+    def _close(self):
+        self.closed = True
+        self.lock.notify_all()
+
+    def get_stats(self):
+        """Get queue depth and lag metrics"""
+        with self.lock:
+            oldest = next(iter(self.entries.values()))[2] if self.entries else None
+            return {
+                'queued': self.size,
+                'oldest_age': time.monotonic() - oldest if oldest is not None else 0.0,
+                'sent_messages': self.sent_messages,
+                'sent_bytes': self.sent_bytes,
+                'sent_writes': self.sent_writes,
+                'dropped': self.dropped,
+                'replaced': self.replaced,
+                'avg_latency': self.total_latency / self.sent_messages if self.sent_messages else 0.0,
+                'max_latency': self.max_latency,
+                'stalled': self.stalled,
+            }
@@ -1,6 +1,10 @@
 import pygame
+from src.fonts import render_text
 from enum import Enum
 
+REFERENCE_FPS = 60  # Frame rate that speed and velocities are tuned for
+FRAME_TIME = 1.0 / REFERENCE_FPS
+
 class PlayerRole(Enum):
     CREWMATE = 1
     IMPOSTOR = 2
@@ -30,28 +34,42 @@ class Player:
         self.size = 20
         self.velocity_x = 0
         self.velocity_y = 0
+        self.bounds = (1280, 720)  # Map size the player is clamped to
+        self.spatial_index = None  # SpatialHash kept in sync with position
 
-    def update(self):
-        """Update player position"""
-        self.x += self.velocity_x
-        self.y += self.velocity_y
+    def update(self, dt=FRAME_TIME):
+        """Update player position over dt seconds"""
+        # Velocities are in pixels per reference frame
+        step = dt * REFERENCE_FPS
+        self.x += self.velocity_x * step
+        self.y += self.velocity_y * step
+        
+        # Boundary checking
+        width, height = self.bounds
+        self.x = max(self.size, min(width - self.size, self.x))
+        self.y = max(self.size, min(height - self.size, self.y))
         
-        # Boundary checking (example: 1280x720 screen)
-        self.x = max(self.size, min(1280 - self.size, self.x))
-        self.y = max(self.size, min(720 - self.size, self.y))
+        if self.spatial_index is not None:
+            self.spatial_index.move(self.id, self.x, self.y)
+
+    def set_position(self, x, y):
+        """Teleport player, keeping the spatial index in sync"""
+        self.x = x
+        self.y = y
+        if self.spatial_index is not None:
+            self.spatial_index.move(self.id, x, y)
 
     def draw(self, screen):
-        """Draw player on screen"""
+        """Draw player on screen, returning the screen areas touched"""
         if not self.is_alive:
-            return
+            return []
         
-        pygame.draw.circle(screen, self.color.value, (int(self.x), int(self.y)), self.size)
+        body_rect = pygame.draw.circle(screen, self.color.value, (int(self.x), int(self.y)), self.size)
         
         # Draw name above player
-        font = pygame.font.Font(None, 24)
-        text = font.render(self.name, True, (255, 255, 255))
+        text = render_text(self.name, 24, (255, 255, 255))
         text_rect = text.get_rect(center=(int(self.x), int(self.y) - 35))
-        screen.blit(text, text_rect)
+        return [body_rect, screen.blit(text, text_rect)]
 
     def set_role(self, role):
         """Set player role (crewmate or impostor)"""
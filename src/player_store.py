@@ -0,0 +1,166 @@
+from array import array
+from src.player import Player, PlayerRole, REFERENCE_FPS
+
+try:
+    import numpy
+except ImportError:  # numpy is optional; the store falls back to array.array
+    numpy = None
+
+_ROLES = {role.value: role for role in PlayerRole}
+
+class PlayerStore:
+    """Structure-of-arrays storage for player state.
+
+    Positions, velocities, sizes, alive flags and roles live in parallel
+    arrays indexed by slot, and players are PlayerView objects reading and
+    writing through to their slot. Movement, bounds clamping and alive
+    counts then run as one batched operation per tick instead of one
+    Player.update call per player. Uses numpy when installed, otherwise
+    array.array with plain Python loops.
+    """
+    def __init__(self, capacity=64, use_numpy=True):
+        self.use_numpy = use_numpy and numpy is not None
+        self.capacity = 0
+        self.count = 0
+        self.players = []  # slot -> PlayerView
+        self.x = self.y = self.vx = self.vy = self.size = None
+        self.alive = self.role = None
+        self._grow(max(1, capacity))
+
+    def _new_array(self, kind, length):
+        if self.use_numpy:
+            dtype = {'d': numpy.float64, 'i': numpy.int32, 'b': numpy.int8}[kind]
+            return numpy.zeros(length, dtype=dtype)
+        return array(kind, bytes(array(kind).itemsize * length))
+
+    def _grow(self, capacity):
+        """Reallocate every column with room for capacity players"""
+        columns = {}
+        for name, kind in (('x', 'd'), ('y', 'd'), ('vx', 'd'), ('vy', 'd'), ('size', 'i'),
+                           ('alive', 'b'), ('role', 'b')):
+            column = self._new_array(kind, capacity)
+            old = getattr(self, name)
+            if old is not None:
+                column[:self.count] = old[:self.count]
+            columns[name] = column
+        for name, column in columns.items():
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def add_player(self, player_id, name, color, x=0, y=0):
+        """Allocate a slot and return a PlayerView onto it"""
+        if self.count == self.capacity:
+            self._grow(self.capacity * 2)
+        slot = self.count
+        self.count += 1
+        player = PlayerView(self, slot, player_id, name, color, x, y)
+        self.players.append(player)
+        return player
+
+    def update(self, dt, width, height, spatial_index=None):
+        """Move and clamp every player in one pass"""
+        n = self.count
+        if n == 0:
+            return
+        step = dt * REFERENCE_FPS
+
+        if self.use_numpy:
+            x, y = self.x[:n], self.y[:n]
+            vx, vy, size = self.vx[:n], self.vy[:n], self.size[:n]
+            x += vx * step
+            y += vy * step
+            numpy.maximum(size, numpy.minimum(width - size, x), out=x)
+            numpy.maximum(size, numpy.minimum(height - size, y), out=y)
+            if spatial_index is not None:
+                moved = numpy.flatnonzero((vx != 0) | (vy != 0))
+                players = self.players
+                spatial_index.move_many([players[slot].id for slot in moved.tolist()],
+                                        x[moved].tolist(), y[moved].tolist())
+            return
+
+        xs, ys, vxs, vys, sizes = self.x, self.y, self.vx, self.vy, self.size
+        for slot in range(n):
+            vx = vxs[slot]
+            vy = vys[slot]
+            s = sizes[slot]
+            xs[slot] = max(s, min(width - s, xs[slot] + vx * step))
+            ys[slot] = max(s, min(height - s, ys[slot] + vy * step))
+            if (vx or vy) and spatial_index is not None:
+                spatial_index.move(self.players[slot].id, xs[slot], ys[slot])
+
+    def count_alive(self, role=None):
+        """Count living players, optionally of one role"""
+        n = self.count
+        if self.use_numpy:
+            alive = self.alive[:n] != 0
+            if role is not None:
+                alive &= self.role[:n] == role.value
+            return int(numpy.count_nonzero(alive))
+        if role is None:
+            return sum(self.alive[:n])
+        code = role.value
+        roles = self.role
+        return sum(1 for slot in range(n) if self.alive[slot] and roles[slot] == code)
+
+class PlayerView(Player):
+    """Player whose state lives in a PlayerStore slot"""
+    def __init__(self, store, slot, player_id, name, color, x=0, y=0):
+        self._store = store
+        self._slot = slot
+        super().__init__(player_id, name, color, x, y)
+
+    @property
+    def x(self):
+        return float(self._store.x[self._slot])
+
+    @x.setter
+    def x(self, value):
+        self._store.x[self._slot] = value
+
+    @property
+    def y(self):
+        return float(self._store.y[self._slot])
+
+    @y.setter
+    def y(self, value):
+        self._store.y[self._slot] = value
+
+    @property
+    def velocity_x(self):
+        return float(self._store.vx[self._slot])
+
+    @velocity_x.setter
+    def velocity_x(self, value):
+        self._store.vx[self._slot] = value
+
+    @property
+    def velocity_y(self):
+        return float(self._store.vy[self._slot])
+
+    @velocity_y.setter
+    def velocity_y(self, value):
+        self._store.vy[self._slot] = value
+
+    @property
+    def size(self):
+        return int(self._store.size[self._slot])
+
+    @size.setter
+    def size(self, value):
+        self._store.size[self._slot] = value
+
+    @property
+    def is_alive(self):
+        return bool(self._store.alive[self._slot])
+
+    @is_alive.setter
+    def is_alive(self, value):
+        self._store.alive[self._slot] = 1 if value else 0
+
+    @property
+    def role(self):
+        return _ROLES[int(self._store.role[self._slot])]
+
+    @role.setter
+    def role(self, value):
+        self._store.role[self._slot] = value.value
@@ -0,0 +1,149 @@
+import time
+from src.event_log import EventLogReader, EventType
+from src.player import PlayerColor, PlayerRole
+from src.simulation import Simulation, GameState
+from src.task import Task
+
+def restore_checkpoint(sim, state):
+    """Load a capture_checkpoint() state into a fresh Simulation"""
+    sim.sim_clock.tick = state['tick']
+    for player_id, name, color, role, x, y, vx, vy, alive in state['players']:
+        sim.next_player_id = player_id
+        player = sim.add_player(name, PlayerColor[color])
+        player.set_role(PlayerRole[role])
+        player.set_position(x, y)
+        player.velocity_x = vx
+        player.velocity_y = vy
+        player.is_alive = alive
+    sim.next_player_id = state['next_player_id']
+    sim.impostors = [sim.players[player_id] for player_id in state['impostors']]
+    sim.tasks = []
+    for player_id, task_type, completed in state['tasks']:
+        task = Task(player_id, task_type)
+        task.completed = completed
+        sim.tasks.append(task)
+    sim.disconnected = set(state['disconnected'])
+    sim.recount()
+
+    sim.current_state = GameState[state['state']]
+    sim.emergency_meetings_left = state['meetings_left']
+    sim.game_over = state['game_over']
+    sim.winning_team = state['winner']
+    sim._voting_started_tick = state['voting_started_tick']
+    sim.vote_manager.load_votes(dict(state['votes']), dict.fromkeys(state['candidates']))
+    sim.vote_manager.voting_active = state['voting_active']
+    sim.kill_manager.last_kill_time = dict(state['kill_times'])
+    sim.vent_manager.last_vent_time = dict(state['vent_times'])
+    for victim_id, x, y in state['bodies']:
+        sim.body_index.insert(victim_id, x, y)
+    version, internal, gauss = state['rng']
+    sim.rng.setstate((version, tuple(internal), gauss))
+
+class Replay:
+    """Re-runs a recorded match from its event log, headless and unthrottled.
+
+    seek(tick) restores the last checkpoint at or before tick and re-applies
+    the logged events from there, so jumping into a long match costs at most
+    one checkpoint interval of simulation. Controllers never run: every
+    input comes from the log, and rule-checked actions (kills, vents,
+    meetings, reports) go through the same Simulation methods as live play.
+
+    Each checkpoint passed on the way is compared with the replayed state;
+    mismatches and logged actions the rules rejected are collected in
+    divergences as (tick, description).
+    """
+    def __init__(self, path):
+        self.reader = EventLogReader(path)
+        self.sim = None
+        self.divergences = []
+        self._offset = None  # Next record to apply
+        self._handlers = {
+            EventType.VELOCITY: self._velocity,
+            EventType.MOVE: lambda player_id, x, y: self.sim.players[player_id].set_position(x, y),
+            EventType.KILL: self._action('try_kill'),
+            EventType.VENT: self._action('try_vent'),
+            EventType.MEETING: self._action('call_emergency_meeting'),
+            EventType.REPORT: self._action('report_body'),
+            EventType.VOTE: lambda voter_id, voted_id: self.sim.vote_manager.vote(voter_id, voted_id),
+            EventType.VOTE_END: lambda: self.sim.resolve_voting(),
+            EventType.TASK: lambda index: self.sim.complete_task(self.sim.tasks[index]),
+            EventType.CHAT: lambda player_id, name, text: self.sim.chat_manager.add_message(name, player_id, text),
+            EventType.DISCONNECT: lambda player_id: self.sim.disconnect_player(player_id),
+            EventType.START: lambda num_impostors: None,
+            EventType.END: lambda winner: None,  # The closing checkpoint covers the outcome
+        }
+
+    @property
+    def end_tick(self):
+        """Tick of the last checkpoint (a finished recording ends with one)"""
+        return self.reader.checkpoint_ticks[-1] if self.reader.checkpoints else None
+
+    def _action(self, name):
+        def apply(*args):
+            if not getattr(self.sim, name)(*args):
+                self._diverged(f"{name}{args} was rejected")
+        return apply
+
+    def _diverged(self, description):
+        self.divergences.append((self.sim.tick_count, description))
+
+    def _velocity(self, player_id, vx, vy):
+        player = self.sim.players[player_id]
+        player.velocity_x = vx
+        player.velocity_y = vy
+
+    def _new_sim(self):
+        header = self.reader.header
+        return Simulation(width=header['width'], height=header['height'], voting_ticks=header['voting_ticks'],
+                          seed=header['seed'], tick_rate=header['tick_rate'],
+                          use_player_store=header['use_player_store'])
+
+    def seek(self, tick):
+        """Restore the match as it stood at the start of tick; returns the Simulation"""
+        found = self.reader.find_checkpoint(tick)
+        if found is None:
+            raise ValueError(f"No checkpoint at or before tick {tick}")
+        if self.sim is not None:
+            self.sim.close()
+        self.sim = self._new_sim()
+        state, self._offset = self.reader.checkpoint(found[1])
+        restore_checkpoint(self.sim, state)
+        return self.play(tick)
+
+    def play(self, to_tick=None):
+        """Apply logged events and tick the simulation up to to_tick (or the end of the log)"""
+        if self.sim is None:
+            if not self.reader.checkpoints:
+                raise ValueError("Event log has no checkpoints")
+            self.seek(self.reader.checkpoint_ticks[0])
+        sim = self.sim
+        for next_offset, tick, event_type, fields in self.reader.events(self._offset):
+            if to_tick is not None and tick >= to_tick:
+                break
+            while sim.tick_count < tick:
+                sim.update()
+            if event_type == EventType.CHECKPOINT:
+                state, _ = self.reader.checkpoint(self._offset)
+                if state['digest'] != sim.state_digest():
+                    self._diverged("state differs from the recorded checkpoint")
+            else:
+                self._handlers[event_type](*fields)
+            self._offset = next_offset
+        while to_tick is not None and sim.tick_count < to_tick:
+            sim.update()
+        return sim
+
+    def run(self, to_tick=None):
+        """Replay from the start to to_tick; returns (ticks replayed, seconds taken)"""
+        start = time.perf_counter()
+        if self.sim is not None:
+            self.sim.close()
+            self.sim = None
+        self.divergences = []
+        self.play(to_tick)
+        return self.sim.tick_count - self.reader.checkpoint_ticks[0], time.perf_counter() - start
+
+    def close(self):
+        if self.sim is not None:
+            self.sim.close()
+        self.reader.close()
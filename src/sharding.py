@@ -0,0 +1,326 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing.connection import wait
+from multiprocessing.reduction import ForkingPickler
+from src.network import MessageType, NetworkMessage
+from src.outbound import OutboundQueue
+
+# Pipe protocol. Front door to worker:
+#   ('msg', client_id, type_value, sender_id, data)   a client message
+#   ('leave', client_id)                              client disconnected
+#   ('stop',)
+# Worker to front door:
+#   ('batch', [(client_ids, type_value, sender_id, data), ...])   one per round
+#   ('load', {'matches': n, 'players': n, 'round_ms': f})
+#
+# The front door never writes a pipe itself: items go through a bounded
+# per-worker queue drained by a writer thread, so it keeps reading worker
+# batches even while a busy worker isn't reading its pipe. Client moves
+# and state acks are unreliable there, superseded per client when a newer
+# one is queued and dropped first when the queue is full.
+
+UNRELIABLE_TYPES = (MessageType.PLAYER_MOVE.value, MessageType.STATE_ACK.value)
+
+class PipeServer:
+    """Stands in for a network server inside a worker process.
+
+    Gives MatchHost the get_message/send_to_clients/flush/clients API it
+    expects, with the front door's pipe behind it. Everything sent during a
+    round leaves as one pipe write on flush().
+    """
+    def __init__(self, conn):
+        self.conn = conn
+        self.clients = {}  # {client_id: True} for clients routed to this worker
+        self.inbox = queue.SimpleQueue()
+        self.outbox = []
+        self.stopped = False
+
+    def pump(self, timeout=0.0):
+        """Move every message waiting on the pipe into the inbox"""
+        while self.conn.poll(timeout):
+            timeout = 0.0
+            item = self.conn.recv()
+            if item[0] == 'msg':
+                _, client_id, type_value, sender_id, data = item
+                self.clients[client_id] = True
+                self.inbox.put((client_id, NetworkMessage(MessageType(type_value), sender_id, data)))
+            elif item[0] == 'leave':
+                self.clients.pop(item[1], None)
+            elif item[0] == 'stop':
+                self.stopped = True
+
+    def get_message(self):
+        try:
+            return self.inbox.get_nowait()
+        except queue.Empty:
+            return None
+
+    def send_to_clients(self, client_ids, message):
+        self.outbox.append((list(client_ids), message.type.value, message.sender_id, message.data))
+
+    def send_to_client(self, client_id, message):
+        self.send_to_clients((client_id,), message)
+
+    def broadcast_message(self, message):
+        self.send_to_clients(list(self.clients), message)
+
+    def flush(self):
+        if self.outbox:
+            self.conn.send(('batch', self.outbox))
+            self.outbox = []
+
+def _worker_main(conn, host_options, load_interval):
+    """Entry point of a worker process: run a MatchHost fed by the pipe"""
+    from src.match_host import MatchHost
+    server = PipeServer(conn)
+    host = MatchHost(server, **host_options)
+    dt = 1.0 / host.tick_rate
+    last = time.perf_counter()
+    last_load = last
+    try:
+        while not server.stopped:
+            server.pump(max(0.0, dt - (time.perf_counter() - last)))
+            now = time.perf_counter()
+            host.step_round(now - last)
+            round_ms = (time.perf_counter() - now) * 1000.0
+            last = now
+            if now - last_load >= load_interval:
+                last_load = now
+                conn.send(('load', {
+                    'matches': len(host.matches),
+                    'players': sum(len(match.clients) for match in host.matches.values()),
+                    'round_ms': round_ms,
+                }))
+    except (EOFError, OSError, KeyboardInterrupt):
+        pass  # Front door went away
+    finally:
+        host.stop()
+
+def _write_worker(conn, outbox):
+    """Drain a worker's outbound queue into its pipe"""
+    while True:
+        batch = outbox.get_batch()
+        if batch is None:
+            return
+        try:
+            for data in batch:
+                conn.send_bytes(data)
+        except (OSError, EOFError):
+            outbox.close()  # Dead worker; check_workers restarts it
+            return
+
+class WorkerHandle:
+    """Front door's view of one worker process"""
+    def __init__(self, slot, process, conn, queue_size=4096):
+        self.slot = slot
+        self.process = process
+        self.conn = conn
+        self.outbox = OutboundQueue(queue_size, max_reliable=queue_size * 4)
+        self.writer = threading.Thread(target=_write_worker, args=(conn, self.outbox),
+                                       name=f"match-worker-{slot}-writer", daemon=True)
+        self.writer.start()
+        self.matches = set()  # Match ids placed here
+        self.load = {'matches': 0, 'players': 0, 'round_ms': 0.0}  # Last report
+        self.restarts = 0
+
+    def send(self, item, key=None):
+        """Queue a pipe item for the writer; False if it was dropped"""
+        return self.outbox.put(ForkingPickler.dumps(item), key)
+
+    def close(self):
+        """Stop the writer once everything queued has been written"""
+        self.outbox.close()
+        self.writer.join(2.0)
+        self.conn.close()
+
+    def score(self):
+        """Placement cost: fewer matches first, then the lighter reported load"""
+        return (len(self.matches), self.load['players'], self.load['round_ms'])
+
+class ShardedHost:
+    """Front door that spreads matches over a pool of worker processes.
+
+    The front door owns the client connections and does no game logic.
+    Every MATCH_JOIN goes to the worker its match is placed on, the first
+    one placing it on the least loaded worker; from then on that match's
+    traffic is relayed over the worker's pipe and replies come back batched
+    once per worker tick. A join the worker refuses frees the client (and
+    the placement, if nobody else is in the match). A worker that dies is
+    restarted in its slot; only the matches it hosted end, and their
+    clients get GAME_END and may join again. So is a worker that falls so
+    far behind that its queue of reliable messages overflows.
+    """
+    def __init__(self, server, workers=None, host_options=None, load_interval=1.0, mp_context=None,
+                 queue_size=4096):
+        self.server = server
+        self.num_workers = workers or os.cpu_count() or 1
+        self.host_options = host_options or {}
+        self.load_interval = load_interval
+        self.context = mp_context or multiprocessing.get_context()
+        self.queue_size = queue_size  # Pipe items buffered per worker
+        self.workers = []
+        self.match_workers = {}  # {match_id: WorkerHandle}
+        self.client_workers = {}  # {client_id: WorkerHandle}
+        self.client_matches = {}  # {client_id: match_id}, joined or waiting for the worker's reply
+        self.joined = set()  # Clients whose join a worker accepted
+        self.running = False
+
+    def start(self):
+        self.workers = [self._spawn(slot) for slot in range(self.num_workers)]
+        self.running = True
+
+    def _spawn(self, slot):
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=_worker_main,
+                                       args=(child_conn, self.host_options, self.load_interval),
+                                       name=f"match-worker-{slot}", daemon=True)
+        process.start()
+        child_conn.close()
+        return WorkerHandle(slot, process, parent_conn, self.queue_size)
+
+    def place(self, match_id):
+        """Get the worker for a match, placing new matches on the least loaded one"""
+        worker = self.match_workers.get(match_id)
+        if worker is None:
+            worker = min(self.workers, key=WorkerHandle.score)
+            worker.matches.add(match_id)
+            self.match_workers[match_id] = worker
+        return worker
+
+    def release(self, match_id):
+        """Forget a match's placement once no client is in it or joining it"""
+        if match_id in self.match_workers and match_id not in self.client_matches.values():
+            self.match_workers.pop(match_id).matches.discard(match_id)
+
+    def route_client_messages(self):
+        """Relay queued client messages to their match's worker"""
+        while True:
+            item = self.server.get_message()
+            if not item:
+                break
+            client_id, message = item
+            worker = self.client_workers.get(client_id)
+            if message.type == MessageType.MATCH_JOIN and client_id not in self.joined:
+                if worker is not None:
+                    continue  # One join in flight per client
+                match_id = message.data.get('match_id') if isinstance(message.data, dict) else None
+                if type(match_id) is not int or match_id < 0:
+                    continue
+                worker = self.place(match_id)
+                self.client_workers[client_id] = worker
+                self.client_matches[client_id] = match_id
+            # A joined client's worker answers a MATCH_JOIN with the match it is in
+            if worker is None:
+                continue
+            key = (message.type.value, client_id) if message.type.value in UNRELIABLE_TYPES else None
+            worker.send(('msg', client_id, message.type.value, message.sender_id, message.data), key)
+
+    def _join_replied(self, worker, client_ids, data):
+        """Track a worker's answer to a MATCH_JOIN"""
+        for client_id in client_ids:
+            if self.client_workers.get(client_id) is not worker:
+                continue
+            if data.get('player_id') is not None:
+                self.joined.add(client_id)
+                self.client_matches[client_id] = data['match_id']
+            elif client_id not in self.joined:
+                # Refused (match full, running or host full): the client may try another
+                del self.client_workers[client_id]
+                self.release(self.client_matches.pop(client_id, None))
+                worker.send(('leave', client_id))
+
+    def relay_worker_messages(self, timeout=0.001):
+        """Deliver worker replies to clients"""
+        conns = {worker.conn: worker for worker in self.workers}
+        for conn in wait(list(conns), timeout):
+            worker = conns[conn]
+            try:
+                while conn.poll():
+                    item = conn.recv()
+                    if item[0] == 'batch':
+                        for client_ids, type_value, sender_id, data in item[1]:
+                            if type_value == MessageType.MATCH_JOIN.value:
+                                self._join_replied(worker, client_ids, data)
+                            self.server.send_to_clients(
+                                client_ids, NetworkMessage(MessageType(type_value), sender_id, data))
+                    elif item[0] == 'load':
+                        worker.load = item[1]
+            except (EOFError, OSError):
+                pass  # Worker died mid-message; check_workers handles it
+        self.server.flush()
+
+    def drop_disconnected(self):
+        for client_id in [cid for cid in self.client_workers if cid not in self.server.clients]:
+            worker = self.client_workers.pop(client_id)
+            self.client_matches.pop(client_id, None)
+            self.joined.discard(client_id)
+            worker.send(('leave', client_id))
+        # Matches with nobody left are forgotten so placement sees real load
+        live = set(self.client_matches.values())
+        for match_id in [mid for mid in self.match_workers if mid not in live]:
+            self.match_workers.pop(match_id).matches.discard(match_id)
+
+    def check_workers(self):
+        """Restart dead or stalled workers; only their matches end"""
+        for index, worker in enumerate(self.workers):
+            if worker.outbox.stalled and worker.process.is_alive():
+                print(f"Worker {worker.slot} stopped reading its pipe; restarting")
+                worker.process.terminate()
+                worker.process.join(2.0)
+            if worker.process.is_alive():
+                continue
+            print(f"Worker {worker.slot} exited ({worker.process.exitcode}); restarting")
+            worker.close()
+            lost = [cid for cid, w in self.client_workers.items() if w is worker]
+            for client_id in lost:
+                del self.client_workers[client_id]
+                self.client_matches.pop(client_id, None)
+                self.joined.discard(client_id)
+            self.server.send_to_clients(lost, NetworkMessage(
+                MessageType.GAME_END, 0, {'winner': None, 'error': 'match server restarted'}))
+            for match_id in worker.matches:
+                self.match_workers.pop(match_id, None)
+
+            replacement = self._spawn(worker.slot)
+            replacement.restarts = worker.restarts + 1
+            self.workers[index] = replacement
+        self.server.flush()
+
+    def run(self, health_interval=0.5):
+        """Relay traffic until stop() is called"""
+        if not self.running:
+            self.start()
+        last_check = time.perf_counter()
+        while self.running:
+            self.route_client_messages()
+            self.relay_worker_messages()
+            now = time.perf_counter()
+            if now - last_check >= health_interval:
+                last_check = now
+                self.drop_disconnected()
+                self.check_workers()
+
+    def stop(self):
+        self.running = False
+        for worker in self.workers:
+            worker.send(('stop',))
+            worker.outbox.close()  # The writer exits once 'stop' is written
+        for worker in self.workers:
+            worker.writer.join(2.0)
+            worker.process.join(2.0)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+    def get_stats(self):
+        """Per-worker placement and load for monitoring"""
+        return [{
+            'slot': worker.slot,
+            'pid': worker.process.pid,
+            'alive': worker.process.is_alive(),
+            'matches': sorted(worker.matches),
+            'restarts': worker.restarts,
+            'load': worker.load,
+        } for worker in self.workers]
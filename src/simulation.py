@@ -0,0 +1,666 @@
+import hashlib
+import math
+import random
+from enum import Enum
+from src.player import Player, PlayerRole, REFERENCE_FPS
+from src.task import Task
+from src.map import GameMap
+from src.impostor_abilities import KillManager, VentManager
+from src.voting import VoteManager
+from src.minigames import TaskMinigameFactory
+from src.systems import SoundManager, ChatManager, StatisticsTracker
+from src.timing import SimulationClock
+from src.spatial import SpatialHash
+from src.player_store import PlayerStore
+from src.event_log import EventLogWriter, EventType, capture_checkpoint
+
+def _is_coordinate(value):
+    return type(value) in (int, float) and math.isfinite(value)
+
+class GameState(Enum):
+    LOBBY = 1
+    DISCUSSION = 2
+    PLAYING = 3
+    VOTING = 4
+    GAME_OVER = 5
+
+class Simulation:
+    """Game logic core that runs without a display.
+
+    Holds players, tasks, kills, vents, votes and win checks. `Game` builds
+    its window and UI on top of this; servers and balance runs use it
+    directly and drive players through controllers or the action methods.
+
+    Time comes from a fixed-timestep SimulationClock and all randomness from
+    a per-match random.Random(seed), so two runs with the same seed and
+    inputs end in identical state.
+
+    With use_player_store=True, player state lives in a structure-of-arrays
+    PlayerStore and movement runs as one batched update per tick.
+
+    Chat history is written to chat_dir, or to a temporary directory if none
+    is given. With a StatsStore, player statistics also add up across matches.
+
+    record_events() writes every input and action, plus periodic state
+    checkpoints, to a binary event log that src.replay can re-run.
+    """
+    def __init__(self, width=1280, height=720, enable_sound=False, voting_ticks=600, seed=None, tick_rate=60,
+                 use_player_store=False, chat_dir=None, stats_store=None):
+        self.width = width
+        self.height = height
+
+        # Deterministic time and randomness
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.sim_clock = SimulationClock(tick_rate)
+
+        self.players = {}
+        self.player_store = PlayerStore() if use_player_store else None
+        self.current_state = GameState.LOBBY
+        self.tasks = []
+        self.impostors = []
+        self.emergency_meetings_left = 1
+        self.next_player_id = 1
+
+        # Game systems
+        self.game_map = GameMap(width, height)
+        self.kill_manager = KillManager(clock=self.sim_clock)
+        self.vent_manager = VentManager(clock=self.sim_clock)
+        self.vote_manager = VoteManager()
+        self.sound_manager = SoundManager(enable_sound=enable_sound)
+        self.chat_manager = ChatManager(history_dir=chat_dir, clock=self.sim_clock)
+        self.stats_tracker = StatisticsTracker(stats_store)
+
+        # Proximity indexes, kept current as players move
+        self.player_index = SpatialHash(cell_size=64)
+        self.body_index = SpatialHash(cell_size=64)  # {victim_id: body position}
+        self.report_distance = 60
+
+        # Client-reported moves: ticks of walking a late move may make up for
+        self.max_move_ticks = 15
+        self._move_ticks = {}  # {player_id: tick of the last client-reported move}
+
+        # Game state
+        self.game_over = False
+        self.winning_team = None
+        self.replica = False  # Mirrors a server's match: the outcome comes from the server, not local checks
+
+        # Running win-condition counters, updated on deaths, disconnects and
+        # task completion so check_game_end never scans players or tasks
+        self.alive_counts = {PlayerRole.CREWMATE: 0, PlayerRole.IMPOSTOR: 0}
+        self.tasks_done = 0
+        self.tasks_total = 0
+        self.disconnected = set()  # Player ids that left mid-game
+
+        # Headless driving
+        self.controllers = {}  # {player_id: controller(sim, player)}
+        self.voting_ticks = voting_ticks  # Ticks before a meeting auto-resolves
+        self.applied_votes = []  # Queued votes applied on the last tick, as (voter_id, voted_id)
+        self._voting_started_tick = 0
+
+        # Event recording (see record_events)
+        self.event_log = None
+        self._recorded_velocity = {}  # {player_id: (vx, vy)} last written to the log
+
+    def add_player(self, name, color):
+        """Add a new player to the game"""
+        if self.player_store is not None:
+            player = self.player_store.add_player(self.next_player_id, name, color)
+        else:
+            player = Player(self.next_player_id, name, color)
+        player.bounds = (self.width, self.height)
+        player.x = self.width // 2 + self.rng.randint(-100, 100)
+        player.y = self.height // 2 + self.rng.randint(-100, 100)
+        player.spatial_index = self.player_index
+        self.player_index.insert(player.id, player.x, player.y)
+        self.players[self.next_player_id] = player
+        if player.is_alive:
+            self.alive_counts[player.role] += 1
+        self.stats_tracker.create_player_stat(self.next_player_id, name)
+        self.next_player_id += 1
+        return player
+
+    def start_game(self, num_impostors=1):
+        """Start the game and assign roles"""
+        if len(self.players) < 4:
+            print("Need at least 4 players to start")
+            return False
+
+        player_list = list(self.players.values())
+
+        # Randomly assign impostors
+        self.rng.shuffle(player_list)
+        self.impostors = player_list[:num_impostors]
+
+        for impostor in self.impostors:
+            impostor.set_role(PlayerRole.IMPOSTOR)
+
+        # Create tasks for crewmates
+        self.create_tasks()
+        self.recount()
+
+        self.current_state = GameState.PLAYING
+        if self.event_log is not None:
+            self._record(EventType.START, num_impostors)
+            self.checkpoint()
+        return True
+
+    def create_tasks(self):
+        """Create tasks for the game"""
+        task_types = [
+            "Fix Wiring",
+            "Swipe Card",
+            "Start Reactor",
+            "Divert Power",
+        ]
+
+        for player in self.players.values():
+            if player.role == PlayerRole.CREWMATE:
+                # Assign 2-3 tasks per crewmate
+                num_tasks = self.rng.randint(2, 3)
+                for _ in range(num_tasks):
+                    task_type = self.rng.choice(task_types)
+                    task = Task(player.id, task_type)
+                    self.tasks.append(task)
+
+    def create_minigame(self, task_id, task_type):
+        """Create a task minigame seeded from the match RNG"""
+        return TaskMinigameFactory.create_minigame(task_id, task_type, rng=self.rng)
+
+    @property
+    def tick_count(self):
+        return self.sim_clock.tick
+
+    def update(self):
+        """Advance game logic by one fixed tick"""
+        self.applied_votes = []
+        if self.event_log is not None:
+            self._record_velocities()
+        if self.current_state == GameState.VOTING:
+            # Votes queued by network threads since the last tick, as one batch
+            self.applied_votes = self.vote_manager.apply_pending(self._accepts_vote)
+            for voter_id, voted_id in self.applied_votes:
+                self._record(EventType.VOTE, voter_id, voted_id)
+        elif self.current_state == GameState.PLAYING:
+            dt = self.sim_clock.dt
+            if self.player_store is not None:
+                self.player_store.update(dt, self.width, self.height, self.player_index)
+            else:
+                for player in self.players.values():
+                    player.update(dt)
+
+            # Check if game should end
+            self.check_game_end()
+
+        self.chat_manager.flush()  # This tick's chat, as one batch
+        self.sim_clock.advance()
+        if (self.event_log is not None and self.current_state != GameState.LOBBY
+                and self.tick_count % self.event_log.checkpoint_interval == 0):
+            self.checkpoint()
+
+    def step(self):
+        """Advance one headless tick: run controllers, then game logic"""
+        for player_id, controller in list(self.controllers.items()):
+            player = self.players.get(player_id)
+            if player is not None:
+                controller(self, player)
+
+        if self.current_state == GameState.VOTING:
+            alive = self.alive_counts[PlayerRole.CREWMATE] + self.alive_counts[PlayerRole.IMPOSTOR]
+            timed_out = self.tick_count - self._voting_started_tick >= self.voting_ticks
+            if len(self.vote_manager.votes) >= alive or timed_out:
+                self.resolve_voting()
+
+        self.update()
+
+    def run_ticks(self, num_ticks):
+        """Step up to num_ticks ticks, stopping early when the game ends"""
+        ticks_run = 0
+        while ticks_run < num_ticks and not self.game_over:
+            self.step()
+            ticks_run += 1
+        return ticks_run
+
+    def set_controller(self, player_id, controller):
+        """Drive a player with controller(sim, player) on every tick"""
+        self.controllers[player_id] = controller
+
+    def set_player_input(self, player_id, move_x, move_y):
+        """Apply a movement input (-1, 0 or 1 per axis), like WASD"""
+        player = self.players.get(player_id)
+        if player is None or not player.is_alive:
+            return False
+        player.velocity_x = move_x * player.speed
+        player.velocity_y = move_y * player.speed
+        return True
+
+    def set_player_position(self, player_id, x, y):
+        """Teleport a player to a position reported from outside (e.g. a client)"""
+        player = self.players.get(player_id)
+        if player is None:
+            return False
+        self._record(EventType.MOVE, player_id, x, y)
+        player.set_position(x, y)
+        return True
+
+    def move_player(self, player_id, x, y):
+        """Apply a position a client reports for its own player.
+
+        Anything but finite int/float coordinates is dropped. The move is
+        clamped to the distance the player could have walked since its last
+        reported move, and to the map, so a client can't teleport.
+        """
+        player = self.players.get(player_id)
+        if player is None or not (_is_coordinate(x) and _is_coordinate(y)):
+            return False
+        elapsed = min(self.tick_count - self._move_ticks.get(player_id, self.tick_count - 1), self.max_move_ticks)
+        reach = player.speed * self.sim_clock.dt * REFERENCE_FPS * max(elapsed, 0)
+        dx, dy = x - player.x, y - player.y
+        distance = math.hypot(dx, dy)
+        if distance > reach:
+            scale = reach / distance
+            x, y = player.x + dx * scale, player.y + dy * scale
+        x = max(player.size, min(self.width - player.size, x))
+        y = max(player.size, min(self.height - player.size, y))
+        self._move_ticks[player_id] = self.tick_count
+        return self.set_player_position(player_id, x, y)
+
+    def try_kill(self, impostor_id, victim_id):
+        """Attempt a kill on behalf of an impostor"""
+        if self.current_state != GameState.PLAYING:
+            return False
+        impostor = self.players.get(impostor_id)
+        victim = self.players.get(victim_id)
+        if impostor is None or victim is None or impostor is victim:
+            return False
+        if impostor.role != PlayerRole.IMPOSTOR or not impostor.is_alive or not victim.is_alive:
+            return False
+        if not self.kill_manager.execute_kill(impostor, victim):
+            return False
+        self.player_died(victim)
+        self.body_index.insert(victim.id, victim.x, victim.y)
+        self.stats_tracker.record_kill(impostor.id)
+        self.sound_manager.play_sound('kill')
+        self._record(EventType.KILL, impostor_id, victim_id)
+        return True
+
+    def kill_target_for(self, impostor_id):
+        """Get the nearest living crewmate an impostor could kill, or None"""
+        impostor = self.players.get(impostor_id)
+        if impostor is None or not impostor.is_alive:
+            return None
+        return self.kill_manager.find_target(impostor, self.players, self.player_index)
+
+    def players_in_range(self, x, y, radius, alive_only=True):
+        """Get players within radius of a point"""
+        players = self.players
+        predicate = (lambda pid: players[pid].is_alive) if alive_only else None
+        return [players[pid] for pid in self.player_index.query_radius(x, y, radius, predicate)]
+
+    def bodies_near(self, x, y, radius):
+        """Get ids of unreported bodies within radius of a point"""
+        return self.body_index.query_radius(x, y, radius)
+
+    def report_body(self, reporter_id):
+        """Report a body within reach of a living player, starting a meeting"""
+        if self.current_state != GameState.PLAYING:
+            return False
+        reporter = self.players.get(reporter_id)
+        if reporter is None or not reporter.is_alive:
+            return False
+        if self.body_index.nearest(reporter.x, reporter.y, self.report_distance) is None:
+            return False
+        self._record(EventType.REPORT, reporter_id)
+        self.start_voting()
+        return True
+
+    def try_vent(self, player_id):
+        """Vent an impostor to the vent connected to the one they stand on"""
+        if self.current_state != GameState.PLAYING:
+            return False
+        player = self.players.get(player_id)
+        if player is None or player.role != PlayerRole.IMPOSTOR or not player.is_alive:
+            return False
+        vent = self.game_map.get_vent_near(player.x, player.y)
+        if not vent or vent.connected_vent_id not in self.game_map.vents:
+            return False
+        connected = self.game_map.vents[vent.connected_vent_id]
+        if not self.vent_manager.execute_vent(player, vent, connected, self.game_map):
+            return False
+        self._record(EventType.VENT, player_id)
+        self.sound_manager.play_sound('vent')
+        return True
+
+    def call_emergency_meeting(self):
+        """Call an emergency meeting if any are left"""
+        if self.current_state != GameState.PLAYING or self.emergency_meetings_left <= 0:
+            return False
+        self._record(EventType.MEETING)
+        self.start_voting()
+        self.emergency_meetings_left -= 1
+        self.sound_manager.play_sound('emergency')
+        return True
+
+    def _can_vote(self, voter_id):
+        voter = self.players.get(voter_id)
+        return voter is not None and voter.is_alive
+
+    def _accepts_vote(self, voter_id, voted_id):
+        """A living voter may skip (None) or vote for a living candidate"""
+        if not self._can_vote(voter_id):
+            return False
+        if voted_id is None:
+            return True
+        if type(voted_id) is not int:
+            return False
+        return voted_id in self.vote_manager.vote_counts and self.players[voted_id].is_alive
+
+    def cast_vote(self, voter_id, voted_id):
+        """Cast a vote for a living voter, for a living candidate or None to skip"""
+        if not self._accepts_vote(voter_id, voted_id) or not self.vote_manager.vote(voter_id, voted_id):
+            return False
+        self._record(EventType.VOTE, voter_id, voted_id)
+        return True
+
+    def queue_vote(self, voter_id, voted_id):
+        """Queue a vote from any thread; it is checked and applied on the next step.
+
+        Anything but None or an int id (e.g. from a malformed message) is dropped here.
+        """
+        if voted_id is not None and type(voted_id) is not int:
+            return False
+        self.vote_manager.submit(voter_id, voted_id)
+        return True
+
+    def complete_task(self, task):
+        """Mark a task complete and record it"""
+        if task.completed:
+            return False
+        if self.event_log is not None:
+            self._record(EventType.TASK, self.tasks.index(task))
+        task.complete()
+        if task.assigned_to_player_id not in self.disconnected:
+            self.tasks_done += 1
+        self.stats_tracker.record_task_completion(task.assigned_to_player_id)
+        self.sound_manager.play_sound('task_complete')
+        return True
+
+    def add_chat_message(self, player_name, player_id, text):
+        """Add a player's chat message to the match's chat"""
+        self._record(EventType.CHAT, player_id, player_name, text)
+        self.chat_manager.add_message(player_name, player_id, text)
+
+    def start_voting(self):
+        """Start voting phase"""
+        self.current_state = GameState.VOTING
+        self.body_index.clear()  # Bodies are cleaned up once a meeting starts
+        # Only the living can be voted out
+        self.vote_manager.start_voting({pid: p for pid, p in self.players.items() if p.is_alive})
+        self._voting_started_tick = self.tick_count
+        self.sound_manager.play_sound('vote')
+
+    def resolve_voting(self):
+        """End voting, eject the winner (ties eject nobody) and resume play"""
+        self._record(EventType.VOTE_END)
+        result = self.vote_manager.end_voting()
+        ejected = None
+        # A candidate who died or left during the meeting can't be ejected again
+        candidate = self.players.get(result) if result is not None and not isinstance(result, list) else None
+        if candidate is not None and candidate.is_alive:
+            ejected = candidate
+            ejected.kill()
+            self.player_died(ejected)
+            self.stats_tracker.record_ejection(ejected.id)
+            self.sound_manager.play_sound('eject')
+        self.current_state = GameState.PLAYING
+        return ejected
+
+    def state_digest(self):
+        """Hash of the simulated state, for comparing runs"""
+        parts = [repr((self.tick_count, self.current_state.name, self.winning_team))]
+        for player in self.players.values():
+            parts.append(repr((player.id, float(player.x), float(player.y), player.is_alive, player.role.name)))
+        parts.append(repr([task.completed for task in self.tasks]))
+        parts.append(repr(sorted(self.vote_manager.votes.items(), key=repr)))
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def end_game(self, winning_team):
+        """End the game"""
+        self.game_over = True
+        self.winning_team = winning_team
+        self._record(EventType.END, winning_team)
+        self.sound_manager.play_sound('eject')
+
+    def recount(self):
+        """Rebuild the win-condition counters from scratch (after role or task setup)"""
+        self.alive_counts = {PlayerRole.CREWMATE: 0, PlayerRole.IMPOSTOR: 0}
+        for player in self.players.values():
+            if player.is_alive and player.id not in self.disconnected:
+                self.alive_counts[player.role] += 1
+        counted = [task for task in self.tasks if task.assigned_to_player_id not in self.disconnected]
+        self.tasks_total = len(counted)
+        self.tasks_done = sum(1 for task in counted if task.completed)
+
+    def player_died(self, player):
+        """Count a player that was just killed or ejected"""
+        if player.id not in self.disconnected:
+            self.alive_counts[player.role] -= 1
+
+    def set_player_alive(self, player, alive):
+        """Set a player's alive flag from outside the game rules (e.g. a snapshot)"""
+        if player.is_alive == alive:
+            return
+        player.is_alive = alive
+        if player.id not in self.disconnected:
+            self.alive_counts[player.role] += 1 if alive else -1
+
+    def set_task_completed(self, task, completed):
+        """Set a task's completed flag from outside the game rules (e.g. a snapshot)"""
+        if task.completed == completed:
+            return
+        task.completed = completed
+        if task.assigned_to_player_id not in self.disconnected:
+            self.tasks_done += 1 if completed else -1
+
+    def disconnect_player(self, player_id):
+        """Take a player who left out of the match.
+
+        They stay in players (as dead) so ids and snapshots stay stable, but
+        no longer count as alive, and their tasks drop out of the task total
+        so the crew can still win.
+        """
+        player = self.players.get(player_id)
+        if player is None or player_id in self.disconnected:
+            return False
+        if player.is_alive:
+            player.is_alive = False
+            self.alive_counts[player.role] -= 1
+        for task in self.tasks:
+            if task.assigned_to_player_id == player_id:
+                self.tasks_total -= 1
+                if task.completed:
+                    self.tasks_done -= 1
+        self._record(EventType.DISCONNECT, player_id)
+        self.disconnected.add(player_id)
+        self.controllers.pop(player_id, None)
+        self.vote_manager.remove_vote(player_id)
+        return True
+
+    def record_events(self, path, checkpoint_interval=600):
+        """Start writing this match's events to a binary event log at path.
+
+        A checkpoint of the full state is written when the game starts and
+        every checkpoint_interval ticks after that, so a Replay can seek to
+        any tick and verify itself against the recording.
+        """
+        self.event_log = EventLogWriter(path, {
+            'seed': self.seed,
+            'tick_rate': self.sim_clock.tick_rate,
+            'width': self.width,
+            'height': self.height,
+            'voting_ticks': self.voting_ticks,
+            'use_player_store': self.player_store is not None,
+        }, checkpoint_interval)
+        if self.current_state != GameState.LOBBY:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Write a full-state checkpoint to the event log"""
+        self.event_log.checkpoint(self.tick_count, capture_checkpoint(self))
+        self._recorded_velocity = {player.id: (player.velocity_x, player.velocity_y)
+                                   for player in self.players.values()}
+
+    def _record(self, event_type, *fields):
+        if self.event_log is not None:
+            self.event_log.write(self.tick_count, event_type, *fields)
+
+    def _record_velocities(self):
+        """Log every velocity that changed since it was last logged"""
+        recorded = self._recorded_velocity
+        for player in self.players.values():
+            velocity = (player.velocity_x, player.velocity_y)
+            if recorded.get(player.id) != velocity:
+                recorded[player.id] = velocity
+                self.event_log.write(self.tick_count, EventType.VELOCITY, player.id, *velocity)
+
+    def stop_recording(self):
+        """Finish the event log with a closing checkpoint"""
+        if self.event_log is None:
+            return
+        if self.current_state != GameState.LOBBY and self.event_log.last_checkpoint_tick != self.tick_count:
+            self.checkpoint()
+        self.event_log.close()
+        self.event_log = None
+
+    def close(self):
+        """Release the match's files: the event log and chat history"""
+        self.stop_recording()
+        self.chat_manager.close()
+
+    def count_alive(self, role=None):
+        """Count living players, optionally of one role"""
+        if self.player_store is not None:
+            return self.player_store.count_alive(role)
+        return sum(1 for p in self.players.values() if p.is_alive and (role is None or p.role == role))
+
+    def check_game_end(self):
+        """Check win/loss conditions from the running counters; ends the game once"""
+        if self.game_over or self.replica:
+            return
+        num_crewmates = self.alive_counts[PlayerRole.CREWMATE]
+        num_impostors = self.alive_counts[PlayerRole.IMPOSTOR]
+        tasks_done = self.tasks_total > 0 and self.tasks_done == self.tasks_total
+        impostors_ejected = num_impostors == 0 and num_crewmates > 0
+        impostors_win = num_impostors >= num_crewmates and num_crewmates > 0
+
+        # Crewmates win if all tasks are completed or all impostors are gone;
+        # otherwise impostors win once they equal or outnumber crewmates
+        if tasks_done or impostors_ejected:
+            winner = "CREWMATES"
+        elif impostors_win:
+            winner = "IMPOSTORS"
+        else:
+            return
+        self.end_game(winner)
+
+        for player in self.players.values():
+            if not player.is_alive:
+                continue
+            role = player.role.name
+            if (player.role == PlayerRole.IMPOSTOR) == (winner == "IMPOSTORS"):
+                self.stats_tracker.add_game_win(player.id, role)
+            else:
+                self.stats_tracker.add_game_loss(player.id, role)
+
+class ScriptedController:
+    """Replays a fixed script of actions keyed by tick.
+
+    script maps tick -> list of actions, each one of:
+    ('move', dx, dy), ('kill', victim_id), ('vent',), ('meeting',),
+    ('vote', voted_id), ('report',) or ('task',) to finish the player's next
+    open task.
+    """
+    def __init__(self, script):
+        self.script = script
+
+    def __call__(self, sim, player):
+        for action in self.script.get(sim.tick_count, ()):
+            name, args = action[0], action[1:]
+            if name == 'move':
+                sim.set_player_input(player.id, *args)
+            elif name == 'kill':
+                sim.try_kill(player.id, *args)
+            elif name == 'vent':
+                sim.try_vent(player.id)
+            elif name == 'meeting':
+                sim.call_emergency_meeting()
+            elif name == 'vote':
+                sim.cast_vote(player.id, *args)
+            elif name == 'report':
+                sim.report_body(player.id)
+            elif name == 'task':
+                for task in sim.tasks:
+                    if task.assigned_to_player_id == player.id and not task.completed:
+                        sim.complete_task(task)
+                        break
+
+class WanderBot:
+    """Simple bot: wanders between random points, does tasks or kills.
+
+    Crewmates finish one of their tasks every task_interval ticks, and keep
+    doing so as ghosts. Impostors kill any living crewmate in range once off
+    cooldown. During meetings the bot votes for a random living player or
+    skips.
+    """
+    def __init__(self, task_interval=300, skip_chance=0.3):
+        self.task_interval = task_interval
+        self.skip_chance = skip_chance
+        self.target = None
+        self.ticks_since_task = 0
+
+    def __call__(self, sim, player):
+        if not player.is_alive and player.role == PlayerRole.IMPOSTOR:
+            return
+
+        if sim.current_state == GameState.VOTING:
+            if not player.is_alive:
+                return
+            if player.id not in sim.vote_manager.votes:
+                alive = [pid for pid, p in sim.players.items() if p.is_alive and pid != player.id]
+                if alive and sim.rng.random() >= self.skip_chance:
+                    sim.cast_vote(player.id, sim.rng.choice(alive))
+                else:
+                    sim.cast_vote(player.id, None)
+            return
+
+        if sim.current_state != GameState.PLAYING:
+            return
+
+        if player.is_alive:
+            self._wander(sim, player)
+
+        if player.role == PlayerRole.IMPOSTOR:
+            if sim.kill_manager.can_kill(player.id):
+                target = sim.kill_target_for(player.id)
+                if target is not None:
+                    sim.try_kill(player.id, target.id)
+        else:
+            self.ticks_since_task += 1
+            if self.ticks_since_task >= self.task_interval:
+                self.ticks_since_task = 0
+                for task in sim.tasks:
+                    if task.assigned_to_player_id == player.id and not task.completed:
+                        sim.complete_task(task)
+                        break
+
+    def _wander(self, sim, player):
+        """Walk towards the current waypoint, picking a new one on arrival"""
+        if self.target is None or (abs(player.x - self.target[0]) <= player.speed
+                                   and abs(player.y - self.target[1]) <= player.speed):
+            self.target = (
+                sim.rng.randint(player.size, sim.width - player.size),
+                sim.rng.randint(player.size, sim.height - player.size),
+            )
+        player.move_towards(*self.target)
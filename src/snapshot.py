@@ -0,0 +1,209 @@
+from collections import OrderedDict
+from src.player import PlayerRole
+
+# A snapshot is {section: {key: value}} with string keys, so it survives a
+# JSON round trip unchanged and deltas can be computed section by section.
+SECTIONS = ('players', 'tasks', 'meeting', 'cooldowns')
+
+def capture_snapshot(sim):
+    """Capture the replicated world state of a Simulation.
+
+    Cooldowns are only captured for impostors, so the whole snapshot must
+    never go to a client as is: send each client its view (see own_view).
+    """
+    players = {}
+    cooldowns = {}
+    for player in sim.players.values():
+        players[str(player.id)] = [round(player.x, 1), round(player.y, 1), player.is_alive]
+        if player.role == PlayerRole.IMPOSTOR:
+            cooldowns[str(player.id)] = [
+                round(sim.kill_manager.get_kill_cooldown(player.id), 1),
+                round(sim.vent_manager.get_vent_cooldown(player.id), 1),
+            ]
+
+    meeting = {
+        'state': sim.current_state.name,
+        'meetings_left': sim.emergency_meetings_left,
+        'winner': sim.winning_team,
+    }
+    for voter_id, voted_id in sim.vote_manager.votes.items():
+        meeting[f"vote:{voter_id}"] = voted_id
+
+    return {
+        'players': players,
+        'tasks': {str(index): task.completed for index, task in enumerate(sim.tasks)},
+        'meeting': meeting,
+        'cooldowns': cooldowns,
+    }
+
+def own_view(snapshot, viewer_id):
+    """A snapshot with only the viewing player's own cooldowns left in.
+
+    Whose cooldowns exist at all would reveal who the impostors are.
+    """
+    key = str(viewer_id)
+    cooldowns = snapshot['cooldowns']
+    view = dict(snapshot)
+    view['cooldowns'] = {key: cooldowns[key]} if key in cooldowns else {}
+    return view
+
+def diff_snapshots(base, snapshot):
+    """Get the changes that turn base into snapshot"""
+    changes = {}
+    removed = {}
+    for section in SECTIONS:
+        old = base.get(section, {})
+        new = snapshot.get(section, {})
+        changed = {key: value for key, value in new.items() if key not in old or old[key] != value}
+        gone = [key for key in old if key not in new]
+        if changed:
+            changes[section] = changed
+        if gone:
+            removed[section] = gone
+    return changes, removed
+
+def patch_snapshot(base, changes, removed):
+    """Apply changes from diff_snapshots to a copy of base"""
+    snapshot = {}
+    for section in SECTIONS:
+        values = dict(base.get(section, {}))
+        for key in removed.get(section, ()):
+            values.pop(key, None)
+        values.update(changes.get(section, {}))
+        snapshot[section] = values
+    return snapshot
+
+class SnapshotReplicator:
+    """Server side of snapshot replication.
+
+    Keeps a short history of tick-numbered snapshots and, per client, the
+    newest tick that client acknowledged. Updates are deltas against that
+    acknowledged snapshot, so a lost packet only means the next delta is a
+    bit larger. A full keyframe goes out when the client has no usable base
+    or every keyframe_interval ticks.
+
+    Each client can get its own view of a snapshot (e.g. only its own
+    cooldowns). Views are remembered per client until acknowledged, so
+    deltas are always taken against what that client actually holds.
+    """
+    def __init__(self, keyframe_interval=120, history_size=64):
+        self.keyframe_interval = keyframe_interval
+        self.history = OrderedDict()  # {tick: snapshot}
+        self.history_size = history_size
+        self.acked_ticks = {}  # {client_id: newest acknowledged tick}
+        self.last_keyframe = {}  # {client_id: tick of last keyframe sent}
+        self.sent = {}  # {client_id: OrderedDict {tick: snapshot view sent}}
+
+    def record(self, tick, snapshot):
+        """Store the snapshot for a tick"""
+        self.history[tick] = snapshot
+        while len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+
+    def build_update(self, client_id, tick=None, view=None):
+        """Build GAME_STATE data for a client: a delta or a full keyframe.
+
+        view(snapshot), if given, returns the part of the snapshot this
+        client may see.
+        """
+        if tick is None:
+            tick = next(reversed(self.history))
+        snapshot = self.history[tick]
+        if view is not None:
+            snapshot = view(snapshot)
+        sent = self.sent.setdefault(client_id, OrderedDict())
+        sent[tick] = snapshot
+        while len(sent) > self.history_size:
+            sent.popitem(last=False)
+
+        base_tick = self.acked_ticks.get(client_id)
+        keyframe_due = tick - self.last_keyframe.get(client_id, -self.keyframe_interval) >= self.keyframe_interval
+        if base_tick is None or base_tick not in sent or keyframe_due:
+            self.last_keyframe[client_id] = tick
+            return {'tick': tick, 'base': None, 'changes': snapshot, 'removed': {}}
+
+        changes, removed = diff_snapshots(sent[base_tick], snapshot)
+        return {'tick': tick, 'base': base_tick, 'changes': changes, 'removed': removed}
+
+    def acknowledge(self, client_id, tick):
+        """Record that a client has applied the snapshot for tick"""
+        sent = self.sent.get(client_id)
+        if sent is None or type(tick) is not int or tick not in sent or tick <= self.acked_ticks.get(client_id, -1):
+            return
+        self.acked_ticks[client_id] = tick
+        while next(iter(sent)) < tick:
+            sent.popitem(last=False)  # Older views can never be a base again
+
+    def remove_client(self, client_id):
+        self.acked_ticks.pop(client_id, None)
+        self.last_keyframe.pop(client_id, None)
+        self.sent.pop(client_id, None)
+
+class SnapshotReceiver:
+    """Client side of snapshot replication.
+
+    Rebuilds full snapshots from keyframes and deltas. A delta whose base
+    was never received is dropped; the server keeps sending deltas against
+    the last acknowledged tick (or a keyframe) until one applies.
+    """
+    def __init__(self, history_size=64):
+        self.snapshots = OrderedDict()  # {tick: snapshot}
+        self.history_size = history_size
+        self.latest_tick = -1
+
+    def apply(self, data):
+        """Rebuild the snapshot in a GAME_STATE update, or None if unusable"""
+        tick = data.get('tick')
+        if tick is None or tick <= self.latest_tick:
+            return None  # Stale or duplicate
+
+        base_tick = data.get('base')
+        if base_tick is None:
+            snapshot = patch_snapshot({}, data.get('changes', {}), {})
+        else:
+            base = self.snapshots.get(base_tick)
+            if base is None:
+                return None
+            snapshot = patch_snapshot(base, data.get('changes', {}), data.get('removed', {}))
+
+        self.snapshots[tick] = snapshot
+        self.latest_tick = tick
+        while len(self.snapshots) > self.history_size:
+            self.snapshots.popitem(last=False)
+        return snapshot
+
+def apply_snapshot(sim, snapshot, predicted_ids=()):
+    """Overwrite a Simulation's replicated state with a snapshot.
+
+    Players in predicted_ids keep their locally predicted positions. The
+    Simulation becomes a replica: it only sees part of the match, so it
+    takes game over and the winner from the server instead of deciding
+    them itself.
+    """
+    from src.simulation import GameState
+
+    sim.replica = True
+
+    for key, (x, y, alive) in snapshot['players'].items():
+        player = sim.players.get(int(key))
+        if player is None:
+            continue
+        if x is not None and player.id not in predicted_ids:  # Ghost positions are withheld
+            player.set_position(x, y)
+        sim.set_player_alive(player, alive)
+
+    for key, completed in snapshot['tasks'].items():
+        index = int(key)
+        if index < len(sim.tasks):
+            sim.set_task_completed(sim.tasks[index], completed)
+
+    meeting = snapshot['meeting']
+    if 'state' in meeting:
+        sim.current_state = GameState[meeting['state']]
+    sim.emergency_meetings_left = meeting.get('meetings_left', sim.emergency_meetings_left)
+    if meeting.get('winner'):
+        sim.game_over = True
+        sim.winning_team = meeting['winner']
+    sim.vote_manager.load_votes({
+        int(key.split(':', 1)[1]): voted_id for key, voted_id in meeting.items() if key.startswith('vote:')
+    }, sim.players)
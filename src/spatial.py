@@ -0,0 +1,121 @@
+class SpatialHash:
+    """Uniform-grid spatial index over 2D points.
+
+    Entities are stored by key in square cells of cell_size pixels, so a
+    radius query only looks at the few cells the circle overlaps instead of
+    every entity on the map. Distances are compared squared (no sqrt).
+    """
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}  # {(cell_x, cell_y): set of keys}
+        self.positions = {}  # {key: (x, y, cell)}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def _cell(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, key, x, y):
+        """Add an entity, or move it if it is already indexed"""
+        if key in self.positions:
+            self.move(key, x, y)
+            return
+        cell = self._cell(x, y)
+        self.cells.setdefault(cell, set()).add(key)
+        self.positions[key] = (x, y, cell)
+
+    def move(self, key, x, y):
+        """Update an entity's position; only touches cells when it crosses one"""
+        entry = self.positions.get(key)
+        if entry is None:
+            self.insert(key, x, y)
+            return
+        cell = self._cell(x, y)
+        old_cell = entry[2]
+        if cell != old_cell:
+            bucket = self.cells[old_cell]
+            bucket.discard(key)
+            if not bucket:
+                del self.cells[old_cell]
+            self.cells.setdefault(cell, set()).add(key)
+        self.positions[key] = (x, y, cell)
+
+    def move_many(self, keys, xs, ys):
+        """Update many positions at once (same result as calling move per key)"""
+        cell_size = self.cell_size
+        cells = self.cells
+        positions = self.positions
+        for key, x, y in zip(keys, xs, ys):
+            cell = (int(x // cell_size), int(y // cell_size))
+            entry = positions.get(key)
+            if entry is None:
+                cells.setdefault(cell, set()).add(key)
+            elif cell != entry[2]:
+                bucket = cells[entry[2]]
+                bucket.discard(key)
+                if not bucket:
+                    del cells[entry[2]]
+                cells.setdefault(cell, set()).add(key)
+            positions[key] = (x, y, cell)
+
+    def remove(self, key):
+        """Drop an entity from the index"""
+        entry = self.positions.pop(key, None)
+        if entry is None:
+            return
+        bucket = self.cells[entry[2]]
+        bucket.discard(key)
+        if not bucket:
+            del self.cells[entry[2]]
+
+    def clear(self):
+        self.cells.clear()
+        self.positions.clear()
+
+    def get_position(self, key):
+        entry = self.positions.get(key)
+        return (entry[0], entry[1]) if entry else None
+
+    def _candidates(self, x, y, radius):
+        """Yield (key, x, y) for entities in cells overlapping the circle"""
+        min_cx, min_cy = self._cell(x - radius, y - radius)
+        max_cx, max_cy = self._cell(x + radius, y + radius)
+        cells = self.cells
+        positions = self.positions
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    for key in bucket:
+                        px, py, _ = positions[key]
+                        yield key, px, py
+
+    def query_radius(self, x, y, radius, predicate=None):
+        """Get keys within radius of (x, y), optionally filtered"""
+        radius_sq = radius * radius
+        found = []
+        for key, px, py in self._candidates(x, y, radius):
+            dx = px - x
+            dy = py - y
+            if dx * dx + dy * dy <= radius_sq and (predicate is None or predicate(key)):
+                found.append(key)
+        return found
+
+    def nearest(self, x, y, max_distance, predicate=None):
+        """Get the closest key within max_distance of (x, y), or None"""
+        best_key = None
+        best_sq = max_distance * max_distance
+        for key, px, py in self._candidates(x, y, max_distance):
+            dx = px - x
+            dy = py - y
+            dist_sq = dx * dx + dy * dy
+            if dist_sq <= best_sq and (predicate is None or predicate(key)):
+                # Break distance ties on key so results don't depend on set order
+                if best_key is None or dist_sq < best_sq or key < best_key:
+                    best_key = key
+                    best_sq = dist_sq
+        return best_key
@@ -0,0 +1,148 @@
+import sqlite3
+import threading
+from src.leaderboard import LeaderboardSet
+
+# Counters kept per player name; win_rate is derived from them
+STAT_FIELDS = (
+    'games_played',
+    'games_won',
+    'games_as_crewmate',
+    'games_as_impostor',
+    'kills',
+    'tasks_completed',
+    'votes_cast',
+    'times_ejected',
+)
+
+def _win_rate(record):
+    played = record['games_played']
+    return record['games_won'] / played if played else 0.0
+
+class StatsStore:
+    """Lifetime player statistics in SQLite, written behind the game loop.
+
+    Every row is loaded into memory when the store opens, so reads never
+    touch the database. Updates change the in-memory record and add to a
+    buffer of pending increments; a background thread swaps the buffer out
+    every flush_interval seconds and writes it in one transaction as
+    additive upserts. Several processes can therefore share one database
+    file (e.g. match workers) without overwriting each other's counts.
+
+    Players are keyed by name, the only identity that outlives a match.
+    Leaderboards over all players are ordered indexes kept current by add().
+    """
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.records = {}  # {name: {field: value, 'win_rate': derived}}
+        self.leaderboards = LeaderboardSet()
+        self.pending = {}  # {name: {field: increment}} not yet written
+        self.lock = threading.Lock()
+        self.flushes = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS player_stats (name TEXT PRIMARY KEY, "
+                + ", ".join(f"{field} INTEGER NOT NULL DEFAULT 0" for field in STAT_FIELDS) + ")")
+            conn.commit()
+            for row in conn.execute(f"SELECT name, {', '.join(STAT_FIELDS)} FROM player_stats"):
+                record = self.records[row[0]] = dict(zip(STAT_FIELDS, row[1:]))
+                record['win_rate'] = _win_rate(record)
+        finally:
+            conn.close()
+
+        self._thread = threading.Thread(target=self._run, name='stats-writer', daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def add(self, name, field, amount=1):
+        """Add to one of a player's counters; returns the player's record"""
+        with self.lock:
+            record = self.records.get(name)
+            if record is None:
+                record = self.records[name] = dict.fromkeys(STAT_FIELDS, 0)
+                record['win_rate'] = 0.0
+            record[field] += amount
+            if field in ('games_played', 'games_won'):
+                record['win_rate'] = _win_rate(record)
+            if self.leaderboards.boards:
+                self.leaderboards.update(name, record)
+            pending = self.pending.get(name)
+            if pending is None:
+                pending = self.pending[name] = {}
+            pending[field] = pending.get(field, 0) + amount
+        return record
+
+    def get(self, name):
+        """Get a copy of a player's lifetime record with its win rate, or None"""
+        with self.lock:
+            record = self.records.get(name)
+            if record is None:
+                return None
+            return dict(record, name=name)
+
+    def get_leaderboard(self, offset=0, limit=None, sort_key='win_rate', min_games=0):
+        """Get a page of lifetime records, best first (see StatisticsTracker.get_leaderboard)"""
+        with self.lock:
+            board = self.leaderboards.get(sort_key, min_games, self.records)
+            return [dict(self.records[name], name=name) for name in board.page(offset, limit)]
+
+    def get_rank(self, name, sort_key='win_rate', min_games=0):
+        """Get a player's 1-based lifetime rank, or None if unranked"""
+        with self.lock:
+            return self.leaderboards.get(sort_key, min_games, self.records).rank(name)
+
+    def _run(self):
+        conn = self._connect()
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self._write(conn)
+            self._write(conn)
+        finally:
+            conn.close()
+
+    def _write(self, conn):
+        with self.lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, {}
+        columns = ', '.join(STAT_FIELDS)
+        updates = ', '.join(f"{field} = {field} + excluded.{field}" for field in STAT_FIELDS)
+        sql = (f"INSERT INTO player_stats (name, {columns}) VALUES (?{', ?' * len(STAT_FIELDS)}) "
+               f"ON CONFLICT(name) DO UPDATE SET {updates}")
+        rows = [(name,) + tuple(deltas.get(field, 0) for field in STAT_FIELDS) for name, deltas in batch.items()]
+        try:
+            with conn:
+                conn.executemany(sql, rows)
+            self.flushes += 1
+        except sqlite3.Error as e:
+            # Put the increments back so the next flush retries them
+            self.errors += 1
+            print(f"Stats flush failed: {e}")
+            with self.lock:
+                for name, deltas in batch.items():
+                    pending = self.pending.setdefault(name, {})
+                    for field, amount in deltas.items():
+                        pending[field] = pending.get(field, 0) + amount
+
+    def flush(self):
+        """Ask the writer thread to write pending updates now"""
+        self._wake.set()
+
+    def close(self):
+        """Write everything still pending and stop the writer thread"""
+        if self._thread.is_alive():
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
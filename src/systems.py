@@ -1,4 +1,10 @@
 import os
+import time
+from collections import deque
+from src.chat_index import ChatIndex
+from src.chat_log import ChatLog
+from src.leaderboard import LeaderboardSet
+from src.fonts import render_text
 
 class SoundManager:
     def __init__(self, enable_sound=True):
@@ -87,10 +93,27 @@ class SoundManager:
         self.master_volume = max(0.0, min(1.0, volume))
 
 class ChatManager:
-    def __init__(self, max_messages=50):
-        self.messages = []
+    """Live chat window plus the full history.
+
+    The live window is a fixed-size ring of the newest messages. Every
+    message also goes to a ChatLog on disk (a temporary one unless
+    history_dir is given), which get_history() pages through, and into a
+    ChatIndex that search() queries. Messages are timestamped in game time
+    when a clock is given, so a replayed match logs the same chat.
+
+    add_message() only queues a message for the history. The log write and
+    index update run in flush(), which the simulation calls once per tick,
+    so they happen as one batch per tick instead of inside each handler
+    that receives a chat message.
+    """
+    def __init__(self, max_messages=50, history_dir=None, clock=None):
+        self.messages = deque(maxlen=max_messages)
         self.max_messages = max_messages
-        self.chat_history = []
+        self.chat_history = ChatLog(history_dir)
+        self.chat_index = ChatIndex(self.chat_history)
+        self.clock = clock  # SimulationClock; wall clock if None
+        self._now = clock.now if clock else time.time  # Bound once: add_message is hot
+        self._pending = []  # Messages not yet written to the history; they get ids there
 
     def add_message(self, player_name, player_id, message):
         """Add a chat message"""
@@ -98,26 +121,44 @@ class ChatManager:
             'player_name': player_name,
             'player_id': player_id,
             'text': message,
-            'timestamp': None
+            'timestamp': self._now(),
         }
-        self.messages.append(msg)
-        self.chat_history.append(msg)
-        
-        # Keep only recent messages
-        if len(self.messages) > self.max_messages:
-            self.messages.pop(0)
+        self._pending.append(msg)
+        self.messages.append(msg)  # The ring drops the oldest message once full
+
+    def flush(self):
+        """Write queued messages to the history log and index"""
+        if not self._pending:
+            return
+        for msg in self._pending:
+            msg['id'] = len(self.chat_history)
+            self.chat_history.append(msg)
+            self.chat_index.add(msg)
+        self._pending.clear()
 
     def get_messages(self):
         """Get all current messages"""
-        return self.messages.copy()
+        self.flush()
+        return list(self.messages)
 
     def clear_messages(self):
         """Clear message buffer (used for discussion phase)"""
         self.messages.clear()
 
-    def get_history(self):
-        """Get full chat history"""
-        return self.chat_history.copy()
+    def get_history(self, offset=0, limit=None):
+        """Get a page of chat history, oldest first (to the end if limit is None)"""
+        self.flush()
+        return self.chat_history.read(offset, limit)
+
+    def search(self, player_id=None, start=None, end=None, keyword=None, limit=100):
+        """Search chat history by player, [start, end) timestamp range and keyword, newest first"""
+        self.flush()
+        return self.chat_history.get(self.chat_index.search(player_id, start, end, keyword, limit))
+
+    def close(self):
+        """Close the history log"""
+        self.flush()
+        self.chat_history.close()
 
     def disable_chat(self):
         """Disable chat (during voting, etc)"""
@@ -129,16 +170,22 @@ class ChatManager:
 
     def draw_messages(self, screen, x=10, y=600):
         """Draw chat messages on screen"""
-        font = pygame.font.Font(None, 16)
-        
-        for i, msg in enumerate(self.messages[-5:]):  # Show last 5 messages
-            text = font.render(f"{msg['player_name']}: {msg['text']}", True, (200, 200, 200))
+        for i, msg in enumerate(list(self.messages)[-5:]):  # Show last 5 messages
+            text = render_text(f"{msg['player_name']}: {msg['text']}", 16, (200, 200, 200))
             screen.blit(text, (x, y - (i * 20)))
 
 class StatisticsTracker:
-    def __init__(self):
+    """Per-match player statistics.
+
+    With a StatsStore, every update is also added to the player's lifetime
+    record, keyed by name. The store writes behind, so recording stays a
+    dict update on the game thread.
+    """
+    def __init__(self, store=None):
         self.player_stats = {}  # {player_id: stats}
         self.game_stats = {}
+        self.store = store
+        self.leaderboards = LeaderboardSet()  # Ordered indexes, built on first leaderboard query
 
     def create_player_stat(self, player_id, player_name):
         """Create a stat entry for a player"""
@@ -154,6 +201,16 @@ class StatisticsTracker:
             'times_ejected': 0,
             'win_rate': 0.0,
         }
+        self._changed(player_id)
+
+    def _count(self, stats, field):
+        stats[field] += 1
+        if self.store is not None:
+            self.store.add(stats['name'], field)
+
+    def _changed(self, player_id):
+        if self.leaderboards.boards:
+            self.leaderboards.update(player_id, self.player_stats[player_id])
 
     def add_game_win(self, player_id, as_role):
         """Record a game win"""
@@ -161,15 +218,16 @@ class StatisticsTracker:
             return
         
         stats = self.player_stats[player_id]
-        stats['games_played'] += 1
-        stats['games_won'] += 1
+        self._count(stats, 'games_played')
+        self._count(stats, 'games_won')
         
         if as_role == "CREWMATE":
-            stats['games_as_crewmate'] += 1
+            self._count(stats, 'games_as_crewmate')
         else:
-            stats['games_as_impostor'] += 1
+            self._count(stats, 'games_as_impostor')
         
         stats['win_rate'] = stats['games_won'] / stats['games_played']
+        self._changed(player_id)
 
     def add_game_loss(self, player_id, as_role):
         """Record a game loss"""
@@ -177,43 +235,58 @@ class StatisticsTracker:
             return
         
         stats = self.player_stats[player_id]
-        stats['games_played'] += 1
+        self._count(stats, 'games_played')
         
         if as_role == "CREWMATE":
-            stats['games_as_crewmate'] += 1
+            self._count(stats, 'games_as_crewmate')
         else:
-            stats['games_as_impostor'] += 1
+            self._count(stats, 'games_as_impostor')
         
         stats['win_rate'] = stats['games_won'] / stats['games_played'] if stats['games_played'] > 0 else 0
+        self._changed(player_id)
 
     def record_kill(self, impostor_id):
         """Record a kill"""
         if impostor_id in self.player_stats:
-            self.player_stats[impostor_id]['kills'] += 1
+            self._count(self.player_stats[impostor_id], 'kills')
+            self._changed(impostor_id)
 
     def record_task_completion(self, player_id):
         """Record task completion"""
         if player_id in self.player_stats:
-            self.player_stats[player_id]['tasks_completed'] += 1
+            self._count(self.player_stats[player_id], 'tasks_completed')
+            self._changed(player_id)
 
     def record_vote(self, player_id):
         """Record a vote cast"""
         if player_id in self.player_stats:
-            self.player_stats[player_id]['votes_cast'] += 1
+            self._count(self.player_stats[player_id], 'votes_cast')
 
     def record_ejection(self, player_id):
         """Record player ejection"""
         if player_id in self.player_stats:
-            self.player_stats[player_id]['times_ejected'] += 1
+            self._count(self.player_stats[player_id], 'times_ejected')
+
+    def get_lifetime_stats(self, player_id):
+        """Get a player's lifetime statistics from the store, or {} without one"""
+        stats = self.player_stats.get(player_id)
+        if stats is None or self.store is None:
+            return {}
+        return self.store.get(stats['name']) or {}
 
     def get_player_stats(self, player_id):
         """Get a player's statistics"""
         return self.player_stats.get(player_id, {})
 
-    def get_leaderboard(self):
-        """Get leaderboard sorted by win rate"""
-        return sorted(
-            self.player_stats.values(),
-            key=lambda x: x['win_rate'],
-            reverse=True
-        )
+    def get_leaderboard(self, offset=0, limit=None, sort_key='win_rate', min_games=0):
+        """Get a page of player stats, best first.
+
+        sort_key is one of leaderboard.SORT_KEYS; players with fewer than
+        min_games games are left out.
+        """
+        board = self.leaderboards.get(sort_key, min_games, self.player_stats)
+        return [self.player_stats[player_id] for player_id in board.page(offset, limit)]
+
+    def get_rank(self, player_id, sort_key='win_rate', min_games=0):
+        """Get a player's 1-based leaderboard rank, or None if unranked"""
+        return self.leaderboards.get(sort_key, min_games, self.player_stats).rank(player_id)
@@ -0,0 +1,36 @@
+class SimulationClock:
+    """Fixed-timestep game clock.
+
+    Game time advances only when the simulation ticks, so cooldowns and
+    movement depend on the tick count rather than the wall clock. That keeps
+    matches replayable and lets headless runs go faster than real time.
+    """
+    def __init__(self, tick_rate=60, max_steps_per_frame=5):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.tick = 0
+        self.max_steps_per_frame = max_steps_per_frame
+        self._accumulator = 0.0
+
+    def now(self):
+        """Current game time in seconds"""
+        return self.tick / self.tick_rate
+
+    def advance(self, ticks=1):
+        """Move game time forward by whole ticks"""
+        self.tick += ticks
+
+    def consume(self, elapsed):
+        """Turn real elapsed seconds into a number of fixed ticks to run.
+
+        Leftover time carries over to the next frame. The step count is
+        capped so a long stall doesn't cause a burst of catch-up ticks.
+        """
+        self._accumulator += elapsed
+        steps = int(self._accumulator // self.dt)
+        if steps > self.max_steps_per_frame:
+            steps = self.max_steps_per_frame
+            self._accumulator = 0.0
+        else:
+            self._accumulator -= steps * self.dt
+        return steps
@@ -0,0 +1,353 @@
+import math
+import queue
+import secrets
+import socket
+import struct
+import threading
+from collections import deque
+from src.network import MessageType, NetworkMessage
+from src.codec import MessageDecoder
+
+# Datagram header: sequence number of this datagram, then the newest input
+# sequence the sender has applied (server to client) or 0 (client to server)
+HEADER = struct.Struct('<II')
+MAX_DATAGRAM = 1200  # Stay under a typical path MTU
+_F32 = struct.Struct('<f')
+
+def quantize(value):
+    """Round a velocity to float32, as PLAYER_INPUT carries it"""
+    return _F32.unpack(_F32.pack(value))[0]
+
+def _is_velocity(value):
+    return type(value) in (int, float) and math.isfinite(value)
+
+def seq_newer(a, b):
+    """True if 32-bit sequence a is newer than b, allowing for wraparound"""
+    return a != b and ((a - b) & 0xFFFFFFFF) < 0x80000000
+
+def pack_datagrams(messages, codec, next_seq, ack=0):
+    """Encode messages into as few datagrams as fit.
+
+    Returns (datagrams, next_seq, oversized). Messages too large for a
+    datagram on their own are returned in oversized for the caller to send
+    over the reliable channel instead.
+    """
+    datagrams = []
+    oversized = []
+    body = bytearray()
+    for message in messages:
+        data = message.to_bytes(codec)
+        if HEADER.size + len(data) > MAX_DATAGRAM:
+            oversized.append(message)
+            continue
+        if body and HEADER.size + len(body) + len(data) > MAX_DATAGRAM:
+            datagrams.append(HEADER.pack(next_seq, ack) + body)
+            next_seq = (next_seq + 1) & 0xFFFFFFFF
+            body = bytearray()
+        body += data
+    if body:
+        datagrams.append(HEADER.pack(next_seq, ack) + body)
+        next_seq = (next_seq + 1) & 0xFFFFFFFF
+    return datagrams, next_seq, oversized
+
+def unpack_datagram(datagram):
+    """Split a datagram into (seq, ack, messages), or None if it is malformed"""
+    if len(datagram) < HEADER.size:
+        return None
+    seq, ack = HEADER.unpack_from(datagram)
+    return seq, ack, MessageDecoder().feed(datagram[HEADER.size:])
+
+class UdpServerChannel:
+    """Unreliable, sequenced datagram channel for moves and snapshots.
+
+    Runs next to a TCP server. A client is registered over TCP and gets a
+    token, which it sends back in a UDP_HELLO datagram so its address can
+    be bound to its TCP client id. Datagrams older than the newest one seen
+    from an address are dropped, so late packets never roll state back.
+    """
+    def __init__(self, host='localhost', port=5001, codec='binary'):
+        self.host = host
+        self.port = port
+        self.codec = codec
+        self.socket = None
+        self.running = False
+        self.tokens = {}  # {client_id: token}
+        self.addresses = {}  # {client_id: (host, port)}
+        self.address_clients = {}  # {(host, port): client_id}
+        self.recv_seq = {}  # {client_id: newest datagram seq received}
+        self.send_seq = {}  # {client_id: next datagram seq to send}
+        self.message_queue = queue.Queue()
+        self.dropped = 0  # Stale, unknown or malformed datagrams
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((self.host, self.port))
+        self.port = self.socket.getsockname()[1]
+        self.running = True
+        threading.Thread(target=self._receive, daemon=True).start()
+        print(f"UDP channel on {self.host}:{self.port}")
+
+    def register(self, client_id):
+        """Issue the token a TCP client uses to bind its UDP address"""
+        token = secrets.token_hex(8)
+        with self.lock:
+            self.tokens[client_id] = token
+        return token
+
+    def remove_client(self, client_id):
+        with self.lock:
+            self.tokens.pop(client_id, None)
+            address = self.addresses.pop(client_id, None)
+            self.address_clients.pop(address, None)
+            self.recv_seq.pop(client_id, None)
+            self.send_seq.pop(client_id, None)
+
+    def is_bound(self, client_id):
+        return client_id in self.addresses
+
+    def _receive(self):
+        while self.running:
+            try:
+                datagram, address = self.socket.recvfrom(65536)
+            except OSError:
+                break
+            unpacked = unpack_datagram(datagram)
+            if unpacked is None:
+                self.dropped += 1
+                continue
+            seq, _, messages = unpacked
+
+            with self.lock:
+                client_id = self.address_clients.get(address)
+                if client_id is None:
+                    self._bind(address, messages)
+                    continue
+                last = self.recv_seq.get(client_id)
+                if last is not None and not seq_newer(seq, last):
+                    self.dropped += 1
+                    continue
+                self.recv_seq[client_id] = seq
+
+            for message in messages:
+                self.message_queue.put((client_id, message))
+
+    def _bind(self, address, messages):
+        """Bind an address on a valid UDP_HELLO (called with the lock held)"""
+        for message in messages:
+            if message.type != MessageType.UDP_HELLO or not isinstance(message.data, dict):
+                continue
+            client_id = message.data.get('client_id')
+            token = self.tokens.get(client_id)
+            if token is None or message.data.get('token') != token:
+                continue
+            old = self.addresses.get(client_id)
+            self.address_clients.pop(old, None)
+            self.addresses[client_id] = address
+            self.address_clients[address] = client_id
+            self.send_seq.setdefault(client_id, 1)
+            # Confirm so the client knows the channel is usable
+            reply = NetworkMessage(MessageType.UDP_HELLO, 0, {'client_id': client_id, 'token': token})
+            self._send_locked(client_id, [reply], 0)
+            return
+        self.dropped += 1
+
+    def send(self, client_id, messages, ack=0):
+        """Send messages to a bound client.
+
+        Returns the messages that were not sent because the client isn't
+        bound or they don't fit in a datagram.
+        """
+        with self.lock:
+            return self._send_locked(client_id, messages, ack)
+
+    def _send_locked(self, client_id, messages, ack):
+        address = self.addresses.get(client_id)
+        if address is None or not self.running:
+            return list(messages)
+        datagrams, self.send_seq[client_id], oversized = pack_datagrams(
+            messages, self.codec, self.send_seq[client_id], ack)
+        for datagram in datagrams:
+            try:
+                self.socket.sendto(datagram, address)
+            except OSError:
+                pass  # Unreliable anyway
+        return oversized
+
+    def get_message(self):
+        try:
+            return self.message_queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        self.running = False
+        if self.socket:
+            self.socket.close()
+
+class UdpClientChannel:
+    """Client end of the UDP channel"""
+    def __init__(self, host='localhost', port=5001, codec='binary'):
+        self.host = host
+        self.port = port
+        self.codec = codec
+        self.socket = None
+        self.running = False
+        self.ready = False  # Server confirmed our hello
+        self.hello = None
+        self.next_seq = 1
+        self.recv_seq = None
+        self.last_ack = 0  # Newest input sequence the server has applied
+        self.message_queue = queue.Queue()
+        self.dropped = 0
+
+    def start(self, client_id, token):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.connect((self.host, self.port))
+        self.running = True
+        self.hello = NetworkMessage(MessageType.UDP_HELLO, client_id, {'client_id': client_id, 'token': token})
+        threading.Thread(target=self._receive, daemon=True).start()
+        self.send([])
+
+    def _receive(self):
+        while self.running:
+            try:
+                datagram = self.socket.recv(65536)
+            except OSError:
+                break
+            unpacked = unpack_datagram(datagram)
+            if unpacked is None:
+                self.dropped += 1
+                continue
+            seq, ack, messages = unpacked
+            if self.recv_seq is not None and not seq_newer(seq, self.recv_seq):
+                self.dropped += 1
+                continue
+            self.recv_seq = seq
+            self.ready = True
+            if seq_newer(ack, self.last_ack):
+                self.last_ack = ack
+            for message in messages:
+                if message.type != MessageType.UDP_HELLO:
+                    self.message_queue.put(message)
+
+    def send(self, messages):
+        """Send messages; repeats the hello until the server confirms it"""
+        if not self.running:
+            return False
+        if not self.ready:
+            messages = [self.hello] + list(messages)
+        datagrams, self.next_seq, _ = pack_datagrams(messages, self.codec, self.next_seq)
+        for datagram in datagrams:
+            try:
+                self.socket.send(datagram)
+            except OSError:
+                return False
+        return True
+
+    def get_message(self):
+        try:
+            return self.message_queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.running = False
+        if self.socket:
+            self.socket.close()
+
+class MovementPredictor:
+    """Client-side prediction and reconciliation for the local player.
+
+    The local simulation moves the player immediately with Player.update;
+    each tick's input is recorded with a sequence number and sent to the
+    server. When the server's authoritative position arrives with the
+    newest input it applied, the player is reset to it and the inputs the
+    server hasn't seen yet are replayed with the same movement rules.
+    Inputs are kept at float32 precision, exactly as the server gets them.
+    """
+    def __init__(self, player, dt, max_pending=120):
+        self.player = player
+        self.dt = dt
+        self.pending = deque(maxlen=max_pending)  # (seq, velocity_x, velocity_y)
+        self.next_seq = 1
+        self.last_correction = 0.0  # Distance the last reconcile moved the player
+
+    def record_input(self):
+        """Record the input the player just moved with; returns its sequence"""
+        seq = self.next_seq
+        self.next_seq = (self.next_seq + 1) & 0xFFFFFFFF or 1
+        self.pending.append((seq, quantize(self.player.velocity_x), quantize(self.player.velocity_y)))
+        return seq
+
+    def input_messages(self, limit=8):
+        """PLAYER_INPUT messages for the newest unacknowledged inputs.
+
+        Sending a few at once means a lost datagram costs nothing as long
+        as one of the next few arrives.
+        """
+        player_id = self.player.id
+        return [NetworkMessage(MessageType.PLAYER_INPUT, player_id,
+                               {'player_id': player_id, 'seq': seq, 'vx': vx, 'vy': vy})
+                for seq, vx, vy in list(self.pending)[-limit:]]
+
+    def reconcile(self, x, y, acked_seq):
+        """Adopt the server position and replay inputs it hasn't applied"""
+        while self.pending and not seq_newer(self.pending[0][0], acked_seq):
+            self.pending.popleft()
+
+        player = self.player
+        predicted_x, predicted_y = player.x, player.y
+        velocity = (player.velocity_x, player.velocity_y)
+        player.set_position(x, y)
+        for _, vx, vy in self.pending:
+            player.velocity_x = vx
+            player.velocity_y = vy
+            player.update(self.dt)
+        player.velocity_x, player.velocity_y = velocity
+        self.last_correction = ((player.x - predicted_x) ** 2 + (player.y - predicted_y) ** 2) ** 0.5
+
+class InputBuffer:
+    """Server-side queue of client movement inputs.
+
+    One input is applied per player per tick, so the server moves a
+    predicted player exactly as its client did. With no input queued the
+    player stands still until the next one arrives. Inputs with a bad seq
+    or velocity are dropped, and velocities are clamped to max_speed per
+    axis, the most a player's own keys can give.
+    """
+    def __init__(self, max_pending=30):
+        self.max_pending = max_pending
+        self.inputs = {}  # {player_id: deque of (seq, vx, vy)}
+        self.last_seq = {}  # {player_id: newest input seq queued}
+        self.acked = {}  # {player_id: newest input seq applied}
+
+    def add(self, player_id, seq, vx, vy, max_speed):
+        if type(seq) is not int or not 0 <= seq <= 0xFFFFFFFF or not (_is_velocity(vx) and _is_velocity(vy)):
+            return False
+        vx = max(-max_speed, min(max_speed, vx))
+        vy = max(-max_speed, min(max_speed, vy))
+        last = self.last_seq.get(player_id)
+        if last is not None and not seq_newer(seq, last):
+            return False  # Duplicate from a redundant datagram
+        self.last_seq[player_id] = seq
+        self.inputs.setdefault(player_id, deque(maxlen=self.max_pending)).append((seq, vx, vy))
+        return True
+
+    def apply(self, players):
+        """Set each buffered player's velocity for this tick"""
+        for player_id, pending in self.inputs.items():
+            player = players.get(player_id)
+            if player is None:
+                continue
+            if pending:
+                seq, player.velocity_x, player.velocity_y = pending.popleft()
+                self.acked[player_id] = seq
+            else:
+                player.velocity_x = 0
+                player.velocity_y = 0
+
+    def remove_player(self, player_id):
+        self.inputs.pop(player_id, None)
+        self.last_seq.pop(player_id, None)
+        self.acked.pop(player_id, None)
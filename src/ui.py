@@ -1,4 +1,5 @@
 import pygame
+from src.fonts import render_text
 from enum import Enum
 
 class UIState(Enum):
@@ -25,8 +26,7 @@ class Button:
         pygame.draw.rect(screen, color, self.rect)
         pygame.draw.rect(screen, (200, 200, 200), self.rect, 2)
         
-        font = pygame.font.Font(None, 24)
-        text_surface = font.render(self.text, True, self.text_color)
+        text_surface = render_text(self.text, 24, self.text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
 
@@ -60,8 +60,7 @@ class PlayerCountSelector:
         pygame.draw.rect(screen, (50, 50, 70), self.rect)
         pygame.draw.rect(screen, (200, 200, 200), self.rect, 2)
         
-        font = pygame.font.Font(None, 24)
-        text = font.render(str(self.count), True, (255, 255, 255))
+        text = render_text(str(self.count), 24, (255, 255, 255))
         text_rect = text.get_rect(center=self.rect.center)
         screen.blit(text, text_rect)
 
@@ -96,19 +95,17 @@ class LobbyUI:
         screen.fill((30, 30, 40))
         
         # Title
-        font_title = pygame.font.Font(None, 72)
-        title = font_title.render("AMONG US", True, (255, 100, 100))
+        title = render_text("AMONG US", 72, (255, 100, 100))
         title_rect = title.get_rect(center=(self.width // 2, 50))
         screen.blit(title, title_rect)
         
         # Player count
-        font_label = pygame.font.Font(None, 28)
-        label = font_label.render("Players:", True, (200, 200, 200))
+        label = render_text("Players:", 28, (200, 200, 200))
         screen.blit(label, (350, 260))
         self.player_count_selector.draw(screen)
         
         # Impostor count
-        label2 = font_label.render("Impostors:", True, (200, 200, 200))
+        label2 = render_text("Impostors:", 28, (200, 200, 200))
         screen.blit(label2, (350, 340))
         impostor_selector = PlayerCountSelector(400, 330, 1, 3)
         impostor_selector.count = self.impostor_count
@@ -147,15 +144,13 @@ class SettingsUI:
     def draw(self, screen):
         screen.fill((30, 30, 40))
         
-        font_title = pygame.font.Font(None, 48)
-        title = font_title.render("SETTINGS", True, (255, 255, 255))
+        title = render_text("SETTINGS", 48, (255, 255, 255))
         title_rect = title.get_rect(center=(self.width // 2, 50))
         screen.blit(title, title_rect)
         
-        font_label = pygame.font.Font(None, 24)
         y = 150
         for setting, value in self.settings.items():
-            text = font_label.render(f"{setting}: {value}", True, (200, 200, 200))
+            text = render_text(f"{setting}: {value}", 24, (200, 200, 200))
             screen.blit(text, (100, y))
             y += 40
         
@@ -169,24 +164,32 @@ class HUD:
         self.height = height
 
     def draw(self, screen, game_state):
-        font_small = pygame.font.Font(None, 20)
-        font_large = pygame.font.Font(None, 28)
+        """Draw the HUD, returning the screen areas touched"""
+        rects = []
         
         # Top-left: Game state and player count
-        alive_count = sum(1 for p in game_state.players.values() if p.is_alive)
-        text = font_small.render(f"Players Alive: {alive_count}/{len(game_state.players)}", True, (255, 255, 255))
-        screen.blit(text, (10, 10))
+        if hasattr(game_state, 'alive_counts'):
+            alive_count = sum(game_state.alive_counts.values())
+        else:
+            alive_count = sum(1 for p in game_state.players.values() if p.is_alive)
+        text = render_text(f"Players Alive: {alive_count}/{len(game_state.players)}", 20, (255, 255, 255))
+        rects.append(screen.blit(text, (10, 10)))
         
         # Top-right: Role (if known)
         if hasattr(game_state, 'local_player') and game_state.local_player:
             role_text = game_state.local_player.role.name
             color = (255, 100, 100) if game_state.local_player.role.name == "IMPOSTOR" else (100, 255, 100)
-            text = font_large.render(f"Role: {role_text}", True, color)
-            screen.blit(text, (self.width - 250, 10))
+            text = render_text(f"Role: {role_text}", 28, color)
+            rects.append(screen.blit(text, (self.width - 250, 10)))
         
         # Bottom-left: Tasks completed
         if hasattr(game_state, 'tasks'):
-            completed = sum(1 for t in game_state.tasks if t.completed)
-            total = len(game_state.tasks)
-            text = font_small.render(f"Tasks: {completed}/{total}", True, (100, 255, 100))
-            screen.blit(text, (10, self.height - 30))
+            if hasattr(game_state, 'tasks_total'):
+                completed, total = game_state.tasks_done, game_state.tasks_total
+            else:
+                completed = sum(1 for t in game_state.tasks if t.completed)
+                total = len(game_state.tasks)
+            text = render_text(f"Tasks: {completed}/{total}", 20, (100, 255, 100))
+            rects.append(screen.blit(text, (10, self.height - 30)))
+        
+        return rects
@@ -1,51 +1,144 @@
+import threading
+from collections import deque
+
 class VoteManager:
+    """Meeting votes with running tallies.
+
+    Every vote, change of vote or withdrawn vote adjusts the tallies by
+    one, and players are kept in buckets by vote count so the leader (or
+    the tie at the top) is always known without a scan. A vote for None is
+    a skip: it is counted separately but competes with the candidates, so
+    a skip that wins or ties at the top ejects nobody.
+
+    Network threads can hand votes in at any time with submit(); they wait
+    in a locked queue until the game loop applies them as one batch per
+    tick with apply_pending().
+    """
     def __init__(self):
         self.votes = {}  # {voter_id: voted_player_id}
         self.vote_counts = {}  # {player_id: count}
+        self.skip_votes = 0
         self.voting_active = False
+        self.max_votes = 0
+        self._buckets = {0: {}}  # {count: {player_id: None}} (dicts as ordered sets)
+        self._pending = deque()  # (voter_id, voted_id) from submit()
+        self._lock = threading.Lock()
 
     def start_voting(self, players):
         """Start voting phase"""
         self.votes.clear()
         self.vote_counts = {player_id: 0 for player_id in players.keys()}
+        self.skip_votes = 0
+        self.max_votes = 0
+        self._buckets = {0: dict.fromkeys(self.vote_counts)}
         self.voting_active = True
+        with self._lock:
+            self._pending.clear()
+
+    def _add(self, voted_id, delta):
+        """Move one vote onto (delta=1) or off (delta=-1) a candidate"""
+        if voted_id is None:
+            self.skip_votes += delta
+            return
+        count = self.vote_counts.get(voted_id)
+        if count is None:
+            return  # Not a candidate; the vote is kept but never counts
+        buckets = self._buckets
+        del buckets[count][voted_id]
+        count += delta
+        self.vote_counts[voted_id] = count
+        buckets.setdefault(count, {})[voted_id] = None
+        if count > self.max_votes:
+            self.max_votes = count
+        elif delta < 0 and count + 1 == self.max_votes and not buckets[self.max_votes]:
+            # The old leader dropped back; it is still on top one level down
+            self.max_votes = count
 
     def vote(self, voter_id, voted_id):
         """Register a vote"""
         if not self.voting_active:
             return False
-        
+        if voted_id is not None and type(voted_id) is not int:
+            return False  # Only player ids or None (skip) are votes
+
         # Player can change their vote
+        if voter_id in self.votes:
+            previous = self.votes[voter_id]
+            if previous == voted_id:
+                return True
+            self._add(previous, -1)
         self.votes[voter_id] = voted_id
-        
-        # Recalculate vote counts
-        self.vote_counts = {player_id: 0 for player_id in self.vote_counts.keys()}
-        for voted_id in self.votes.values():
-            if voted_id in self.vote_counts:
-                self.vote_counts[voted_id] += 1
-        
+        self._add(voted_id, 1)
         return True
 
+    def remove_vote(self, voter_id):
+        """Withdraw a voter's vote, e.g. when they disconnect mid-meeting"""
+        if voter_id not in self.votes:
+            return False
+        self._add(self.votes.pop(voter_id), -1)
+        return True
+
+    def load_votes(self, votes, candidates=None):
+        """Replace all votes at once (e.g. from a server snapshot).
+
+        Only votes that differ are re-tallied. Passing candidates that differ
+        from the current ones rebuilds the tallies from scratch.
+        """
+        if candidates is not None and candidates.keys() != self.vote_counts.keys():
+            self.vote_counts = {player_id: 0 for player_id in candidates}
+            self.votes.clear()
+            self.skip_votes = 0
+            self.max_votes = 0
+            self._buckets = {0: dict.fromkeys(self.vote_counts)}
+        for voter_id, voted_id in list(self.votes.items()):
+            if voter_id not in votes or votes[voter_id] != voted_id:
+                self.remove_vote(voter_id)
+        for voter_id, voted_id in votes.items():
+            if voter_id not in self.votes:
+                self.votes[voter_id] = voted_id
+                self._add(voted_id, 1)
+
+    def submit(self, voter_id, voted_id):
+        """Queue a vote from any thread; it is applied on the next apply_pending()"""
+        with self._lock:
+            self._pending.append((voter_id, voted_id))
+
+    def apply_pending(self, accepts=None):
+        """Apply every queued vote in arrival order.
+
+        accepts(voter_id, voted_id), if given, filters out votes the game
+        rules don't allow (dead voters, dead or unknown candidates).
+        Returns the (voter_id, voted_id) pairs that were applied.
+        """
+        with self._lock:
+            if not self._pending:
+                return []
+            batch = self._pending
+            self._pending = deque()
+        applied = []
+        for voter_id, voted_id in batch:
+            if (accepts is None or accepts(voter_id, voted_id)) and self.vote(voter_id, voted_id):
+                applied.append((voter_id, voted_id))
+        return applied
+
+    def leader(self):
+        """Get the current leader's id, a sorted list of ids if tied at the top, or None.
+
+        None also covers skip winning or tying with the top candidates.
+        """
+        if self.max_votes == 0 or self.skip_votes >= self.max_votes:
+            return None
+        top = self._buckets[self.max_votes]
+        if len(top) > 1:
+            return sorted(top)
+        return next(iter(top))
+
     def end_voting(self):
         """End voting and determine who gets ejected"""
         self.voting_active = False
-        
-        if not self.vote_counts:
-            return None
-        
-        # Find player with most votes
-        max_votes = max(self.vote_counts.values())
-        
-        if max_votes == 0:
-            return None  # No one was voted
-        
-        # Get all players with max votes (tie)
-        tied_players = [pid for pid, count in self.vote_counts.items() if count == max_votes]
-        
-        if len(tied_players) > 1:
-            return tied_players  # Return list if tie
-        
-        return tied_players[0]  # Return single player ID
+
+        # Player with most votes, a list of ids on a tie, or None
+        return self.leader()
 
     def skip_voting(self):
         """Skip voting phase"""
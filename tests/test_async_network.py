@@ -0,0 +1,70 @@
+import socket
+import time
+from src.async_network import AsyncNetworkServer
+from src.network import MessageType, NetworkMessage
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+def connect(server):
+    client = socket.create_connection((server.host, server.port))
+    client.settimeout(2.0)
+    deadline = time.monotonic() + 2.0
+    while not server.clients and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return client, next(iter(server.clients))
+
+
+def read_all(client):
+    data = b''
+    while True:
+        chunk = client.recv(65536)
+        if not chunk:
+            return data
+        data += chunk
+
+
+def test_replies_in_the_codec_the_client_speaks():
+    server = AsyncNetworkServer(port=free_port())
+    server.start()
+    client, client_id = connect(server)
+    message = NetworkMessage(MessageType.CHAT, 1, {'text': 'hello'})
+    client.sendall(message.to_bytes('binary'))
+    deadline = time.monotonic() + 2.0
+    received = None
+    while received is None and time.monotonic() < deadline:
+        received = server.get_message()
+        time.sleep(0.01)
+    assert received[0] == client_id
+    assert (received[1].type, received[1].data) == (MessageType.CHAT, {'text': 'hello'})
+
+    server.send_to_client(client_id, NetworkMessage(MessageType.CHAT, 0, {'text': 'hi'}))
+    server.stop()
+    assert read_all(client) == NetworkMessage(MessageType.CHAT, 0, {'text': 'hi'}).to_bytes('binary')
+    client.close()
+
+
+def test_unreliable_sends_to_a_backed_up_client_are_dropped():
+    server = AsyncNetworkServer(port=free_port(), high_water=0)  # Every client counts as backed up
+    server.start()
+    client, client_id = connect(server)
+    server.send_to_client(client_id, NetworkMessage(MessageType.PLAYER_MOVE, 0, {'player_id': 1, 'x': 1, 'y': 2}))
+    server.send_to_client(client_id, NetworkMessage(MessageType.CHAT, 0, {'text': 'hi'}))
+    server.stop()
+    assert read_all(client) == NetworkMessage(MessageType.CHAT, 0, {'text': 'hi'}).to_bytes('json')
+    assert server.dropped == 1
+    client.close()
+
+
+def test_stop_sends_batched_messages_that_were_never_flushed():
+    server = AsyncNetworkServer(port=free_port(), batch=True)
+    server.start()
+    client, client_id = connect(server)
+    server.send_to_client(client_id, NetworkMessage(MessageType.CHAT, 0, {'text': 'bye'}))
+    server.stop()
+    assert read_all(client) == NetworkMessage(MessageType.CHAT, 0, {'text': 'bye'}).to_bytes('json')
+    client.close()
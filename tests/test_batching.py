@@ -0,0 +1,46 @@
+import time
+from src.network import MessageType, NetworkClient, NetworkMessage, NetworkServer
+from tests.test_async_network import free_port
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def receive(source, count):
+    messages = []
+    assert wait_for(lambda: messages.extend(iter(source.get_message, None)) or len(messages) >= count)
+    return messages
+
+
+def test_client_coalesces_moves_until_flush():
+    server = NetworkServer(port=free_port(), batch=True)
+    server.start()
+    client = NetworkClient(port=server.port, codec='binary', batch=True)
+    assert client.connect()
+    for x in range(5):
+        client.send_message(MessageType.PLAYER_MOVE, {'player_id': 1, 'x': float(x), 'y': 0.0})
+    client.send_message(MessageType.CHAT, {'player_name': 'a', 'text': 'hi'})
+    client.send_message(MessageType.PLAYER_MOVE, {'player_id': 2, 'x': 1.0, 'y': 1.0})
+    client.send_message(MessageType.PLAYER_MOVE, {'player_id': 1, 'x': 9.0, 'y': 0.0})
+    time.sleep(0.1)
+    assert server.get_message() is None  # Nothing leaves before flush()
+
+    assert client.flush()
+    received = [message.data for _, message in receive(server, 3)]
+    assert received == [{'player_name': 'a', 'text': 'hi'}, {'player_id': 2, 'x': 1.0, 'y': 1.0},
+                        {'player_id': 1, 'x': 9.0, 'y': 0.0}]
+
+    # The server answers in one write per client per flush, superseding stale state
+    client_id = next(iter(server.clients))
+    for tick in range(3):
+        server.send_to_client(client_id, NetworkMessage(MessageType.GAME_STATE, 0, {'tick': tick}))
+    server.send_to_client(client_id, NetworkMessage(MessageType.CHAT, 0, {'player_name': 'host', 'text': 'welcome'}))
+    server.flush()
+    assert [message.data for message in receive(client, 2)] == [{'tick': 2}, {'player_name': 'host', 'text': 'welcome'}]
+    assert server.get_client_stats(client_id)['sent_writes'] == 1
+    client.disconnect()
+    server.stop()
@@ -0,0 +1,15 @@
+from benchmarks import micro
+
+
+def test_every_benchmark_runs():
+    for name, sizes, setup in micro.BENCHMARKS:
+        run, ops = setup(min(sizes))
+        run()
+        assert ops > 0, name
+
+
+def test_every_case_has_a_baseline():
+    baselines = micro.load_baselines()
+    cases = {f"{name}[{size}]" for name, sizes, _ in micro.BENCHMARKS for size in sizes}
+    assert cases <= set(baselines)
+    assert baselines[micro.CALIBRATION_KEY] > 0
@@ -0,0 +1,77 @@
+from src.chat_log import ChatLog
+from src.replay import Replay
+from src.systems import ChatManager
+from tests.test_simulation import make_sim
+
+
+def test_chat_is_stamped_with_game_time():
+    sim = make_sim()
+    for _ in range(120):
+        sim.update()
+    sim.add_chat_message("Player 1", 1, "where")
+    for _ in range(60):
+        sim.update()
+    sim.add_chat_message("Player 2", 2, "electrical")
+    assert [m['timestamp'] for m in sim.chat_manager.get_messages()] == [2.0, 3.0]
+    assert [m['text'] for m in sim.chat_manager.search(start=2.5, end=4.0)] == ["electrical"]
+    sim.close()
+
+
+def test_replayed_chat_matches_the_recording(tmp_path):
+    path = str(tmp_path / "match.evlog")
+    sim = make_sim()
+    sim.record_events(path)
+    for tick in range(200):
+        if tick % 50 == 7:
+            sim.add_chat_message("Player 3", 3, f"message {tick}")
+        sim.update()
+    history = sim.chat_manager.get_history()
+    sim.stop_recording()
+    sim.close()
+
+    replay = Replay(path)
+    replay.run()
+    assert replay.sim.chat_manager.get_history() == history
+    replay.close()
+
+
+def test_live_window_is_bounded_and_history_kept():
+    chat = ChatManager(max_messages=2)
+    for index, text in enumerate(["red sus", "blue sus", "red safe", "skip"]):
+        chat.add_message(f"Player {index % 2}", index % 2, text)
+    assert [m['text'] for m in chat.get_messages()] == ["red safe", "skip"]
+    assert [m['id'] for m in chat.get_history(1, 2)] == [1, 2]
+    assert [m['text'] for m in chat.get_history()] == ["red sus", "blue sus", "red safe", "skip"]
+    chat.close()
+
+
+def test_search_by_player_and_keyword():
+    chat = ChatManager(max_messages=2)
+    for index, text in enumerate(["red sus", "blue sus", "red safe", "skip"]):
+        chat.add_message(f"Player {index % 2}", index % 2, text)
+    assert [m['text'] for m in chat.search(keyword="sus")] == ["blue sus", "red sus"]
+    assert [m['text'] for m in chat.search(player_id=0, keyword="red")] == ["red safe", "red sus"]
+    chat.close()
+
+
+def test_log_resumes_after_a_torn_write(tmp_path):
+    log = ChatLog(str(tmp_path), segment_messages=4, cached_segments=1)
+    for index in range(10):
+        log.append({'id': index, 'text': f"message {index}"})
+    log.close()
+    with open(log.segment_path(2), 'ab') as f:
+        f.write(b'{"id": 10, "te')  # Crash mid-line
+
+    log = ChatLog(str(tmp_path), segment_messages=4, cached_segments=1)
+    assert len(log) == 10
+    log.append({'id': 10, 'text': "message 10"})
+    assert [m['id'] for m in log.read(3, 5)] == [3, 4, 5, 6, 7]
+    log.close()
+
+
+def test_log_fetches_messages_by_id(tmp_path):
+    log = ChatLog(str(tmp_path), segment_messages=4, cached_segments=1)
+    for index in range(11):
+        log.append({'id': index, 'text': f"message {index}"})
+    assert [m['id'] for m in log.get([10, 0, 5, 99])] == [10, 0, 5]
+    log.close()
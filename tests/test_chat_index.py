@@ -0,0 +1,68 @@
+import os
+import random
+from src.chat_index import ChatIndex, tokenize
+from src.chat_log import ChatLog
+
+WORDS = ["red", "blue", "sus", "vent", "skip", "electrical", "Red", "SUS!"]
+
+
+def write_chat(directory, count=95, segment_messages=20):
+    rng = random.Random(5)
+    log = ChatLog(directory, segment_messages=segment_messages)
+    index = ChatIndex(log)
+    messages = []
+    for message_id in range(count):
+        message = {'id': message_id, 'player_id': rng.randrange(4), 'timestamp': message_id * 0.5,
+                   'text': " ".join(rng.choice(WORDS) for _ in range(3))}
+        log.append(message)
+        index.add(message)
+        messages.append(message)
+    return log, index, messages
+
+
+def brute_force(messages, player_id=None, start=None, end=None, keyword=None, limit=100):
+    found = [m['id'] for m in messages
+             if (player_id is None or m['player_id'] == player_id)
+             and (start is None or m['timestamp'] >= start)
+             and (end is None or m['timestamp'] < end)
+             and (keyword is None or tokenize(keyword) <= tokenize(m['text']))]
+    return found[::-1][:limit]
+
+
+QUERIES = [
+    {}, {'player_id': 2}, {'keyword': "sus"}, {'keyword': "Red vent"}, {'start': 10, 'end': 20.5},
+    {'player_id': 1, 'keyword': "red", 'start': 5}, {'keyword': "nobody"}, {'limit': 3, 'keyword': "blue"},
+]
+
+
+def test_search_matches_a_scan(tmp_path):
+    log, index, messages = write_chat(str(tmp_path))
+    for query in QUERIES:
+        assert index.search(**query) == brute_force(messages, **query)
+    log.close()
+
+
+def test_reopened_index_loads_saved_segments(tmp_path):
+    log, _, messages = write_chat(str(tmp_path))
+    log.close()
+    os.remove(os.path.join(str(tmp_path), "000001.idx.json"))  # Rebuilt from the log instead
+
+    log = ChatLog(str(tmp_path), segment_messages=20)
+    index = ChatIndex(log)
+    for query in QUERIES:
+        assert index.search(**query) == brute_force(messages, **query)
+    log.close()
+
+
+def test_only_a_few_segment_parts_stay_in_memory(tmp_path):
+    log, index, messages = write_chat(str(tmp_path), count=205)
+    assert len(index.first_times) == 11
+    assert len(index._segment['times']) == 5
+    for query in QUERIES + [{'limit': 200}, {'limit': 200, 'keyword': "sus"}]:
+        assert index.search(**query) == brute_force(messages, **query)
+        assert len(index._parts) <= index.cached_segments
+
+    os.remove(os.path.join(str(tmp_path), "000002.idx.json"))  # Re-indexed from the log when searched
+    index._parts.clear()
+    assert index.search(keyword="vent", limit=200) == brute_force(messages, keyword="vent", limit=200)
+    log.close()
@@ -0,0 +1,75 @@
+import math
+from src.codec import CODECS, MessageDecoder, get_codec
+from src.network import MessageType, NetworkMessage
+
+SAMPLES = [
+    NetworkMessage(MessageType.PLAYER_MOVE, 3, {'player_id': 3, 'x': 640.5, 'y': 360.25}),
+    NetworkMessage(MessageType.VOTE_CAST, 4, {'voter_id': 4, 'voted_id': None}),
+    NetworkMessage(MessageType.VOTE_CAST, 4, {'voter_id': 4, 'voted_id': [1]}),
+    NetworkMessage(MessageType.CHAT, -1, {'player_name': 'Ünïcode', 'text': 'red is sus {"}'}),
+    NetworkMessage(MessageType.GAME_START, 0, {'num_impostors': 2}),
+    NetworkMessage(MessageType.GAME_STATE, None, {'players': {'1': [1.5, 2.5, True]}}),
+]
+
+
+def test_round_trip_is_exact_for_both_codecs():
+    for name in ('json', 'binary'):
+        codec = get_codec(name)
+        for message in SAMPLES:
+            decoded = MessageDecoder().feed(codec.encode(message))
+            assert len(decoded) == 1
+            assert (decoded[0].type, decoded[0].sender_id, decoded[0].data) == (message.type, message.sender_id, message.data)
+
+
+def test_round_trip_of_wide_numbers():
+    messages = [
+        NetworkMessage(MessageType.PLAYER_MOVE, 3, {'player_id': 3, 'x': 640.1, 'y': 1e39}),
+        NetworkMessage(MessageType.PLAYER_INPUT, 2, {'player_id': 2, 'seq': 300, 'vx': 2 ** 24 + 1, 'vy': -0.1}),
+        NetworkMessage(MessageType.PLAYER_INPUT, 2, {'player_id': 2, 'seq': 1, 'vx': 10 ** 400, 'vy': 0}),
+    ]
+    for name in ('json', 'binary'):
+        codec = get_codec(name)
+        for message in messages:
+            decoded = MessageDecoder().feed(codec.encode(message))
+            assert [(m.type, m.data) for m in decoded] == [(message.type, message.data)]
+
+
+def test_floats_that_fit_float32_stay_small():
+    exact = CODECS['binary'].encode(SAMPLES[0])
+    wide = CODECS['binary'].encode(NetworkMessage(MessageType.PLAYER_MOVE, 3, {'player_id': 3, 'x': 640.1, 'y': 1e39}))
+    assert len(wide) == len(exact) + 8  # Two floats go out as float64 instead
+    assert len(exact) < len(CODECS['json'].encode(SAMPLES[0])) / 4
+
+
+def test_nan_packs():
+    message = NetworkMessage(MessageType.PLAYER_MOVE, 1, {'player_id': 1, 'x': math.nan, 'y': 0.5})
+    decoded = CODECS['binary'].decode(CODECS['binary'].encode(message))
+    assert math.isnan(decoded.data['x']) and decoded.data['y'] == 0.5
+
+
+def test_mixed_stream_in_small_pieces():
+    stream = b''.join(get_codec(('json', 'binary')[i % 2]).encode(message) for i, message in enumerate(SAMPLES))
+    decoder = MessageDecoder()
+    decoded = []
+    for start in range(0, len(stream), 3):
+        decoded += decoder.feed(stream[start:start + 3])
+    assert [m.data for m in decoded] == [m.data for m in SAMPLES]
+    assert decoder.errors == 0 and not decoder.buffer
+
+
+def test_large_json_document_in_many_pieces():
+    message = NetworkMessage(MessageType.CHAT, 1, {'player_name': 'a', 'text': '}]"\\' * 50000})
+    data = CODECS['json'].encode(message)
+    chunks = [data[start:start + 1000] for start in range(0, len(data), 1000)]
+    decoder = MessageDecoder()
+    for chunk in chunks[:-1]:
+        assert decoder.feed(chunk) == []
+    assert [m.data for m in decoder.feed(chunks[-1])] == [message.data]
+
+
+def test_malformed_json_is_dropped_and_counted():
+    decoder = MessageDecoder()
+    good = CODECS['json'].encode(SAMPLES[1])
+    decoded = decoder.feed(b'{"type": nope}' + b'\xff\xfe' + good + b'{"no": "fields"}')
+    assert [m.data for m in decoded] == [SAMPLES[1].data]
+    assert decoder.errors == 3
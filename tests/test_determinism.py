@@ -0,0 +1,31 @@
+from src.player import PlayerColor
+from src.simulation import Simulation, WanderBot
+from src.timing import SimulationClock
+
+
+def bot_match(seed, ticks=3000, **options):
+    sim = Simulation(seed=seed, **options)
+    for index in range(8):
+        player = sim.add_player(f"Bot {index}", list(PlayerColor)[index])
+        sim.set_controller(player.id, WanderBot(task_interval=200))
+    sim.start_game(2)
+    sim.run_ticks(ticks)
+    return sim.tick_count, sim.winning_team, sim.state_digest()
+
+
+def test_same_seed_same_match():
+    assert bot_match(11) == bot_match(11)
+
+
+def test_different_seeds_diverge():
+    assert bot_match(11)[2] != bot_match(12)[2]
+
+
+def test_clock_turns_real_time_into_capped_ticks():
+    clock = SimulationClock(tick_rate=60, max_steps_per_frame=5)
+    assert clock.consume(1 / 120) == 0
+    assert clock.consume(1 / 120) == 1  # Leftover time carries over
+    assert clock.consume(1.0) == 5  # A stall doesn't cause a burst of catch-up ticks
+    assert clock.consume(1 / 60) == 1
+    clock.advance(90)
+    assert clock.now() == 1.5
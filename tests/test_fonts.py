@@ -0,0 +1,32 @@
+import pygame
+from src.fonts import FontRegistry, TextCache
+
+
+def make_cache(**limits):
+    pygame.font.init()
+    return TextCache(FontRegistry(), **limits)
+
+
+def test_repeated_text_is_rendered_once():
+    cache = make_cache()
+    first = cache.render("Player 1", 24, (255, 255, 255))
+    assert cache.render("Player 1", 24, [255, 255, 255]) is first
+    cache.render("Player 1", 16, (255, 255, 255))
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+
+
+def test_cache_stays_within_its_limits():
+    cache = make_cache(max_entries=3)
+    for index in range(10):
+        cache.render(f"line {index}", 16, (200, 200, 200))
+    cache.render("line 7", 16, (200, 200, 200))  # Recently used, so kept
+    cache.render("line 10", 16, (200, 200, 200))
+    assert [key[0] for key in cache.entries] == ["line 9", "line 7", "line 10"]
+    assert cache.evictions == 8
+
+    cache = make_cache(max_bytes=1)
+    cache.render("a", 16, (0, 0, 0))
+    cache.render("b", 16, (0, 0, 0))
+    assert len(cache.entries) == 1  # The newest surface is always kept
+    assert cache.total_bytes == next(iter(cache.entries.values()))[1]
@@ -0,0 +1,106 @@
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from src.game import Game
+from src.network import MessageType, NetworkMessage
+from src.player import PlayerColor
+from src.simulation import GameState
+
+
+class FakeServer:
+    """Stands in for the network server: a message queue and a sent log"""
+    def __init__(self):
+        self.running = True
+        self.queue = []
+        self.sent = []  # (client_id, NetworkMessage)
+        self.clients = {}  # Connected client ids
+
+    def get_message(self):
+        return self.queue.pop(0) if self.queue else None
+
+    def send_to_client(self, client_id, message):
+        self.sent.append((client_id, message))
+
+    def send_to_clients(self, client_ids, message):
+        for client_id in client_ids:
+            self.send_to_client(client_id, message)
+
+    def flush(self):
+        pass
+
+
+def make_game():
+    game = Game(enable_sound=False, seed=5)
+    for i, color in enumerate(list(PlayerColor)[:4], 1):
+        game.add_player(f"Player {i}", color)
+    game.network_server = FakeServer()
+    return game
+
+
+def send(game, client_id, message_type, data):
+    game.network_server.clients[client_id] = None
+    game.network_server.queue.append((client_id, NetworkMessage(message_type, client_id, data)))
+    game.update()
+
+
+def join(game, client_id, data=None):
+    send(game, client_id, MessageType.PLAYER_JOIN, data or {'player_id': 1, 'name': f"c{client_id}"})
+    reply = [message for cid, message in game.network_server.sent
+             if cid == client_id and message.type == MessageType.PLAYER_JOIN][-1]
+    return game.players.get(reply.data['player_id'])
+
+
+def test_malformed_messages_do_not_stop_the_server():
+    game = make_game()
+    join(game, 1, [1])
+    game.start_game(1)
+    for data in ([1], 'tick', None, {'tick': 'a'}, {'tick': [1]}):
+        send(game, 1, MessageType.STATE_ACK, data)
+    send(game, 1, MessageType.PLAYER_MOVE, {'x': 'a', 'y': float('nan')})
+    send(game, 1, MessageType.VOTE_CAST, [1])
+    assert game.current_state == GameState.PLAYING
+
+
+def test_clients_move_only_their_own_player():
+    game = make_game()
+    own = join(game, 1)
+    game.start_game(1)
+    other = game.players[3]
+    start = (other.x, other.y)
+    send(game, 1, MessageType.PLAYER_MOVE, {'player_id': 3, 'x': 100, 'y': 100})
+    assert (other.x, other.y) == start
+
+    x, y = own.x, own.y
+    send(game, 1, MessageType.PLAYER_MOVE, {'x': x + own.speed, 'y': y})
+    assert (own.x, own.y) == (x + own.speed, y)
+    send(game, 1, MessageType.PLAYER_MOVE, {'x': 100, 'y': 100})
+    assert abs(((own.x - x - own.speed) ** 2 + (own.y - y) ** 2) ** 0.5 - own.speed) < 1e-9
+
+
+def test_unbound_clients_are_ignored():
+    game = make_game()
+    game.start_game(1)
+    player = game.players[1]
+    start = (player.x, player.y)
+    send(game, 4, MessageType.PLAYER_MOVE, {'player_id': 1, 'x': 100, 'y': 100})
+    assert (player.x, player.y) == start
+
+
+def test_clients_are_bound_only_to_players_made_for_them():
+    game = make_game()
+    first = join(game, 1, {'player_id': 1, 'name': 'c1'})
+    assert first.id == 5 and first.name == 'c1'
+    assert game.interest.viewers[1] == 5
+
+    second = join(game, 2, {'player_id': 5, 'name': 'c2'})
+    assert second.id == 6 and game.interest.viewers == {1: 5, 2: 6}
+
+    # Joining again doesn't rebind or add a player
+    assert join(game, 1, {'player_id': 6, 'name': 'c1'}) is first
+    assert game.interest.viewers == {1: 5, 2: 6} and len(game.players) == 6
+
+    game.start_game(1)
+    assert join(game, 3) is None
+    assert 3 not in game.interest.viewers
@@ -0,0 +1,100 @@
+from src.interest import InterestManager, Relevance
+from src.player import PlayerColor, PlayerRole
+from src.simulation import Simulation
+from src.snapshot import capture_snapshot
+
+
+def make_match():
+    sim = Simulation(seed=5)
+    for index in range(6):
+        sim.add_player(f"Player {index + 1}", list(PlayerColor)[index])
+    sim.start_game(1)
+    interest = InterestManager(sim.game_map)
+    for player_id in sim.players:
+        interest.set_viewer(player_id, player_id)  # Client id n views player n
+    return sim, interest
+
+
+def place(sim, player, x, y):
+    player.set_position(x, y)
+
+
+def views(sim, interest):
+    interest.update(sim.players)
+    interest.plan_moves(list(interest.viewers), sim.players, sim.tick_count)
+    snapshot = capture_snapshot(sim)
+    return {client_id: interest.snapshot_view(client_id, snapshot, sim) for client_id in interest.viewers}
+
+
+def test_room_mates_are_full_rate_and_distant_players_reduced():
+    sim, interest = make_match()
+    viewer, room_mate, distant = sim.players[1], sim.players[2], sim.players[3]
+    place(sim, viewer, 60, 410)  # Opposite corners of the cafeteria
+    place(sim, room_mate, 340, 590)
+    place(sim, distant, 900, 400)  # Reactor
+    interest.update(sim.players)
+    assert interest.relevance(1, room_mate, sim.players) is Relevance.FULL
+    assert interest.relevance(1, distant, sim.players) is Relevance.REDUCED
+
+    tick = 10 - distant.id  # Not yet due for the distant player's reduced update
+    plan = interest.plan_moves([1], sim.players, tick + 1)
+    assert room_mate in plan[1] and distant not in plan[1]
+    assert distant in interest.plan_moves([1], sim.players, tick)[1]
+    assert distant not in interest.plan_moves([1], sim.players, tick + 10).get(1, [])  # Unchanged since sent
+
+    place(sim, room_mate, 500, 500)  # Admin, out of range
+    interest.update(sim.players)
+    assert interest.relevance(1, room_mate, sim.players) is Relevance.REDUCED
+
+
+def test_living_viewers_do_not_see_ghosts():
+    sim, interest = make_match()
+    viewer, ghost = sim.players[1], sim.players[2]
+    sim.set_player_alive(ghost, False)
+    interest.update(sim.players)
+    assert interest.relevance(1, ghost, sim.players) is Relevance.NONE
+    assert interest.relevance(2, viewer, sim.players) is Relevance.FULL
+
+
+def test_hidden_kill_is_not_in_distant_snapshots():
+    sim, interest = make_match()
+    impostor = sim.impostors[0]
+    victim, witness, bystander = [p for p in sim.players.values() if p.role == PlayerRole.CREWMATE][:3]
+    for player in sim.players.values():
+        place(sim, player, 1200, 650)
+    place(sim, impostor, 100, 100)
+    place(sim, victim, 110, 100)
+    place(sim, witness, 150, 120)
+    views(sim, interest)  # Everyone has seen everyone alive once
+    assert sim.try_kill(impostor.id, victim.id)
+
+    seen = views(sim, interest)
+    assert seen[witness.id]['players'][str(victim.id)] == [110, 100, False]
+    assert str(victim.id) not in seen[bystander.id]['players']
+    # Ghosts see everything, including the body
+    assert seen[victim.id]['players'][str(victim.id)][2] is False
+    assert len(seen[victim.id]['players']) == len(sim.players)
+
+
+def test_meetings_reveal_the_dead():
+    sim, interest = make_match()
+    impostor = sim.impostors[0]
+    victim, bystander = [p for p in sim.players.values() if p.role == PlayerRole.CREWMATE][:2]
+    place(sim, impostor, 100, 100)
+    place(sim, victim, 110, 100)
+    place(sim, bystander, 1200, 650)
+    assert sim.try_kill(impostor.id, victim.id)
+    assert sim.call_emergency_meeting()
+    assert views(sim, interest)[bystander.id]['players'][str(victim.id)][2] is False
+
+    sim.resolve_voting()
+    # Back in play the death is common knowledge, but the ghost's position is not
+    assert views(sim, interest)[bystander.id]['players'][str(victim.id)] == [None, None, False]
+
+
+def test_cooldowns_are_the_viewers_own():
+    sim, interest = make_match()
+    impostor = sim.impostors[0]
+    seen = views(sim, interest)
+    for client_id, view in seen.items():
+        assert list(view['cooldowns']) == ([str(impostor.id)] if client_id == impostor.id else [])
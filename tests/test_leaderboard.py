@@ -0,0 +1,72 @@
+import random
+import pytest
+from src.leaderboard import Leaderboard, SortedKeys
+from src.systems import StatisticsTracker
+
+
+def test_sorted_keys_match_a_sorted_list():
+    rng = random.Random(3)
+    keys = SortedKeys(load=4)  # Tiny chunks so they split and empty out
+    reference = []
+    for _ in range(2000):
+        if reference and rng.random() < 0.4:
+            key = rng.choice(reference)
+            reference.remove(key)
+            keys.remove(key)
+        else:
+            key = rng.randrange(100)
+            reference.append(key)
+            keys.add(key)
+        reference.sort()
+    assert len(keys) == len(reference)
+    assert keys.slice(0, len(keys)) == reference
+    for start in range(0, len(reference), 7):
+        assert keys.slice(start, start + 5) == reference[start:start + 5]
+    for key in set(reference):
+        assert keys.index(key) == reference.index(key)
+        assert keys.count_before(key) == reference.index(key)
+    with pytest.raises(KeyError):
+        keys.remove(1000)
+
+
+def random_stats(rng):
+    played = rng.randrange(6)
+    won = rng.randrange(played + 1)
+    return {'games_played': played, 'games_won': won, 'win_rate': won / played if played else 0.0,
+            'kills': rng.randrange(4), 'tasks_completed': rng.randrange(10)}
+
+
+def test_pages_and_ranks_follow_updates():
+    rng = random.Random(9)
+    board = Leaderboard('kills', min_games=2)
+    stats = {}
+    for _ in range(500):
+        player_id = rng.randrange(60)
+        stats[player_id] = random_stats(rng)
+        board.update(player_id, stats[player_id])
+
+    ranked = sorted((s for s in stats.items() if s[1]['games_played'] >= 2),
+                    key=lambda item: (-item[1]['kills'], -item[1]['games_won'], item[0]))
+    assert board.page() == [player_id for player_id, _ in ranked]
+    assert board.page(10, 5) == [player_id for player_id, _ in ranked[10:15]]
+    for player_id, s in stats.items():
+        if s['games_played'] < 2:
+            assert board.rank(player_id) is None
+        else:
+            # Ties on kills share the best rank among them
+            assert board.rank(player_id) == 1 + sum(1 for _, other in ranked if other['kills'] > s['kills'])
+
+
+def test_tracker_leaderboard_stays_current():
+    tracker = StatisticsTracker()
+    for player_id in range(1, 5):
+        tracker.create_player_stat(player_id, f"Player {player_id}")
+    assert tracker.get_leaderboard(sort_key='kills') != []  # Built here, then kept current
+    tracker.record_kill(3)
+    tracker.record_kill(3)
+    tracker.record_kill(2)
+    assert [s['name'] for s in tracker.get_leaderboard(0, 2, sort_key='kills')] == ["Player 3", "Player 2"]
+    assert tracker.get_rank(1, sort_key='kills') == 3
+    tracker.add_game_win(1, "CREWMATE")
+    assert tracker.get_rank(1) == 1 and tracker.get_rank(1, min_games=1) == 1
+    assert tracker.get_rank(2, min_games=1) is None
@@ -0,0 +1,54 @@
+import re
+import threading
+from contextlib import contextmanager
+from src.match_host import MatchHost
+from src.network import NetworkServer
+from tests.test_async_network import free_port
+from tools import load_test
+
+
+@contextmanager
+def in_process_host():
+    """Run a MatchHost on a free port for the duration of the block; yields the port"""
+    port = free_port()
+    server = NetworkServer('localhost', port, batch=True)
+    server.start()
+    host = MatchHost(server, seed=1)
+    thread = threading.Thread(target=host.run, daemon=True)
+    thread.start()
+    try:
+        yield port
+    finally:
+        host.running = False
+        thread.join(5.0)
+        host.stop()
+        server.stop()
+
+
+def test_percentile():
+    assert load_test.percentile([], 0.5) is None
+    assert load_test.percentile([5, 1, 4, 2, 3], 0.5) == 3
+    assert load_test.percentile([5, 1, 4, 2, 3], 0.99) == 5
+
+
+def test_main_prints_a_report(capsys):
+    with in_process_host() as port:
+        load_test.main(['--no-spawn', '--port', str(port), '--clients', '4', '--match-size', '4',
+                        '--duration', '1', '--chat-rate', '2', '--codec', 'json'])
+    out = capsys.readouterr().out
+    assert re.search(r"^connect_failures\s+0$", out, re.M)
+    assert int(re.search(r"^chats_sent\s+(\d+)$", out, re.M).group(1)) > 0
+
+
+def test_load_test_runs_against_an_in_process_host():
+    with in_process_host() as port:
+        report = load_test.run(load_test.parse_args([
+            '--no-spawn', '--port', str(port), '--clients', '8', '--match-size', '4', '--duration', '2',
+            '--chat-rate', '2', '--churn-rate', '0.2', '--codec', 'json']))
+
+    assert report['clients'] == 8
+    assert report['connect_failures'] == 0 and report['joins_refused'] == 0
+    assert report['chats_sent'] > 0 and report['chats_lost'] == 0
+    assert report['chat_rtt_ms_p50'] is not None
+    assert report['garbled'] == 0 and report['reconnects'] > 0
+    assert report['received_per_s'] > 0
@@ -0,0 +1,43 @@
+import random
+import pytest
+from src.map import GameMap
+
+
+def linear_room_id(game_map, x, y):
+    for room_id, room in enumerate(game_map.room_list):
+        if room.contains_point(x, y):
+            return room_id
+    return -1
+
+
+def sample_points(game_map):
+    rng = random.Random(2)
+    points = [(rng.uniform(-20, 1300), rng.uniform(-20, 740)) for _ in range(5000)]
+    for room in game_map.room_list:  # Edges are where the raster needs its exact check
+        rect = room.rect
+        points += [(rect.left, rect.top), (rect.right, rect.bottom), (rect.right - 0.5, rect.top - 0.5)]
+    return points
+
+
+def test_room_lookups_match_a_linear_scan():
+    game_map = GameMap()
+    points = sample_points(game_map)
+    expected = [linear_room_id(game_map, x, y) for x, y in points]
+    assert [game_map.get_room_id_at(x, y) for x, y in points] == expected
+    assert game_map.get_room_ids_at(points) == expected
+
+
+def test_bulk_lookup_with_numpy():
+    numpy = pytest.importorskip('numpy')
+    game_map = GameMap()
+    points = sample_points(game_map)
+    expected = [linear_room_id(game_map, x, y) for x, y in points]
+    assert game_map.get_room_ids_at(numpy.array(points)).tolist() == expected
+
+
+def test_room_index_follows_rebuilds():
+    game_map = GameMap()
+    game_map.rooms['Cafeteria'].rect.move_ip(400, 0)
+    game_map.build_room_index()
+    assert game_map.get_room_at(60, 410) is None
+    assert game_map.get_room_at(460, 410).name == 'Cafeteria'
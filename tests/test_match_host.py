@@ -0,0 +1,141 @@
+from src.match_host import MatchHost, MatchState
+from src.network import MessageType, NetworkMessage
+
+
+class FakeServer:
+    """Stands in for the network server: a message queue and a sent log"""
+    def __init__(self):
+        self.queue = []
+        self.sent = []  # (client_ids, NetworkMessage)
+        self.clients = {}  # Connected client ids
+
+    def connect(self, client_id):
+        self.clients[client_id] = None
+
+    def get_message(self):
+        return self.queue.pop(0) if self.queue else None
+
+    def send_to_client(self, client_id, message):
+        self.sent.append(([client_id], message))
+
+    def send_to_clients(self, client_ids, message):
+        self.sent.append((list(client_ids), message))
+
+    def flush(self):
+        pass
+
+
+def send(host, client_id, message_type, data):
+    host.server.queue.append((client_id, NetworkMessage(message_type, client_id, data)))
+    host.poll_messages()
+
+
+def sent_of(server, message_type):
+    return [(clients, message.data) for clients, message in server.sent if message.type == message_type]
+
+
+def make_host(num_clients=5):
+    host = MatchHost(FakeServer(), seed=3)
+    for client_id in range(1, num_clients + 1):
+        host.server.connect(client_id)
+        send(host, client_id, MessageType.MATCH_JOIN, {'match_id': 0, 'name': f"p{client_id}"})
+    return host
+
+
+def join(host, client_id, match_id):
+    host.server.connect(client_id)
+    send(host, client_id, MessageType.MATCH_JOIN, {'match_id': match_id, 'name': f"p{client_id}"})
+    return sent_of(host.server, MessageType.MATCH_JOIN)[-1][1]
+
+
+def test_matches_are_isolated_and_fail_alone():
+    host = make_host(4)
+    for client_id in range(11, 15):
+        join(host, client_id, 1)
+    send(host, 1, MessageType.GAME_START, {'num_impostors': 1})
+    healthy, broken = host.matches[0], host.matches[1]
+    assert (healthy.state, broken.state) == (MatchState.RUNNING, MatchState.LOBBY)
+
+    send(host, 11, MessageType.CHAT, {'text': 'hi'})
+    assert sent_of(host.server, MessageType.CHAT) == [([11, 12, 13, 14], {'player_name': 'p11', 'text': 'hi'})]
+
+    def explode():
+        raise RuntimeError("boom")
+    broken.sim.step = explode
+    assert host.step_round(3 / 60 + 1e-6) == 3
+    assert broken.state == MatchState.FAILED and 'RuntimeError' in broken.error
+    assert sent_of(host.server, MessageType.GAME_END) == [([11, 12, 13, 14], {'winner': None, 'error': 'match failed'})]
+    assert healthy.state == MatchState.RUNNING and healthy.sim.tick_count == 3
+
+
+def test_full_matches_refuse_joins():
+    host = MatchHost(FakeServer(), max_matches=1, max_players_per_match=2)
+    assert join(host, 1, 0)['player_id'] is not None
+    assert join(host, 2, 0)['player_id'] is not None
+    assert join(host, 3, 0)['player_id'] is None
+    assert join(host, 3, 1)['player_id'] is None  # No room for a second match
+    assert set(host.matches) == {0} and 3 not in host.client_matches
+
+
+def test_join_reply_names_the_match_the_client_is_in():
+    host = make_host()
+    send(host, 1, MessageType.MATCH_JOIN, {'match_id': 7, 'name': 'p1'})
+    assert sent_of(host.server, MessageType.MATCH_JOIN)[-1] == ([1], {'match_id': 0, 'player_id': 1})
+    assert 7 not in host.matches
+
+
+def test_malformed_kills_are_ignored():
+    host = make_host()
+    send(host, 1, MessageType.GAME_START, {'num_impostors': 1})
+    match = host.matches[0]
+    assert match.state == MatchState.RUNNING
+    impostor = match.sim.impostors[0]
+    client_id = next(c for c, player_id in match.clients.items() if player_id == impostor.id)
+    victim = next(p for p in match.sim.players.values() if p is not impostor)
+    victim.set_position(impostor.x, impostor.y)
+    for victim_id in ([victim.id], str(victim.id), float(victim.id), {'id': victim.id}):
+        send(host, client_id, MessageType.PLAYER_KILL, {'victim_id': victim_id})
+    assert match.state == MatchState.RUNNING and victim.is_alive
+
+    send(host, client_id, MessageType.PLAYER_KILL, {'victim_id': victim.id})
+    assert not victim.is_alive
+    assert sent_of(host.server, MessageType.PLAYER_KILL)[-1][1] == {'impostor_id': impostor.id, 'victim_id': victim.id}
+
+
+def test_malformed_votes_do_not_fail_the_match():
+    host = make_host()
+    send(host, 1, MessageType.GAME_START, {'num_impostors': 1})
+    send(host, 2, MessageType.VOTING_START, {})
+    send(host, 3, MessageType.VOTE_CAST, {'voted_id': [1]})
+    send(host, 4, MessageType.VOTE_CAST, {'voted_id': '1'})
+    host.step_round(1 / 60)
+    match = host.matches[0]
+    assert match.state == MatchState.RUNNING
+    assert match.sim.vote_manager.votes == {}
+
+
+def test_malformed_moves_are_dropped():
+    host = make_host()
+    send(host, 1, MessageType.GAME_START, {'num_impostors': 1})
+    match = host.matches[0]
+    player = match.player_for(1)
+    start = (player.x, player.y)
+    for x, y in (('a', 1), (float('nan'), 1), (1, float('inf')), (True, 1), ([1], 1), (None, 1)):
+        send(host, 1, MessageType.PLAYER_MOVE, {'x': x, 'y': y})
+    assert match.state == MatchState.RUNNING
+    assert (player.x, player.y) == start
+
+
+def test_moves_are_limited_to_walking_speed():
+    host = make_host()
+    send(host, 1, MessageType.GAME_START, {'num_impostors': 1})
+    match = host.matches[0]
+    player = match.player_for(1)
+    x, y = player.x, player.y
+    send(host, 1, MessageType.PLAYER_MOVE, {'x': -5000, 'y': 99999})
+    assert abs(((player.x - x) ** 2 + (player.y - y) ** 2) ** 0.5 - player.speed) < 1e-9
+
+    host.step_round(2 / 60 + 1e-6)
+    x, y = player.x, player.y
+    send(host, 1, MessageType.PLAYER_MOVE, {'x': x + player.speed * 2, 'y': y})
+    assert (player.x, player.y) == (x + player.speed * 2, y)
@@ -0,0 +1,67 @@
+from src.outbound import OutboundQueue
+
+
+def test_unreliable_messages_give_way_to_reliable_ones():
+    outbox = OutboundQueue(max_messages=2, max_reliable=3)
+    assert outbox.put(b'move1', ('move', 1))
+    assert outbox.put(b'move1b', ('move', 1))  # Supersedes move1
+    assert outbox.put(b'chat0')
+    assert outbox.put(b'chat1')  # Full: move1b is dropped to make room
+    assert outbox.put(b'chat2')  # Reliable messages go past max_messages
+    assert not outbox.put(b'move2', ('move', 2))  # Nothing unreliable left to drop
+    stats = outbox.get_stats()
+    assert (stats['queued'], stats['replaced'], stats['dropped'], stats['stalled']) == (3, 1, 2, False)
+
+    assert not outbox.put(b'chat3')
+    assert outbox.stalled and outbox.closed
+    assert not outbox.put(b'chat4')
+
+
+def test_superseded_messages_leave_the_queue():
+    outbox = OutboundQueue(max_messages=10)
+    for n in range(100000):
+        assert outbox.put(b'move%d' % n, ('move', n % 10))
+    assert outbox.size == len(outbox.entries) == 10
+    assert outbox.get_stats()['replaced'] == 100000 - 10
+    assert outbox.get_batch(timeout=0) == [b'move%d' % n for n in range(100000 - 10, 100000)]
+
+
+def test_batch_keeps_send_order():
+    outbox = OutboundQueue()
+    outbox.put(b'move1', ('move', 1))
+    outbox.put(b'kill')
+    outbox.put(b'move2', ('move', 2))
+    outbox.put(b'move1b', ('move', 1))
+    assert outbox.get_batch(timeout=0) == [b'kill', b'move2', b'move1b']
+    assert outbox.size == 0 and outbox.get_stats()['oldest_age'] == 0.0
+
+
+def test_overflow_drops_the_oldest_unreliable_message():
+    outbox = OutboundQueue(max_messages=3)
+    outbox.put(b'move1', ('move', 1))
+    outbox.put(b'chat')
+    outbox.put(b'move2', ('move', 2))
+    outbox.put(b'move1b', ('move', 1))  # Supersedes, so nothing overflows
+    outbox.put(b'vote')
+    assert outbox.get_stats()['dropped'] == 1
+    assert outbox.get_batch(timeout=0) == [b'chat', b'move1b', b'vote']
+
+
+def test_reliable_backlog_past_the_limit_stalls():
+    outbox = OutboundQueue(max_messages=2, max_reliable=4)
+    for n in range(4):
+        assert outbox.put(b'chat%d' % n)
+    assert not outbox.put(b'move', ('move', 1))
+    assert not outbox.put(b'chat4')
+    assert outbox.stalled and outbox.closed
+    assert len(outbox.get_batch(timeout=0)) == 4
+    assert outbox.get_batch(timeout=0) is None
+
+
+def test_batching_waits_for_flush():
+    outbox = OutboundQueue(batch=True)
+    outbox.put(b'a')
+    assert outbox.get_batch(timeout=0) is None
+    outbox.flush()
+    assert outbox.get_batch(timeout=0) == [b'a']
+    assert outbox.get_stats()['sent_writes'] == 1
@@ -0,0 +1,36 @@
+import random
+import pytest
+from src.player import PlayerColor, PlayerRole
+from src.player_store import PlayerStore
+from tests.test_determinism import bot_match
+
+
+def make_store(use_numpy):
+    store = PlayerStore(capacity=2, use_numpy=use_numpy)  # Small, so adding players grows it
+    rng = random.Random(1)
+    for player_id in range(1, 11):
+        player = store.add_player(player_id, f"p{player_id}", PlayerColor.RED, rng.uniform(0, 1280), rng.uniform(0, 720))
+        player.velocity_x = rng.choice((-3, 0, 3))
+        player.velocity_y = rng.uniform(-3, 3)
+        player.role = PlayerRole.IMPOSTOR if player_id % 4 == 0 else PlayerRole.CREWMATE
+        player.is_alive = player_id % 3 != 0
+    return store
+
+
+@pytest.mark.parametrize('use_numpy', [False, True])
+def test_batched_update_matches_player_update(use_numpy):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    store = make_store(use_numpy)
+    reference = make_store(use_numpy)
+    for _ in range(100):
+        store.update(1 / 60, 1280, 720)
+        for player in reference.players:
+            player.update(1 / 60)
+    assert [(p.x, p.y) for p in store.players] == [(p.x, p.y) for p in reference.players]
+    assert store.count_alive() == 7
+    assert store.count_alive(PlayerRole.IMPOSTOR) == 2
+
+
+def test_store_backed_match_plays_out_the_same():
+    assert bot_match(7, use_player_store=True) == bot_match(7)
@@ -0,0 +1,16 @@
+from src.map import GameMap
+
+
+def test_map_background_is_reused_until_it_changes():
+    game_map = GameMap()
+    background = game_map.get_background()
+    assert game_map.get_background() is background
+
+    vent = next(iter(game_map.vents.values()))
+    vent.is_active = not vent.is_active
+    changed = game_map.get_background()
+    assert changed is not background
+    assert game_map.get_background() is changed
+
+    game_map.invalidate_background()
+    assert game_map.get_background() is not changed
@@ -0,0 +1,111 @@
+import multiprocessing
+import threading
+import time
+from src.network import MessageType, NetworkMessage
+from src.sharding import ShardedHost
+from tests.test_match_host import FakeServer
+
+
+def make_host(**host_options):
+    server = FakeServer()
+    host = ShardedHost(server, workers=2, host_options=host_options, mp_context=multiprocessing.get_context('spawn'))
+    host.start()
+    return host
+
+
+def join(host, client_id, match_id):
+    """Send a MATCH_JOIN and relay until its reply comes back; returns the reply"""
+    server = host.server
+    server.connect(client_id)
+    replies = len(server.sent)
+    server.queue.append((client_id, NetworkMessage(MessageType.MATCH_JOIN, client_id, {'match_id': match_id})))
+    host.route_client_messages()
+    deadline = time.monotonic() + 20.0
+    while time.monotonic() < deadline:
+        host.relay_worker_messages(0.05)
+        for clients, message in server.sent[replies:]:
+            if message.type == MessageType.MATCH_JOIN and clients == [client_id]:
+                return message.data
+    raise AssertionError("No MATCH_JOIN reply")
+
+
+def test_a_dead_worker_only_ends_its_own_matches():
+    host = make_host()
+    try:
+        join(host, 1, 0)
+        join(host, 2, 1)
+        lost, kept = host.match_workers[0], host.match_workers[1]
+        assert lost is not kept
+        lost.process.terminate()
+        lost.process.join(5.0)
+
+        host.check_workers()
+        server = host.server
+        assert ([1], {'winner': None, 'error': 'match server restarted'}) in [
+            (clients, message.data) for clients, message in server.sent if message.type == MessageType.GAME_END]
+        assert 1 not in host.client_workers and 0 not in host.match_workers
+        assert host.workers[lost.slot].restarts == 1 and host.workers[lost.slot].process.is_alive()
+        assert host.client_workers[2] is kept
+
+        # The survivor's match still relays, and the dropped client can join again
+        server.queue.append((2, NetworkMessage(MessageType.CHAT, 2, {'text': 'still here'})))
+        host.route_client_messages()
+        deadline = time.monotonic() + 20.0
+        while time.monotonic() < deadline and not any(
+                message.type == MessageType.CHAT for _, message in server.sent):
+            host.relay_worker_messages(0.05)
+        assert any(message.type == MessageType.CHAT and message.data['text'] == 'still here'
+                   for _, message in server.sent)
+        assert join(host, 1, 0)['player_id'] is not None
+    finally:
+        host.stop()
+
+
+def test_refused_joins_free_the_client_and_the_placement():
+    host = make_host(max_matches=1, max_players_per_match=2)
+    try:
+        assert join(host, 1, 0)['player_id'] is not None
+        assert join(host, 2, 1)['player_id'] is not None
+        assert host.match_workers[0] is not host.match_workers[1]
+
+        # Both workers are full: the join is refused and match 2 is not left placed
+        assert join(host, 3, 2)['player_id'] is None
+        assert 2 not in host.match_workers and 3 not in host.client_workers
+        assert all(2 not in worker.matches for worker in host.workers)
+
+        # A joined client asking for another match is told the one it is in
+        assert join(host, 1, 1) == {'match_id': 0, 'player_id': 1}
+        assert host.client_matches[1] == 0 and host.match_workers[1].matches == {1}
+
+        # A refused client can go on to join elsewhere
+        assert join(host, 3, 1)['player_id'] is not None
+        assert host.client_workers[3] is host.match_workers[1]
+    finally:
+        host.stop()
+
+
+def test_flooding_a_worker_does_not_block_the_front_door():
+    host = make_host()
+    try:
+        join(host, 1, 0)
+        server = host.server
+        text = "x" * 200
+        for index in range(3000):
+            server.queue.append((1, NetworkMessage(MessageType.CHAT, 1, {'text': f"{index} {text}"})))
+            server.queue.append((1, NetworkMessage(MessageType.PLAYER_MOVE, 1, {'x': index, 'y': index})))
+
+        # Far more than a pipe buffer in both directions: the front door
+        # only queues for the worker, so routing returns at once
+        routing = threading.Thread(target=host.route_client_messages, daemon=True)
+        routing.start()
+        routing.join(5.0)
+        assert not routing.is_alive()
+
+        deadline = time.monotonic() + 30.0
+        echoed = 0
+        while echoed < 3000 and time.monotonic() < deadline:
+            host.relay_worker_messages(0.05)
+            echoed = sum(1 for _, message in server.sent if message.type == MessageType.CHAT)
+        assert echoed == 3000
+    finally:
+        host.stop()
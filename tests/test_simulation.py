@@ -0,0 +1,132 @@
+from src.player import PlayerColor, PlayerRole
+from src.simulation import Simulation, GameState, ScriptedController, WanderBot
+
+
+def make_sim(num_players=6, num_impostors=1, seed=3):
+    sim = Simulation(seed=seed)
+    colors = list(PlayerColor)
+    for index in range(num_players):
+        sim.add_player(f"Player {index + 1}", colors[index % len(colors)])
+    assert sim.start_game(num_impostors)
+    return sim
+
+
+def crewmates(sim):
+    return [p for p in sim.players.values() if p.role == PlayerRole.CREWMATE]
+
+
+def assert_counters_match_recount(sim):
+    counts = dict(sim.alive_counts)
+    done, total = sim.tasks_done, sim.tasks_total
+    sim.recount()
+    assert counts == sim.alive_counts
+    assert (done, total) == (sim.tasks_done, sim.tasks_total)
+
+
+def kill(sim, impostor, victim):
+    victim.set_position(impostor.x, impostor.y)
+    assert sim.try_kill(impostor.id, victim.id)
+
+
+def add_players(sim, num_players):
+    colors = list(PlayerColor)
+    return [sim.add_player(f"Player {index + 1}", colors[index % len(colors)]) for index in range(num_players)]
+
+
+def test_start_needs_four_players():
+    sim = Simulation()
+    add_players(sim, 3)
+    assert not sim.start_game(1)
+    add_players(sim, 1)
+    assert sim.start_game(1)
+    assert sim.current_state == GameState.PLAYING
+    assert sum(1 for p in sim.players.values() if p.role == PlayerRole.IMPOSTOR) == 1
+
+
+def test_scripted_controller_moves_and_calls_a_meeting():
+    sim = Simulation()
+    player = add_players(sim, 4)[0]
+    assert sim.start_game(1)
+    x, y = player.x, player.y
+    sim.set_controller(player.id, ScriptedController({0: [('move', 1, 0)], 10: [('move', 0, 0), ('meeting',)]}))
+    assert sim.run_ticks(11) == 11
+    assert (player.x, player.y) == (x + 10 * player.speed, y)
+    assert sim.current_state == GameState.VOTING and sim.emergency_meetings_left == 0
+
+    for voter_id in sim.players:
+        assert sim.cast_vote(voter_id, None)
+    sim.step()
+    assert sim.current_state == GameState.PLAYING
+    assert all(p.is_alive for p in sim.players.values())
+
+
+def test_bots_play_a_match_to_the_end():
+    sim = Simulation()
+    for player in add_players(sim, 8):
+        sim.set_controller(player.id, WanderBot(task_interval=30))
+    assert sim.start_game(2)
+    assert sim.run_ticks(20000) < 20000
+    assert sim.game_over and sim.winning_team in ("CREWMATES", "IMPOSTORS")
+
+
+def test_counters_follow_kills_and_tasks():
+    sim = make_sim()
+    impostor = sim.impostors[0]
+    kill(sim, impostor, crewmates(sim)[0])
+    sim.complete_task(sim.tasks[0])
+    assert sim.alive_counts[PlayerRole.CREWMATE] == 4
+    assert sim.tasks_done == 1
+    assert_counters_match_recount(sim)
+
+
+def test_votes_for_dead_players_are_rejected():
+    sim = make_sim()
+    impostor = sim.impostors[0]
+    dead, voter = crewmates(sim)[:2]
+    kill(sim, impostor, dead)
+    assert sim.call_emergency_meeting()
+    assert dead.id not in sim.vote_manager.vote_counts
+    assert not sim.cast_vote(voter.id, dead.id)
+    sim.queue_vote(voter.id, dead.id)
+    sim.update()
+    assert sim.applied_votes == []
+    assert sim.resolve_voting() is None
+    assert_counters_match_recount(sim)
+
+
+def test_ejecting_a_player_who_died_during_the_meeting_counts_once():
+    sim = make_sim(num_players=8)
+    crew = crewmates(sim)
+    target = crew[0]
+    assert sim.call_emergency_meeting()
+    for voter in crew[1:4]:
+        assert sim.cast_vote(voter.id, target.id)
+    sim.disconnect_player(target.id)
+    assert sim.resolve_voting() is None
+    assert sim.alive_counts[PlayerRole.CREWMATE] == len(crew) - 1
+    assert_counters_match_recount(sim)
+    assert not sim.game_over
+
+
+def test_disconnect_drops_tasks_from_the_total():
+    sim = make_sim()
+    leaver = crewmates(sim)[0]
+    total = sim.tasks_total
+    owned = sum(1 for task in sim.tasks if task.assigned_to_player_id == leaver.id)
+    assert sim.disconnect_player(leaver.id)
+    assert sim.tasks_total == total - owned
+    assert_counters_match_recount(sim)
+
+
+def test_game_ends_once_when_impostors_reach_parity():
+    sim = make_sim(num_players=4)
+    impostor = sim.impostors[0]
+    crew = crewmates(sim)
+    kill(sim, impostor, crew[0])
+    sim.kill_manager.last_kill_time.clear()
+    kill(sim, impostor, crew[1])
+    sim.update()
+    assert sim.game_over and sim.winning_team == "IMPOSTORS"
+    assert sim.current_state == GameState.PLAYING
+    sim.end_game = None  # Any second end_game call would now fail
+    sim.check_game_end()
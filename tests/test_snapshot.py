@@ -0,0 +1,97 @@
+from src.player import PlayerColor, PlayerRole
+from src.simulation import Simulation, GameState
+from src.snapshot import (SnapshotReceiver, SnapshotReplicator, apply_snapshot, capture_snapshot, own_view,
+                          diff_snapshots, patch_snapshot)
+
+
+def make_server(num_players=5, seed=4):
+    sim = Simulation(seed=seed)
+    for index in range(num_players):
+        sim.add_player(f"Player {index + 1}", list(PlayerColor)[index])
+    sim.start_game(1)
+    return sim
+
+
+def make_client(server):
+    client = Simulation(seed=0)
+    for player in server.players.values():
+        client.add_player(player.name, player.color)
+    return client
+
+
+def test_diff_and_patch_round_trip():
+    base = {'players': {'1': [1.0, 2.0, True], '2': [5.0, 5.0, True]}, 'tasks': {'0': False}, 'meeting': {}}
+    new = {'players': {'1': [1.5, 2.0, True]}, 'tasks': {'0': True}, 'meeting': {'vote:1': None}}
+    changes, removed = diff_snapshots(base, new)
+    assert changes == {'players': {'1': [1.5, 2.0, True]}, 'tasks': {'0': True}, 'meeting': {'vote:1': None}}
+    assert removed == {'players': ['2']}
+    assert patch_snapshot(base, changes, removed) == dict(new, cooldowns={})
+
+
+def test_deltas_are_taken_against_the_acknowledged_tick():
+    server = make_server()
+    replicator = SnapshotReplicator(keyframe_interval=1000)
+    receiver = SnapshotReceiver()
+
+    replicator.record(0, capture_snapshot(server))
+    update = replicator.build_update(1)
+    assert update['base'] is None
+    assert receiver.apply(update) is not None
+    replicator.acknowledge(1, 0)
+
+    server.players[1].set_position(100, 100)
+    replicator.record(3, capture_snapshot(server))
+    update = replicator.build_update(1)
+    assert update['base'] == 0
+    assert update['changes'] == {'players': {'1': [100, 100, True]}}
+    assert receiver.apply(update) == capture_snapshot(server)
+
+
+def test_delta_against_an_unknown_base_is_dropped():
+    receiver = SnapshotReceiver()
+    assert receiver.apply({'tick': 5, 'base': 2, 'changes': {}, 'removed': {}}) is None
+
+
+def test_replica_does_not_decide_the_winner():
+    server = make_server()
+    client = make_client(server)
+    snapshot = capture_snapshot(server)
+    # The client only hears about one living crewmate and no impostors
+    survivor = next(p.id for p in server.players.values() if p.role == PlayerRole.CREWMATE)
+    for key, entry in snapshot['players'].items():
+        entry[2] = int(key) == survivor
+    apply_snapshot(client, snapshot)
+    assert client.current_state == GameState.PLAYING
+    client.update()
+    assert not client.game_over
+
+    server.end_game("IMPOSTORS")
+    apply_snapshot(client, capture_snapshot(server))
+    assert client.game_over and client.winning_team == "IMPOSTORS"
+
+
+def test_cooldowns_only_reach_their_owner():
+    server = make_server()
+    impostor = server.impostors[0]
+    crewmate = next(p for p in server.players.values() if p.role == PlayerRole.CREWMATE)
+    replicator = SnapshotReplicator()
+    replicator.record(0, capture_snapshot(server))
+
+    for player in (impostor, crewmate):
+        update = replicator.build_update(player.id, view=lambda snapshot: own_view(snapshot, player.id))
+        expected = [str(impostor.id)] if player is impostor else []
+        assert list(update['changes']['cooldowns']) == expected
+
+
+def test_deltas_use_the_view_the_client_holds():
+    server = make_server()
+    replicator = SnapshotReplicator(keyframe_interval=1000)
+    receiver = SnapshotReceiver()
+    view = lambda snapshot: own_view(snapshot, 99)
+    replicator.record(0, capture_snapshot(server))
+    receiver.apply(replicator.build_update(7, view=view))
+    replicator.acknowledge(7, 0)
+    replicator.record(3, capture_snapshot(server))
+    update = replicator.build_update(7, view=view)
+    assert update['base'] == 0 and update['changes'] == {}
+    assert receiver.apply(update)['cooldowns'] == {}
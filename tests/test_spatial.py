@@ -0,0 +1,53 @@
+import random
+from src.spatial import SpatialHash
+
+
+def brute_force(points, x, y, radius):
+    return sorted(key for key, (px, py) in points.items() if (px - x) ** 2 + (py - y) ** 2 <= radius * radius)
+
+
+def test_queries_match_a_linear_scan():
+    rng = random.Random(4)
+    index = SpatialHash(cell_size=32)
+    points = {}
+    for key in range(300):
+        points[key] = (rng.uniform(-50, 1300), rng.uniform(-50, 750))
+        index.insert(key, *points[key])
+    for key in range(0, 300, 3):
+        points[key] = (rng.uniform(0, 1280), rng.uniform(0, 720))
+        index.move(key, *points[key])
+    for key in range(0, 300, 7):
+        del points[key]
+        index.remove(key)
+
+    for _ in range(200):
+        x, y, radius = rng.uniform(0, 1280), rng.uniform(0, 720), rng.uniform(0, 150)
+        assert sorted(index.query_radius(x, y, radius)) == brute_force(points, x, y, radius)
+        found = brute_force(points, x, y, radius)
+        nearest = index.nearest(x, y, radius)
+        if not found:
+            assert nearest is None
+        else:
+            best = min((points[k][0] - x) ** 2 + (points[k][1] - y) ** 2 for k in found)
+            assert (points[nearest][0] - x) ** 2 + (points[nearest][1] - y) ** 2 == best
+    assert len(index) == len(points)
+
+
+def test_move_many_matches_moving_one_at_a_time():
+    one, many = SpatialHash(), SpatialHash()
+    keys = list(range(50))
+    xs = [key * 25.0 for key in keys]
+    ys = [key * 13.0 for key in keys]
+    for key, x, y in zip(keys, xs, ys):
+        one.move(key, x, y)
+    many.move_many(keys, xs, ys)
+    assert one.positions == many.positions and one.cells == many.cells
+
+
+def test_predicate_and_ties():
+    index = SpatialHash()
+    index.insert(5, 10, 0)
+    index.insert(3, -10, 0)
+    index.insert(4, 0, 5)
+    assert index.nearest(0, 0, 20, predicate=lambda key: key != 4) == 3
+    assert sorted(index.query_radius(0, 0, 10, predicate=lambda key: key > 3)) == [4, 5]
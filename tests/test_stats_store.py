@@ -0,0 +1,41 @@
+from src.stats_store import StatsStore
+
+
+def test_counts_survive_a_reopen(tmp_path):
+    path = str(tmp_path / "stats.db")
+    store = StatsStore(path, flush_interval=60.0)
+    store.add("alice", 'games_played')
+    store.add("alice", 'games_won')
+    store.add("bob", 'kills', 3)
+    store.close()  # Writes what is pending
+
+    store = StatsStore(path)
+    assert store.get("alice")['win_rate'] == 1.0
+    assert store.get("bob")['kills'] == 3
+    assert store.get("carol") is None
+    store.close()
+
+
+def test_stores_sharing_a_file_add_up(tmp_path):
+    path = str(tmp_path / "stats.db")
+    first, second = StatsStore(path), StatsStore(path)
+    for _ in range(5):
+        first.add("alice", 'tasks_completed')
+        second.add("alice", 'tasks_completed', 2)
+    first.close()
+    second.close()
+    store = StatsStore(path)
+    assert store.get("alice")['tasks_completed'] == 15
+    store.close()
+
+
+def test_lifetime_leaderboard(tmp_path):
+    store = StatsStore(str(tmp_path / "stats.db"))
+    for name, played, won in (("alice", 4, 1), ("bob", 2, 2), ("carol", 1, 0)):
+        store.add(name, 'games_played', played)
+        store.add(name, 'games_won', won)
+    assert [r['name'] for r in store.get_leaderboard(min_games=2)] == ["bob", "alice"]
+    store.add("carol", 'games_played')
+    store.add("carol", 'games_won', 2)
+    assert store.get_rank("carol", min_games=2) == 1
+    store.close()
@@ -0,0 +1,62 @@
+from src.codec import CODECS, FLAG_WIDE, MessageDecoder
+from src.player import Player, PlayerColor
+from src.udp import InputBuffer, MovementPredictor, pack_datagrams, unpack_datagram, seq_newer
+
+DT = 1 / 60
+
+
+def test_sequence_numbers_wrap():
+    assert seq_newer(1, 0xFFFFFFFF)
+    assert not seq_newer(0xFFFFFFFF, 1)
+
+
+def test_datagrams_round_trip():
+    predictor = MovementPredictor(Player(1, "a", PlayerColor.RED, 100, 100), DT)
+    for _ in range(5):
+        predictor.record_input()
+    messages = predictor.input_messages()
+    datagrams, _, oversized = pack_datagrams(messages, 'binary', 1)
+    assert len(datagrams) == 1 and not oversized
+    decoded = []
+    for datagram in datagrams:
+        decoded += unpack_datagram(datagram)[2]
+    assert [m.data for m in decoded] == [m.data for m in messages]
+
+
+def test_server_replays_the_client_inputs_exactly():
+    client = Player(1, "a", PlayerColor.RED, 100, 100)
+    server = Player(1, "a", PlayerColor.RED, 100, 100)
+    predictor = MovementPredictor(client, DT)
+    inputs = InputBuffer()
+    for step in range(30):
+        client.move_towards(400 + step, 310 - 3 * step)  # Velocities that float32 can't hold exactly
+        client.update(DT)
+        predictor.record_input()
+        encoded = CODECS['binary'].encode(predictor.input_messages(1)[0])
+        assert not encoded[3] & FLAG_WIDE  # Recorded inputs already fit the wire's float32
+        for message in MessageDecoder().feed(encoded):
+            inputs.add(1, message.data['seq'], message.data['vx'], message.data['vy'], server.speed)
+    for _ in range(20):
+        inputs.apply({1: server})
+        server.update(DT)
+
+    # The server has applied 20 of the 30 inputs; replaying the rest lands where the server will
+    predictor.reconcile(server.x, server.y, inputs.acked[1])
+    for _ in range(10):
+        inputs.apply({1: server})
+        server.update(DT)
+    assert (client.x, client.y) == (server.x, server.y)
+
+
+def test_bad_inputs_are_dropped_and_speed_is_clamped():
+    player = Player(1, "a", PlayerColor.RED, 100, 100)
+    inputs = InputBuffer()
+    for seq, vx, vy in (('1', 1, 1), (None, 1, 1), (-1, 1, 1), (2 ** 32, 1, 1),
+                        (1, 'a', 1), (1, float('nan'), 1), (1, 1, float('inf')), (1, None, 1)):
+        assert not inputs.add(1, seq, vx, vy, player.speed)
+    assert inputs.inputs == {}
+
+    assert inputs.add(1, 1, 500, -500, player.speed)
+    inputs.apply({1: player})
+    player.update(DT)
+    assert (player.x, player.y) == (100 + player.speed, 100 - player.speed)
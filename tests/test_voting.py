@@ -0,0 +1,73 @@
+from src.voting import VoteManager
+from tests.test_simulation import make_sim
+
+
+def start(candidates=(1, 2, 3, 4)):
+    manager = VoteManager()
+    manager.start_voting(dict.fromkeys(candidates))
+    return manager
+
+
+def test_tallies_follow_changed_and_withdrawn_votes():
+    manager = start()
+    manager.vote(10, 1)
+    manager.vote(11, 1)
+    manager.vote(12, 2)
+    assert manager.leader() == 1
+    manager.vote(11, 2)
+    assert manager.leader() == 2
+    manager.remove_vote(12)
+    assert manager.leader() == [1, 2]
+    assert manager.get_vote_counts() == {1: 1, 2: 1, 3: 0, 4: 0}
+
+
+def test_skip_competes_with_the_candidates():
+    manager = start()
+    manager.vote(10, 1)
+    manager.vote(11, None)
+    manager.vote(12, None)
+    assert manager.end_voting() is None  # Skip wins
+
+    manager = start()
+    manager.vote(10, 1)
+    manager.vote(11, None)
+    assert manager.leader() is None  # Skip ties the leader
+    manager.vote(12, 1)
+    assert manager.leader() == 1
+
+
+def test_load_votes_matches_voting_one_by_one():
+    manager = start()
+    for voter_id, voted_id in [(10, 1), (11, 3), (12, None), (13, 3)]:
+        manager.vote(voter_id, voted_id)
+    loaded = start()
+    loaded.vote(10, 2)
+    loaded.load_votes(dict(manager.votes))
+    assert loaded.get_vote_counts() == manager.get_vote_counts()
+    assert (loaded.skip_votes, loaded.leader()) == (manager.skip_votes, manager.leader())
+
+
+def test_malformed_votes_are_dropped():
+    sim = make_sim()
+    assert sim.call_emergency_meeting()
+    voter = next(iter(sim.players))
+    for voted_id in ([1], "1", 1.0, True, {"id": 1}):
+        assert not sim.queue_vote(voter, voted_id)
+        assert not sim.cast_vote(voter, voted_id)
+    assert not sim.queue_vote(voter, [1])
+    sim.update()
+    assert sim.vote_manager.votes == {}
+    assert sim.queue_vote(voter, None)
+    sim.update()
+    assert sim.applied_votes == [(voter, None)]
+
+
+def test_skip_majority_ejects_nobody():
+    sim = make_sim()
+    assert sim.call_emergency_meeting()
+    voters = list(sim.players)
+    assert sim.cast_vote(voters[0], voters[1])
+    for voter in voters[1:3]:
+        assert sim.cast_vote(voter, None)
+    assert sim.resolve_voting() is None
+    assert all(p.is_alive for p in sim.players.values())
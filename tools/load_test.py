@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Synthetic-client load generator
+
+Starts a match host on localhost (or targets one already running) and
+connects many simulated players built on NetworkClient. Players join
+matches, move, chat, vote and churn (disconnect and reconnect into a
+fresh lobby), and the run reports throughput, chat round-trip latency
+percentiles, lost and garbled messages, and server CPU/RSS. Players only
+chat while the server has them in a live match. Run from the repo root:
+
+    python -m tools.load_test --clients 500 --duration 30
+    python -m tools.load_test --clients 50 --port 6000 --no-spawn
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import queue
+import random
+import subprocess
+import sys
+import time
+from src.network import NetworkClient, MessageType
+
+CHAT_PREFIX = 'lt'
+
+
+class LoadClient(NetworkClient):
+    """NetworkClient that timestamps every message as it arrives"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.message_queue = _StampedQueue()
+
+    def get_message(self):
+        """Get (arrival_time, message), or None"""
+        try:
+            return self.message_queue.get_nowait()
+        except queue.Empty:
+            return None
+
+
+class _StampedQueue(queue.SimpleQueue):
+    def put(self, item, block=True, timeout=None):
+        super().put((time.perf_counter(), item), block, timeout)
+
+
+class SimulatedPlayer:
+    def __init__(self, index, match_id, host, port, codec, rng):
+        self.index = index
+        self.match_id = match_id
+        self.host = host
+        self.port = port
+        self.codec = codec
+        self.rng = rng
+        self.client = None
+        self.x = rng.uniform(100, 1180)
+        self.y = rng.uniform(100, 620)
+        self.chat_seq = 0
+        self.pending_chats = {}  # {seq: send time}
+        self.joined = False  # Chats only once the server has put us in a match
+
+    def connect(self):
+        self.joined = False
+        self.client = LoadClient(self.host, self.port, codec=self.codec, batch=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if not self.client.connect():
+                return False
+        self.client.send_message(MessageType.MATCH_JOIN, {'match_id': self.match_id, 'name': f"bot{self.index}"})
+        return True
+
+    def disconnect(self):
+        if self.client:
+            self.client.flush()
+            self.client.disconnect()
+
+    def move(self):
+        self.x = min(1270.0, max(10.0, self.x + self.rng.uniform(-5, 5)))
+        self.y = min(710.0, max(10.0, self.y + self.rng.uniform(-5, 5)))
+        self.client.send_message(MessageType.PLAYER_MOVE, {'player_id': self.index, 'x': self.x, 'y': self.y})
+
+    def chat(self, now):
+        self.chat_seq += 1
+        self.pending_chats[self.chat_seq] = now
+        self.client.send_message(MessageType.CHAT, {'player_name': f"bot{self.index}",
+                                                    'text': f"{CHAT_PREFIX}:{self.index}:{self.chat_seq}"})
+
+
+class ServerMonitor:
+    """Samples a process's CPU time and RSS from /proc (Linux) or psutil"""
+    def __init__(self, pid):
+        self.pid = pid
+        self.samples = []  # (wall time, cpu seconds, rss bytes)
+        try:
+            import psutil
+            self._process = psutil.Process(pid)
+        except Exception:
+            self._process = None
+
+    def sample(self):
+        try:
+            if self._process is not None:
+                times = self._process.cpu_times()
+                cpu = times.user + times.system
+                rss = self._process.memory_info().rss
+            else:
+                with open(f"/proc/{self.pid}/stat") as f:
+                    fields = f.read().rsplit(')', 1)[1].split()
+                ticks = os.sysconf('SC_CLK_TCK')
+                cpu = (int(fields[11]) + int(fields[12])) / ticks
+                rss = int(fields[21]) * os.sysconf('SC_PAGE_SIZE')
+        except Exception:
+            return
+        self.samples.append((time.perf_counter(), cpu, rss))
+
+    def summary(self):
+        if len(self.samples) < 2:
+            return {'cpu_percent': None, 'rss_max_mb': None}
+        (t0, cpu0, _), (t1, cpu1, _) = self.samples[0], self.samples[-1]
+        return {
+            'cpu_percent': 100.0 * (cpu1 - cpu0) / (t1 - t0),
+            'rss_max_mb': max(rss for _, _, rss in self.samples) / (1024 * 1024),
+        }
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def spawn_server(port, server_args):
+    cmd = [sys.executable, 'run.py', 'host', '--port', str(port)] + server_args
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.5)  # Let it bind
+    if process.poll() is not None:
+        raise SystemExit(f"Server exited early with code {process.returncode}")
+    return process
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    server = spawn_server(args.port, args.server_args.split()) if args.spawn else None
+    monitor = ServerMonitor(server.pid if server else args.server_pid) if (server or args.server_pid) else None
+
+    players = [SimulatedPlayer(i, i // args.match_size, 'localhost', args.port, args.codec, random.Random(rng.random()))
+               for i in range(args.clients)]
+    failed = sum(1 for player in players if not player.connect())
+    for player in players:
+        player.client.flush()
+    time.sleep(0.5)
+    for player in players[::args.match_size]:
+        # First player of each match starts it
+        player.client.send_message(MessageType.GAME_START, {'num_impostors': 1})
+
+    stats = {'sent': 0, 'received': 0, 'latencies': [], 'reconnects': 0, 'chats_sent': 0, 'chats_lost': 0,
+             'garbled': 0, 'connect_failures': failed, 'joins_refused': 0, 'chats_after_end': 0}
+    # The starting matches are running by now, so reconnecting players fill fresh lobbies after them
+    first_lobby = (args.clients + args.match_size - 1) // args.match_size
+    tick = 1.0 / args.tick_rate
+    start = time.perf_counter()
+    next_tick = start
+    next_sample = start
+    while time.perf_counter() - start < args.duration:
+        now = time.perf_counter()
+        for player in players:
+            client = player.client
+            if not client.connected:
+                continue
+            if player.rng.random() < args.move_rate * tick:
+                player.move()
+                stats['sent'] += 1
+            if player.joined and player.rng.random() < args.chat_rate * tick:
+                player.chat(now)
+                stats['sent'] += 1
+                stats['chats_sent'] += 1
+            if player.rng.random() < args.vote_rate * tick:
+                client.send_message(MessageType.VOTE_CAST, {'voter_id': player.index, 'voted_id': None})
+                stats['sent'] += 1
+            client.flush()
+            drain(player, stats)
+
+            if player.rng.random() < args.churn_rate * tick:
+                # Leave and come back as a fresh connection
+                stats['garbled'] += player.client.decoder.errors if player.client.decoder else 0
+                stats['chats_lost'] += len(player.pending_chats)
+                player.pending_chats.clear()
+                player.disconnect()
+                player.match_id = first_lobby + stats['reconnects'] // args.match_size
+                stats['reconnects'] += 1
+                if not player.connect():
+                    stats['connect_failures'] += 1
+
+        if monitor and now >= next_sample:
+            monitor.sample()
+            next_sample = now + 0.5
+        next_tick += tick
+        time.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    # Give in-flight chats a moment to come back
+    deadline = time.perf_counter() + 1.0
+    while time.perf_counter() < deadline:
+        for player in players:
+            drain(player, stats)
+        time.sleep(0.05)
+    if monitor:
+        monitor.sample()
+
+    elapsed = time.perf_counter() - start
+    for player in players:
+        stats['chats_lost'] += len(player.pending_chats)
+        if player.client.decoder:
+            stats['garbled'] += player.client.decoder.errors
+        player.disconnect()
+    if server:
+        server.terminate()
+        server.wait(5)
+
+    latencies = stats['latencies']
+    report = {
+        'clients': args.clients,
+        'seconds': elapsed,
+        'sent_per_s': stats['sent'] / elapsed,
+        'received_per_s': stats['received'] / elapsed,
+        'chat_rtt_ms_p50': percentile(latencies, 0.50),
+        'chat_rtt_ms_p90': percentile(latencies, 0.90),
+        'chat_rtt_ms_p99': percentile(latencies, 0.99),
+        'chat_rtt_ms_max': max(latencies) if latencies else None,
+        'chats_sent': stats['chats_sent'],
+        'chats_lost': stats['chats_lost'],
+        'chats_after_end': stats['chats_after_end'],
+        'garbled': stats['garbled'],
+        'reconnects': stats['reconnects'],
+        'connect_failures': stats['connect_failures'],
+        'joins_refused': stats['joins_refused'],
+    }
+    if monitor:
+        report.update(monitor.summary())
+    return report
+
+
+def drain(player, stats):
+    """Count incoming messages and time the echoes of our own chats"""
+    while True:
+        item = player.client.get_message()
+        if item is None:
+            return
+        arrived, message = item
+        stats['received'] += 1
+        if message.type == MessageType.MATCH_JOIN and isinstance(message.data, dict):
+            player.joined = message.data.get('player_id') is not None
+            stats['joins_refused'] += not player.joined
+            continue
+        if message.type == MessageType.GAME_END:
+            # A finished match ignores chat, so what is still in flight was never going to come back
+            player.joined = False
+            stats['chats_after_end'] += len(player.pending_chats)
+            player.pending_chats.clear()
+            continue
+        if message.type != MessageType.CHAT or not isinstance(message.data, dict):
+            continue
+        parts = str(message.data.get('text', '')).split(':')
+        if len(parts) == 3 and parts[0] == CHAT_PREFIX and parts[1] == str(player.index):
+            sent = player.pending_chats.pop(int(parts[2]), None)
+            if sent is not None:
+                stats['latencies'].append((arrived - sent) * 1000.0)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=50, help='Simulated players')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds to run')
+    parser.add_argument('--match-size', type=int, default=10, help='Players per match')
+    parser.add_argument('--tick-rate', type=float, default=30.0, help='Driver loop rate (Hz)')
+    parser.add_argument('--move-rate', type=float, default=20.0, help='PLAYER_MOVE per player per second')
+    parser.add_argument('--chat-rate', type=float, default=0.2, help='Chats per player per second')
+    parser.add_argument('--vote-rate', type=float, default=0.05, help='Votes per player per second')
+    parser.add_argument('--churn-rate', type=float, default=0.01, help='Reconnects per player per second')
+    parser.add_argument('--codec', default='binary', choices=['json', 'binary'])
+    parser.add_argument('--port', type=int, default=5600)
+    parser.add_argument('--no-spawn', dest='spawn', action='store_false', help='Use a server already running on --port')
+    parser.add_argument('--server-pid', type=int, default=None, help='Server pid to monitor with --no-spawn')
+    parser.add_argument('--server-args', default='--async-server', help='Extra run.py host arguments')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for key, value in report.items():
+        if isinstance(value, float):
+            value = f"{value:.2f}"
+        print(f"{key:<18}{value}")
+
+
+if __name__ == "__main__":
+    main()